@@ -0,0 +1,355 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional
+from data_extractor.cache.extraction_cache import ExtractionCache
+from data_extractor.cache.hashing import file_sha256
+from data_extractor.cache.ocr_cache import OCRCache
+from data_extractor.data_extractor.cached_extractor import CachedExtractor
+from data_extractor.data_extractor.extractor import ARTIFACT_KINDS, parse_pages
+from data_extractor.data_extractor.extractor_factory import detect_format, get_extractor, probe, supported_extensions
+from data_extractor.instrumentation import metrics
+from data_extractor.storage.file_storage import FileStorage
+from data_extractor.storage.job_ledger import JobLedger
+from data_extractor.storage.sql_storage import SQLStorage
+from dotenv import load_dotenv
+load_dotenv()
+
+def collect_files(paths: Iterable[str], manifest: Optional[str] = None) -> List[str]:
+    """Expand directories, glob patterns and a manifest file into a list of documents."""
+    candidates = list(paths)
+    if manifest:
+        with open(manifest) as f:
+            candidates.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+
+    files = []
+    for candidate in candidates:
+        if os.path.isdir(candidate):
+            for root, _, names in os.walk(candidate):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.lower().endswith(supported_extensions()))
+        elif glob.has_magic(candidate):
+            files.extend(path for path in sorted(glob.glob(candidate, recursive=True))
+                         if os.path.isfile(path) and path.lower().endswith(supported_extensions()))
+        else:
+            # Explicitly named files are kept even if unsupported so they are reported as failures
+            files.append(candidate)
+
+    # Drop duplicates while keeping the order the files were given in
+    return list(dict.fromkeys(files))
+
+def output_dirs(files: List[str], output_root: str, used: Optional[set] = None) -> Dict[str, str]:
+    """
+    Give every document its own output folder, named after the file like main.py does.
+
+    Pass the same ``used`` set on every call to keep folders apart across calls.
+    """
+    dirs = {}
+    used = set() if used is None else used
+    for file_path in files:
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        if name in used:
+            # Same file name from another folder or format: keep both by adding a path hash
+            name = f"{name}_{hashlib.sha1(file_path.encode()).hexdigest()[:8]}"
+        used.add(name)
+        dirs[file_path] = os.path.join(output_root, name)
+    return dirs
+
+def job_fingerprint(extractor, pages: Optional[List[int]] = None, kinds=ARTIFACT_KINDS) -> str:
+    """
+    Hash of everything besides the content that shapes a file's stored output.
+
+    That is the extractor, its ``version`` and ``options()``, and the pages and artifact kinds
+    requested, so a ledger never skips a file stored with different settings.
+    """
+    description = json.dumps({
+        "extractor": type(extractor).__name__,
+        "version": extractor.version,
+        "options": extractor.options(),
+        "pages": extractor.resolve_pages(pages),
+        "kinds": sorted(extractor.resolve_kinds(kinds))
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(description.encode()).hexdigest()
+
+def process_file(file_path: str, output_dir: str, image_store_dir: Optional[str] = None,
+                 cache_path: Optional[str] = None, cache_max_bytes: Optional[int] = None,
+                 ocr_cache_path: Optional[str] = None, collect_metrics: bool = False,
+                 pages: Optional[List[int]] = None, kinds=ARTIFACT_KINDS,
+                 ledger_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Extract one document and save it to output_dir; failures are returned, not raised.
+
+    With collect_metrics the result carries a ``metrics`` snapshot of this file's stages.
+    ``pages`` and ``kinds`` limit extraction to those pages and artifact kinds. With
+    ledger_path the file is marked as extracting there when work on it starts.
+    """
+    start = time.perf_counter()
+    cache = ocr_cache = None
+    if ledger_path:
+        with JobLedger(ledger_path) as ledger:
+            ledger.mark_extracting(file_path)
+    recorder = metrics.enable() if collect_metrics else None
+    file_format = os.path.splitext(file_path)[1].lstrip(".").lower()
+    try:
+        ocr_cache = OCRCache(ocr_cache_path) if ocr_cache_path else None
+        # The batch pool already uses every core, so OCR inside a worker stays single-process
+        extractor = get_extractor(file_path, ocr_cache=ocr_cache, ocr_workers=1)
+        fingerprint = job_fingerprint(extractor, pages, kinds)
+        if cache_path:
+            cache = ExtractionCache(cache_path, cache_max_bytes) if cache_max_bytes else ExtractionCache(cache_path)
+            extractor = CachedExtractor(extractor, cache)
+        with extractor, metrics.stage("extract", format=file_format):
+            extractor.load(file_path, pages)
+            extracted = extractor.extract_all(kinds)
+        # CachedExtractor has already hashed the content to look it up
+        content_hash = extractor.content_hash if cache is not None else file_sha256(file_path)
+
+        file_storage = FileStorage(output_dir, image_store_dir)
+        if "text" in extracted:
+            file_storage.store(extracted["text"], os.path.basename(file_path), 'text')
+        if extracted.get("images"):
+            image_metadata = file_storage.store(extracted["images"], os.path.basename(file_path), 'image')
+            blob_paths = {metadata["sha256"]: metadata["file_path"] for metadata in image_metadata}
+            # Image bytes stay in the image store; the database only gets a reference to the blob
+            references = []
+            for image in extracted["images"]:
+                sha256 = image.get("sha256") or hashlib.sha256(image["image_data"]).hexdigest()
+                references.append({"page": image.get("page"), "ext": image.get("ext"),
+                                   "dimensions": image.get("dimensions"), "sha256": sha256,
+                                   "file_path": blob_paths[sha256]})
+            extracted["images"] = references
+        if extracted.get("urls"):
+            file_storage.store(extracted["urls"], os.path.basename(file_path), 'url')
+        if extracted.get("tables"):
+            file_storage.store(extracted["tables"], os.path.basename(file_path), 'table')
+
+        result = {
+            "file_path": file_path,
+            "status": "ok",
+            "pages": len(extractor.page_numbers(extracted["page_count"] or 0)),
+            "seconds": time.perf_counter() - start,
+            "content_hash": content_hash,
+            "fingerprint": fingerprint,
+            "extracted": extracted
+        }
+    except Exception as error:
+        result = {
+            "file_path": file_path,
+            "status": "failed",
+            "pages": 0,
+            "seconds": time.perf_counter() - start,
+            "error": f"{type(error).__name__}: {error}"
+        }
+    finally:
+        if cache is not None:
+            cache.close()
+        if ocr_cache is not None:
+            ocr_cache.close()
+
+    metrics.count("files_processed", status=result["status"])
+    if recorder is not None:
+        metrics.disable()
+        result["metrics"] = recorder.snapshot()
+    return result
+
+def store_in_database(sql_storage: SQLStorage, result: Dict[str, Any]) -> int:
+    """
+    Write one document's extracted data to the normalized SQL schema in one transaction.
+
+    Rows stored for the same path by an earlier or interrupted run are replaced, not duplicated.
+    """
+    return sql_storage.store_document(result["file_path"], result["extracted"], result.get("content_hash"),
+                                      store_image_data=False, replace=True)
+
+def screen_files(files: List[str], summary: Dict[str, Any], ledger: Optional[JobLedger] = None) -> List[str]:
+    """The files that pass probe(); the rest are recorded as failures in summary (and the ledger)."""
+    passed = []
+    for file_path in files:
+        with metrics.stage("probe"):
+            try:
+                result = probe(file_path)
+            except Exception as error:
+                # probe() reports corrupt files itself; anything else still only fails this file
+                result = {"valid": False, "error": f"{type(error).__name__}: {error}"}
+        if result["valid"]:
+            passed.append(file_path)
+            continue
+        error = result["error"] or "encrypted"
+        summary["failed"] += 1
+        summary["failures"].append({"file_path": file_path, "error": f"probe: {error}"})
+        if ledger is not None:
+            ledger.mark_failed(file_path, f"probe: {error}")
+        print(f"Failed to process {file_path}: probe: {error}", file=sys.stderr)
+    return passed
+
+def run_batch(files: List[str], output_root: str, workers: int,
+              database: Optional[str] = None, cache_path: Optional[str] = None, cache_max_bytes: Optional[int] = None,
+              ocr_cache_path: Optional[str] = None, metrics_path: Optional[str] = None,
+              pages: Optional[List[int]] = None, kinds=ARTIFACT_KINDS, probe_first: bool = False,
+              ledger_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Process every file through a process pool and return a throughput summary.
+
+    With probe_first every file is structurally checked in the parent before any work is
+    scheduled; corrupt, encrypted and unsupported files fail without reaching a worker.
+
+    With metrics_path the stage timings and counters of every worker and of the database
+    writes are added up and written there (Prometheus text for .prom/.txt, JSON otherwise).
+
+    With ledger_path each file's state, content hash and timings are recorded in that JobLedger.
+    Files it lists as stored (and unchanged since) are skipped and counted under ``skipped``,
+    so a run that was interrupted or had failures picks up where it stopped.
+    """
+    # The parent records its own (database) stages and merges what each worker sends back
+    recorder = metrics.enable() if metrics_path else None
+    sql_storage = SQLStorage(database) if database else None
+    summary = {"files": len(files), "skipped": 0, "succeeded": 0, "failed": 0, "pages": 0, "failures": []}
+    dirs = output_dirs(files, output_root)
+    ledger = None
+    if ledger_path:
+        os.makedirs(os.path.dirname(ledger_path) or ".", exist_ok=True)
+        ledger = JobLedger(ledger_path)
+        fingerprints = {}
+
+        def fingerprint(file_path: str) -> Optional[str]:
+            # One extractor per format gives what this run's workers will record
+            document_format = detect_format(file_path)
+            if document_format is None:
+                return None
+            if document_format.name not in fingerprints:
+                with get_extractor(file_path, ocr_workers=1) as extractor:
+                    fingerprints[document_format.name] = job_fingerprint(extractor, pages, kinds)
+            return fingerprints[document_format.name]
+
+        dirs = ledger.enqueue(files, dirs, fingerprint)
+        summary["skipped"] = len(files) - len(dirs)
+        files = list(dirs)
+    # One image store for the whole batch so images repeated across documents are written once
+    image_store_dir = os.path.join(output_root, "_image_store")
+    start = time.perf_counter()
+    if probe_first:
+        files = screen_files(files, summary, ledger)
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(process_file, file_path, dirs[file_path], image_store_dir,
+                                       cache_path, cache_max_bytes, ocr_cache_path, recorder is not None,
+                                       pages, kinds, ledger_path): file_path
+                       for file_path in files}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as error:
+                    # A worker that dies (e.g. a crash inside a native parser) only fails its own file
+                    result = {"file_path": futures[future], "status": "failed", "pages": 0,
+                              "error": f"{type(error).__name__}: {error}"}
+                if recorder is not None and "metrics" in result:
+                    recorder.merge(result.pop("metrics"))
+
+                document_id = store_seconds = None
+                if result["status"] == "ok":
+                    if sql_storage is not None:
+                        store_start = time.perf_counter()
+                        try:
+                            document_id = store_in_database(sql_storage, result)
+                        except Exception as error:
+                            result = {"file_path": result["file_path"], "status": "failed", "pages": 0,
+                                      "seconds": result["seconds"], "error": f"{type(error).__name__}: {error}"}
+                        store_seconds = time.perf_counter() - store_start
+
+                if ledger is not None:
+                    # Recorded only once the document is in the database, so a crash before this re-runs it
+                    if result["status"] == "ok":
+                        ledger.mark_stored(result["file_path"], result["content_hash"], document_id,
+                                           result["pages"], result["seconds"], store_seconds, result["fingerprint"])
+                    else:
+                        ledger.mark_failed(result["file_path"], result["error"], result.get("seconds"))
+
+                if result["status"] == "ok":
+                    summary["succeeded"] += 1
+                    summary["pages"] += result["pages"]
+                else:
+                    summary["failed"] += 1
+                    summary["failures"].append({"file_path": result["file_path"], "error": result["error"]})
+                    print(f"Failed to process {result['file_path']}: {result['error']}", file=sys.stderr)
+    finally:
+        if sql_storage is not None:
+            sql_storage.close()
+        if ledger is not None:
+            ledger.close()
+        if recorder is not None:
+            metrics.disable()
+            recorder.dump(metrics_path)
+
+    elapsed = time.perf_counter() - start
+    summary["seconds"] = elapsed
+    processed = summary["files"] - summary["skipped"]
+    summary["files_per_second"] = processed / elapsed if elapsed else 0.0
+    summary["pages_per_second"] = summary["pages"] / elapsed if elapsed else 0.0
+    return summary
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Extract data from many PDF, DOCX and PPTX files.")
+    parser.add_argument("paths", nargs="*", help="Files, directories or glob patterns to process.")
+    parser.add_argument("--manifest", help="Text file listing one path per line.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes (default: number of CPUs).")
+    parser.add_argument("--output-dir", default="extracted_data",
+                        help="Folder the extracted data is written to.")
+    parser.add_argument("--database", default=os.getenv("DATABASE_NAME"),
+                        help="SQLite database to store the data in (default: DATABASE_NAME).")
+    parser.add_argument("--cache", help="Extraction cache file; unchanged documents are served from it.")
+    parser.add_argument("--cache-max-mb", type=int, default=1024,
+                        help="Size limit of the extraction cache in MB (default: 1024).")
+    parser.add_argument("--clear-cache", action="store_true", help="Empty the extraction cache before running.")
+    parser.add_argument("--ocr-cache", help="Page-level OCR cache file shared by every document and run.")
+    parser.add_argument("--pages", type=parse_pages,
+                        help="Only extract these pages or slides, e.g. 1-3 or 40-60,75 (not for DOCX).")
+    parser.add_argument("--kinds", nargs="+", default=list(ARTIFACT_KINDS), choices=list(ARTIFACT_KINDS),
+                        help="Artifact kinds to extract (default: all).")
+    parser.add_argument("--metrics", help="Write per-stage timings and counters here (.prom for Prometheus text, "
+                                          "otherwise JSON).")
+    parser.add_argument("--probe", action="store_true",
+                        help="Check every file's structure first and skip corrupt, encrypted or unsupported ones.")
+    parser.add_argument("--ledger", help="Job ledger that lets an interrupted run resume (default: next to "
+                                         "--database, or in --output-dir without one).")
+    parser.add_argument("--no-ledger", action="store_true", help="Process every file and record no progress.")
+    parser.add_argument("--restart", action="store_true", help="Forget the ledger's progress and process every file.")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    files = collect_files(args.paths, args.manifest)
+    if not files:
+        raise ValueError("No files to process. Pass paths, globs or a --manifest file.")
+
+    cache_max_bytes = args.cache_max_mb * 1024 * 1024
+    if args.cache and args.clear_cache:
+        cache = ExtractionCache(args.cache, cache_max_bytes)
+        cache.invalidate()
+        cache.close()
+
+    ledger_path = None
+    if not args.no_ledger:
+        ledger_path = args.ledger or JobLedger.default_path(args.database, args.output_dir)
+        if args.restart and os.path.exists(ledger_path):
+            with JobLedger(ledger_path) as ledger:
+                ledger.reset()
+
+    summary = run_batch(files, args.output_dir, args.workers, args.database,
+                        args.cache, cache_max_bytes, args.ocr_cache, args.metrics, args.pages, args.kinds, args.probe,
+                        ledger_path)
+
+    print(f"Processed {summary['files'] - summary['skipped']} files in {summary['seconds']:.2f}s: "
+          f"{summary['succeeded']} succeeded, {summary['failed']} failed"
+          + (f", {summary['skipped']} already stored" if summary["skipped"] else ""))
+    print(f"Throughput: {summary['files_per_second']:.2f} files/s, {summary['pages_per_second']:.2f} pages/s "
+          f"({summary['pages']} pages)")
+    return 1 if summary["failed"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import argparse
+import os
+import random
+from io import BytesIO
+from typing import Dict, List
+import fitz
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Inches
+from pptx import Presentation
+from pptx.util import Inches as PptxInches
+
+# Document shapes used by the benchmarks; every count is per page (or slide)
+SIZES = {
+    "small": {"pages": 2, "paragraphs": 5, "images": 1, "tables": 1, "links": 2},
+    "medium": {"pages": 20, "paragraphs": 10, "images": 2, "tables": 1, "links": 3},
+    "large": {"pages": 200, "paragraphs": 15, "images": 3, "tables": 2, "links": 5},
+}
+
+FORMATS = ("pdf", "docx", "pptx")
+
+WORDS = ("extraction", "document", "page", "storage", "table", "image", "throughput", "latency",
+         "revenue", "quarter", "pipeline", "cache", "parser", "index", "memory", "report")
+
+def sentence(rng: random.Random, words: int = 12) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def png_bytes(seed: int, size: int = 64) -> bytes:
+    """A small PNG whose colour depends on seed, so images only repeat when asked to."""
+    pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, size, size), False)
+    pixmap.clear_with(seed % 256)
+    pixmap.set_rect(fitz.IRect(0, 0, size // 2, size // 2), ((seed * 7) % 256, (seed * 13) % 256, (seed * 29) % 256))
+    return pixmap.tobytes("png")
+
+def table_cells(rng: random.Random, rows: int = 4, columns: int = 3) -> List[List[str]]:
+    return [[f"{rng.choice(WORDS)} {rng.randint(0, 999)}" for _ in range(columns)] for _ in range(rows)]
+
+def generate_pdf(file_path: str, pages: int, paragraphs: int, images: int, tables: int, links: int,
+                 seed: int = 0):
+    """Write a PDF with a text layer, ruled tables (found by pdfplumber), images and URI links."""
+    rng = random.Random(seed)
+    document = fitz.open()
+    image_seed = 0
+    for page_num in range(pages):
+        page = document.new_page()
+        y = 50
+        for _ in range(paragraphs):
+            page.insert_text((50, y), sentence(rng), fontsize=9)
+            y += 14
+        for link_num in range(links):
+            url = f"https://example.com/{page_num + 1}/{link_num + 1}"
+            page.insert_text((50, y), url, fontsize=9)
+            page.insert_link({"kind": fitz.LINK_URI, "from": fitz.Rect(50, y - 9, 250, y + 2), "uri": url})
+            y += 14
+        for _ in range(tables):
+            cells = table_cells(rng)
+            top = y + 6
+            for row_index, row in enumerate(cells):
+                for column_index, value in enumerate(row):
+                    cell = fitz.Rect(50 + column_index * 120, top + row_index * 16,
+                                     170 + column_index * 120, top + (row_index + 1) * 16)
+                    page.draw_rect(cell, color=(0, 0, 0), width=0.5)
+                    page.insert_text((cell.x0 + 3, cell.y1 - 4), value, fontsize=8)
+            y = top + len(cells) * 16 + 10
+        for image_num in range(images):
+            image_seed += 1
+            x = 50 + image_num * 90
+            page.insert_image(fitz.Rect(x, 700, x + 80, 780), stream=png_bytes(image_seed))
+    document.save(file_path)
+    document.close()
+
+def add_docx_hyperlink(paragraph, url: str, text: str):
+    """python-docx has no hyperlink API, so build the w:hyperlink element directly."""
+    relationship_id = paragraph.part.relate_to(url, RELATIONSHIP_TYPE.HYPERLINK, is_external=True)
+    hyperlink = OxmlElement("w:hyperlink")
+    hyperlink.set(qn("r:id"), relationship_id)
+    run = OxmlElement("w:r")
+    run_text = OxmlElement("w:t")
+    run_text.text = text
+    run.append(run_text)
+    hyperlink.append(run)
+    paragraph._p.append(hyperlink)
+
+def generate_docx(file_path: str, pages: int, paragraphs: int, images: int, tables: int, links: int,
+                  seed: int = 0):
+    """Write a DOCX whose 'pages' are separated by hard page breaks."""
+    rng = random.Random(seed)
+    document = Document()
+    image_seed = 0
+    for page_num in range(pages):
+        for _ in range(paragraphs):
+            document.add_paragraph(sentence(rng))
+        for link_num in range(links):
+            url = f"https://example.com/{page_num + 1}/{link_num + 1}"
+            add_docx_hyperlink(document.add_paragraph("See "), url, url)
+        for _ in range(tables):
+            cells = table_cells(rng)
+            table = document.add_table(rows=len(cells), cols=len(cells[0]))
+            for row, values in zip(table.rows, cells):
+                for cell, value in zip(row.cells, values):
+                    cell.text = value
+        for _ in range(images):
+            image_seed += 1
+            document.add_picture(BytesIO(png_bytes(image_seed)), width=Inches(0.8))
+        if page_num + 1 < pages:
+            document.add_page_break()
+    document.save(file_path)
+
+def generate_pptx(file_path: str, pages: int, paragraphs: int, images: int, tables: int, links: int,
+                  seed: int = 0):
+    """Write a PPTX with one slide per page."""
+    rng = random.Random(seed)
+    presentation = Presentation()
+    layout = presentation.slide_layouts[6]  # Blank
+    image_seed = 0
+    for page_num in range(pages):
+        slide = presentation.slides.add_slide(layout)
+        text_frame = slide.shapes.add_textbox(PptxInches(0.5), PptxInches(0.3), PptxInches(9), PptxInches(2)).text_frame
+        text_frame.text = sentence(rng)
+        for _ in range(paragraphs - 1):
+            text_frame.add_paragraph().text = sentence(rng)
+        for link_num in range(links):
+            run = text_frame.add_paragraph().add_run()
+            run.text = f"https://example.com/{page_num + 1}/{link_num + 1}"
+            run.hyperlink.address = run.text
+        for table_num in range(tables):
+            cells = table_cells(rng)
+            shape = slide.shapes.add_table(len(cells), len(cells[0]), PptxInches(0.5 + table_num * 4.5),
+                                           PptxInches(4), PptxInches(4), PptxInches(1.5))
+            for row_index, values in enumerate(cells):
+                for column_index, value in enumerate(values):
+                    shape.table.cell(row_index, column_index).text = value
+        for image_num in range(images):
+            image_seed += 1
+            slide.shapes.add_picture(BytesIO(png_bytes(image_seed)), PptxInches(0.5 + image_num * 1.2),
+                                     PptxInches(6), PptxInches(1), PptxInches(1))
+    presentation.save(file_path)
+
+GENERATORS = {"pdf": generate_pdf, "docx": generate_docx, "pptx": generate_pptx}
+
+def generate_corpus(output_dir: str, sizes=tuple(SIZES), formats=FORMATS, seed: int = 0) -> Dict[str, Dict[str, str]]:
+    """Generate one document per size and format; returns {size: {format: path}}."""
+    os.makedirs(output_dir, exist_ok=True)
+    corpus = {}
+    for size in sizes:
+        if size not in SIZES:
+            raise ValueError(f"Unsupported size. Use one of {', '.join(SIZES)}.")
+        corpus[size] = {}
+        for file_format in formats:
+            if file_format not in GENERATORS:
+                raise ValueError(f"Unsupported format. Use one of {', '.join(FORMATS)}.")
+            file_path = os.path.join(output_dir, f"{size}.{file_format}")
+            GENERATORS[file_format](file_path, seed=seed, **SIZES[size])
+            corpus[size][file_format] = file_path
+    return corpus
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic PDF, DOCX and PPTX files for benchmarking.")
+    parser.add_argument("--output-dir", default="benchmark_files", help="Folder the documents are written to.")
+    parser.add_argument("--sizes", nargs="+", default=list(SIZES), choices=list(SIZES))
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), choices=list(FORMATS))
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the generated text.")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    for size, paths in generate_corpus(args.output_dir, args.sizes, args.formats, args.seed).items():
+        for path in paths.values():
+            print(path)
@@ -0,0 +1,207 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+from benchmarks.generate_documents import FORMATS, SIZES, generate_corpus
+from data_extractor.data_extractor.extractor_factory import get_extractor
+from data_extractor.storage.file_storage import FileStorage
+from data_extractor.storage.sql_storage import SQLStorage
+
+try:
+    import resource
+except ImportError:  # Windows has no resource module; peak RSS is then not reported
+    resource = None
+
+EXTRACTOR_CASES = ("load", "extract_text", "extract_images", "extract_urls", "extract_tables", "extract_all")
+STORAGE_CASES = ("file_storage", "sql_storage")
+CASES = EXTRACTOR_CASES + STORAGE_CASES
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_case(file_path: str, case: str, repeat: int = 1) -> Dict[str, Any]:
+    """Time one case on one document; the document is loaded (and extracted) outside the timing."""
+    if case not in CASES:
+        raise ValueError(f"Unsupported benchmark case. Use one of {', '.join(CASES)}.")
+    extractor = get_extractor(file_path)
+    extracted = None
+    if case != "load":
+        extractor.load(file_path)
+    if case in STORAGE_CASES:
+        extracted = extractor.extract_all()
+    work_dir = tempfile.mkdtemp(prefix="benchmark_")
+
+    wall = cpu = 0.0
+    try:
+        for _ in range(repeat):
+            start_wall, start_cpu = time.perf_counter(), time.process_time()
+            if case == "load":
+                extractor.load(file_path)
+            elif case == "file_storage":
+                file_storage = FileStorage(os.path.join(work_dir, "files"))
+                name = os.path.basename(file_path)
+                file_storage.store(extracted["text"], name, "text")
+                file_storage.store(extracted["images"], name, "image")
+                file_storage.store(extracted["urls"], name, "url")
+                file_storage.store(extracted["tables"], name, "table")
+            elif case == "sql_storage":
+                sql_storage = SQLStorage(os.path.join(work_dir, "benchmark.db"))
+                sql_storage.store_document(file_path, extracted)
+                sql_storage.close()
+            else:
+                getattr(extractor, case)()
+            wall += time.perf_counter() - start_wall
+            cpu += time.process_time() - start_cpu
+    finally:
+        extractor.close()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if extracted is None:
+        with get_extractor(file_path) as counter:
+            counter.load(file_path)
+            page_count = counter.extract_all(kinds=())["page_count"]
+    else:
+        page_count = extracted["page_count"]
+    pages = page_count or 0
+    megabytes = os.path.getsize(file_path) / (1024 * 1024)
+    seconds = wall / repeat
+    return {
+        "case": case,
+        "seconds": seconds,
+        "cpu_seconds": cpu / repeat,
+        "peak_rss_mb": peak_rss_mb(),
+        "pages": pages,
+        "file_mb": megabytes,
+        "pages_per_second": pages / seconds if seconds and pages else None,
+        "mb_per_second": megabytes / seconds if seconds else None
+    }
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(sizes=tuple(SIZES), formats=FORMATS, cases=CASES, repeat: int = 1,
+                   isolate: bool = True, corpus_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Run every case on every generated document and return the report.
+
+    With ``isolate`` each case runs in a fresh process, so its peak RSS is its own and not
+    the high-water mark of the cases before it.
+    """
+    temporary = corpus_dir is None
+    corpus_dir = corpus_dir or tempfile.mkdtemp(prefix="benchmark_files_")
+    results = []
+    try:
+        corpus = generate_corpus(corpus_dir, sizes, formats)
+        for size, paths in corpus.items():
+            for file_format, file_path in paths.items():
+                for case in cases:
+                    if isolate:
+                        # spawn, not fork, so the child does not inherit this process's memory
+                        with ProcessPoolExecutor(max_workers=1,
+                                                 mp_context=multiprocessing.get_context("spawn")) as executor:
+                            result = executor.submit(run_case, file_path, case, repeat).result()
+                    else:
+                        result = run_case(file_path, case, repeat)
+                    results.append(dict(result, size=size, format=file_format))
+    finally:
+        if temporary:
+            shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "repeat": repeat,
+            "isolated": isolate,
+            "sizes": {size: SIZES[size] for size in sizes}
+        },
+        "results": results
+    }
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2) -> List[Dict[str, Any]]:
+    """Cases at least ``threshold`` (20% by default) slower than in the baseline report."""
+    previous = {(result["size"], result["format"], result["case"]): result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        before = previous.get((result["size"], result["format"], result["case"]))
+        if before and before["seconds"] and result["seconds"] > before["seconds"] * (1 + threshold):
+            regressions.append({
+                "size": result["size"], "format": result["format"], "case": result["case"],
+                "baseline_seconds": before["seconds"], "seconds": result["seconds"],
+                "ratio": result["seconds"] / before["seconds"]
+            })
+    return regressions
+
+def print_report(report: Dict[str, Any]):
+    def cell(value, width: int, digits: int) -> str:
+        return f"{value:>{width}.{digits}f}" if value is not None else f"{'n/a':>{width}}"
+
+    print(f"{'size':<8}{'format':<8}{'case':<16}{'seconds':>10}{'cpu s':>10}{'pages/s':>12}{'peak MB':>10}")
+    for result in report["results"]:
+        print(f"{result['size']:<8}{result['format']:<8}{result['case']:<16}{cell(result['seconds'], 10, 4)}"
+              f"{cell(result['cpu_seconds'], 10, 4)}{cell(result['pages_per_second'], 12, 1)}"
+              f"{cell(result['peak_rss_mb'], 10, 1)}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every extractor method and storage backend.")
+    parser.add_argument("--sizes", nargs="+", default=["small", "medium"], choices=list(SIZES))
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), choices=list(FORMATS))
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the mean is reported (default: 3).")
+    parser.add_argument("--in-process", action="store_true",
+                        help="Run every case in this process (faster, but peak RSS accumulates).")
+    parser.add_argument("--corpus-dir", help="Keep the generated documents in this folder.")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file the report is written to.")
+    parser.add_argument("--compare", help="Earlier report to compare against; exits with 1 on a regression.")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Slowdown counted as a regression, as a fraction (default: 0.2).")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    baseline = None
+    if args.compare:
+        if os.path.abspath(args.output) == os.path.abspath(args.compare):
+            # Writing the report first would replace the baseline and compare the run with itself
+            raise ValueError(f"--output and --compare are both {args.compare}. Write the new report elsewhere, "
+                             f"e.g. --output benchmark_latest.json.")
+        # Read before the (long) run so a missing or broken baseline fails straight away
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    report = run_benchmarks(args.sizes, args.formats, args.cases, args.repeat, not args.in_process, args.corpus_dir)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=4)
+    print_report(report)
+    print(f"Results saved to: {args.output}")
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression['size']} {regression['format']} {regression['case']} "
+                  f"{regression['baseline_seconds']:.4f}s -> {regression['seconds']:.4f}s "
+                  f"({regression['ratio']:.2f}x)", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
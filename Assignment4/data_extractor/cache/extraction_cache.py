@@ -0,0 +1,95 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+import time
+from typing import Any, Dict, Optional
+from data_extractor.instrumentation import metrics
+
+class ExtractionCache:
+    """Persistent, size-bounded LRU cache of extraction results stored in SQLite."""
+
+    def __init__(self, path: str, max_bytes: int = 1024 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Several batch workers may share the cache, so wait for locks instead of failing
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS entries (
+        key TEXT PRIMARY KEY,
+        content_hash TEXT NOT NULL,
+        payload BLOB NOT NULL,
+        size INTEGER NOT NULL,
+        last_access REAL NOT NULL
+        )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_content_hash ON entries (content_hash)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(content_hash: str, extractor_name: str, version: str,
+                 options: Dict[str, Any], kind: str) -> str:
+        """Key an entry by document content, extractor version and options, and what was extracted."""
+        description = json.dumps({
+            "content_hash": content_hash,
+            "extractor": extractor_name,
+            "version": version,
+            "options": options,
+            "kind": kind
+        }, sort_keys=True, default=str)
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss."""
+        row = self.conn.execute("SELECT payload FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            metrics.count("cache_misses", cache="extraction")
+            return None
+        self.hits += 1
+        metrics.count("cache_hits", cache="extraction")
+        self.conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+        self.conn.commit()
+        return pickle.loads(row[0])
+
+    def put(self, key: str, value: Any, content_hash: str):
+        """Store a value and evict the least recently used entries beyond max_bytes."""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        metrics.count("bytes_written", len(payload), backend="extraction_cache")
+        if len(payload) > self.max_bytes:
+            return  # Would evict everything else and still not fit
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries (key, content_hash, payload, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, content_hash, payload, len(payload), time.time())
+            )
+            self._evict()
+
+    def _evict(self):
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute("SELECT key, size FROM entries ORDER BY last_access")
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self.conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+
+    def total_bytes(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    def invalidate(self, content_hash: Optional[str] = None):
+        """Drop the entries of one document, or the whole cache when no hash is given."""
+        with self.conn:
+            if content_hash is None:
+                self.conn.execute("DELETE FROM entries")
+            else:
+                self.conn.execute("DELETE FROM entries WHERE content_hash = ?", (content_hash,))
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,9 @@
+import hashlib
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Hash a file's content without reading it into memory at once."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
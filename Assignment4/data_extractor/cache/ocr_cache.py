@@ -0,0 +1,52 @@
+import sqlite3
+import time
+from typing import Dict, Iterable
+from data_extractor.instrumentation import metrics
+
+class OCRCache:
+    """On-disk store of OCR text per rendered page, shared across documents and runs."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        # Several batch workers may share the cache, so wait for locks instead of failing
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS pages (
+        key TEXT PRIMARY KEY,
+        text TEXT NOT NULL,
+        created REAL NOT NULL
+        )""")
+        self.conn.commit()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, str]:
+        """Return the cached text of every key that is present."""
+        keys = list(keys)
+        found = {}
+        # Stay well below SQLite's limit on bound parameters
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(self.conn.execute(
+                f"SELECT key, text FROM pages WHERE key IN ({placeholders})", chunk
+            ).fetchall())
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        metrics.count("cache_hits", len(found), cache="ocr")
+        metrics.count("cache_misses", len(keys) - len(found), cache="ocr")
+        return found
+
+    def put_many(self, texts: Dict[str, str]):
+        """Store the OCR text of several pages in one transaction."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO pages (key, text, created) VALUES (?, ?, ?)",
+                                  [(key, text, now) for key, text in texts.items()])
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM pages")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,67 @@
+from typing import Any, Callable, Dict
+from data_extractor.cache.extraction_cache import ExtractionCache
+from data_extractor.data_extractor.extractor import ARTIFACT_KINDS, Extractor
+from data_extractor.file_loaders.document_source import DocumentSource
+
+class CachedExtractor(Extractor):
+    """Serve extraction results from an ExtractionCache, running the wrapped extractor only on a miss."""
+
+    def __init__(self, extractor: Extractor, cache: ExtractionCache):
+        self.extractor = extractor
+        self.cache = cache
+        self.file_path = None
+        self.source = None
+        self.content_hash = None
+        self._loaded = False
+
+    def load(self, file_path, pages=None):
+        """Hash the document; it is only parsed when something has to be extracted for real."""
+        self.close()
+        self.page_selection = self.resolve_pages(pages)
+        # Hashing and any later parse share one read of the document
+        self.source = DocumentSource.of(file_path)
+        self._owns_source = self.source is not file_path
+        self.file_path = self.source.path
+        self.content_hash = self.source.sha256()
+        self._loaded = False
+
+    def _cached(self, kind: str, compute: Callable[[], Any]) -> Any:
+        options = self.extractor.options()
+        if self.page_selection is not None:
+            options = dict(options, pages=list(self.page_selection))
+        key = self.cache.make_key(self.content_hash, type(self.extractor).__name__,
+                                  self.extractor.version, options, kind)
+        value = self.cache.get(key)
+        if value is None:
+            if not self._loaded:
+                self.extractor.load(self.source, self.page_selection)
+                self._loaded = True
+            value = compute()
+            self.cache.put(key, value, self.content_hash)
+        return value
+
+    def extract_text(self):
+        return self._cached("text", self.extractor.extract_text)
+
+    def extract_images(self):
+        return self._cached("images", self.extractor.extract_images)
+
+    def extract_urls(self):
+        return self._cached("urls", self.extractor.extract_urls)
+
+    def extract_tables(self):
+        return self._cached("tables", self.extractor.extract_tables)
+
+    def extract_all(self, kinds=ARTIFACT_KINDS) -> Dict[str, Any]:
+        kinds = self.resolve_kinds(kinds)
+        return self._cached("all:" + ",".join(sorted(set(kinds))), lambda: self.extractor.extract_all(kinds))
+
+    def invalidate(self):
+        """Forget every cached result for the loaded document."""
+        self.cache.invalidate(self.content_hash)
+
+    def close(self):
+        self.extractor.close()
+        if self.source is not None and self._owns_source:
+            self.source.close()
+        self._loaded = False
@@ -0,0 +1,54 @@
+from typing import Any, Callable, Dict
+from data_extractor.file_loaders.document_source import DocumentSource
+from data_extractor.instrumentation import metrics
+
+class DocumentSession:
+    """
+    Owns the parsed backend handles of one document so every extractor method can share them.
+
+    The document may be a path or anything DocumentSource accepts. Every handle parses the
+    same buffer, so the document is read from storage once per session.
+    """
+
+    def __init__(self, file_path, loader):
+        self.source = DocumentSource.of(file_path)
+        # A source passed in by the caller is theirs to close
+        self._owns_source = self.source is not file_path
+        self.file_path = self.source.path
+        self.loader = loader
+        self.closed = False
+        self._handles: Dict[str, Any] = {}
+
+    def handle(self, name: str, opener: Callable[[], Any]) -> Any:
+        """Return the named backend handle, opening it on first use."""
+        if self.closed:
+            raise ValueError("Document session is closed.")
+        if name not in self._handles:
+            first = not self._handles
+            with metrics.stage("open", backend=name):
+                self._handles[name] = opener()
+            if first and metrics.enabled():
+                metrics.count("bytes_read", self.source.size, backend=name)
+        return self._handles[name]
+
+    @property
+    def document(self) -> Any:
+        """The object produced by the loader (PdfReader, docx Document or pptx Presentation)."""
+        return self.handle("loader", lambda: self.loader.load_file(self.source))
+
+    def close(self):
+        """Close every handle that was opened and forget about them."""
+        for handle in self._handles.values():
+            close = getattr(handle, "close", None)
+            if callable(close):
+                close()
+        self._handles.clear()
+        if self._owns_source:
+            self.source.close()
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,5 +1,8 @@
-from typing import Any, Dict, List
-from data_extractor.data_extractor.extractor import Extractor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from docx.oxml.ns import qn
+from data_extractor.data_extractor.document_session import DocumentSession
+from data_extractor.data_extractor.extractor import ARTIFACT_KINDS, Extractor
+from data_extractor.data_extractor.text_buffer import PageTextBuffer
 
 class DOCXExtractor(Extractor):
     def __init__(self, loader):
@@ -7,84 +10,165 @@ class DOCXExtractor(Extractor):
         self.file = None
         self.file_path = None
         
-    def load(self, file_path):
+    def load(self, file_path, pages=None):
         """Load the file using the appropriate loader based on file type."""
-        self.file = self.loader.load_file(file_path)
-        self.file_path = file_path 
+        if pages is not None:
+            # Page breaks in a DOCX depend on how Word lays it out, so there is nothing to slice by
+            raise ValueError("Page selection is not supported for DOCX files.")
+        self.close()
+        self.session = DocumentSession(file_path, self.loader)
+        self.file = self.session.document
+        self.file_path = self.session.file_path
         
     def extract_text(self):
         # Extract text from DOCX
-            doc = self.loader.load_file(self.file_path)
-            text = ""
+        return self.text_buffer().getvalue()
 
-            # Extract text from paragraphs
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
+    def iter_text(self) -> Iterator[Dict[str, Any]]:
+        """Yield the text of every paragraph, then of every table row; DOCX has no page numbers."""
+        doc = self.file
 
-            # Extract text from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = "\t".join(cell.text.strip() for cell in row.cells)
-                    text += row_text + "\n"
+        # Extract text from paragraphs
+        for paragraph in doc.paragraphs:
+            yield {"page_number": None, "text": paragraph.text + "\n"}
 
-            return text
+        # Extract text from tables
+        for table in doc.tables:
+            for row in table.rows:
+                row_text = "\t".join(cell.text.strip() for cell in row.cells)
+                yield {"page_number": None, "text": row_text + "\n"}
     
     def extract_images(self):
-        images = []
+        return list(self.iter_images())
+
+    def iter_images(self) -> Iterator[Dict[str, Any]]:
         # DOCX image extraction
-        doc = self.loader.load_file(self.file_path)
+        doc = self.file
         for rel in doc.part.rels.values():
             if "image" in rel.target_ref:
                 image_blob = rel.target_part.blob
                 # Get the image extension
                 image_ext = rel.target_part.content_type.split('/')[1]
-                # Append the image information only if it is not None
+                # Yield the image information only if it is not None
                 if image_blob is not None:
-                    images.append({
+                    yield {
                         "image_data": image_blob,
                         "ext": image_ext
-                    })
-        doc = None  # Explicitly close the document
-        return images
+                    }
     
     def extract_urls(self) -> List[Dict[str, Any]]:
         """Extract hyperlinks from a DOCX file."""
-        extracted_links = []
+        extracted_links, _ = self._resolve_hyperlinks()
+        return extracted_links
 
-        # Access the document's relationships to find hyperlinks
-        for rel in self.file.part.rels.values():
-            if "hyperlink" in rel.reltype:
-                # Extract the hyperlink target
-                hyperlink = rel.target_ref
-                
-                # Look for the text associated with this hyperlink
-                linked_text = None
-                page_number = None
-                for para_index, para in enumerate(self.file.paragraphs, start=1):
-                    for run in para.runs:
-                        if hyperlink in run._element.xml:
-                            linked_text = run.text
-                            page_number = para_index  # Using the paragraph index as the page number
-                            break
-                    if linked_text:
-                        break
-                
-                # Append the link, associated text, and page number to the extracted links
+    def iter_urls(self) -> Iterator[Dict[str, Any]]:
+        # Links are resolved in one pass over the body XML, which is already in memory
+        yield from self.extract_urls()
+
+    def _resolve_hyperlinks(self) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Map every ``w:hyperlink`` to its URL, anchor text and position in one pass over the body.
+
+        Page numbers follow the page breaks Word rendered when the file was last saved
+        (``w:lastRenderedPageBreak``), falling back to hard page breaks when the file has
+        none. Returns the links and the rendered page count, or None if it is unknown.
+        """
+        body = self.file.element.body
+        rels = self.file.part.rels
+        rendered = body.find(".//" + qn("w:lastRenderedPageBreak")) is not None
+
+        extracted_links = []
+        referenced = set()
+        page_number = section_number = 1
+        para_index = 0
+        section_ends = False
+        for element in body.iter(qn("w:p"), qn("w:hyperlink"), qn("w:lastRenderedPageBreak"),
+                                 qn("w:br"), qn("w:sectPr")):
+            tag = element.tag
+            if tag == qn("w:p"):
+                para_index += 1
+                if section_ends:
+                    section_number += 1
+                    section_ends = False
+            elif tag == qn("w:sectPr"):
+                # A paragraph's sectPr closes the section that paragraph belongs to
+                section_ends = element.getparent().tag == qn("w:pPr")
+            elif tag == qn("w:lastRenderedPageBreak"):
+                page_number += 1
+            elif tag == qn("w:br"):
+                if not rendered and element.get(qn("w:type")) == "page":
+                    page_number += 1
+            else:
+                rel_id = element.get(qn("r:id"))
+                if rel_id is None or rel_id not in rels or "hyperlink" not in rels[rel_id].reltype:
+                    continue  # Internal bookmark anchors have no URL
+                referenced.add(rel_id)
                 extracted_links.append({
-                    "linked_text": linked_text or "",  # Use an empty string if no text is found
-                    "url": hyperlink,
-                    "page_number": page_number
+                    "linked_text": "".join(node.text or "" for node in element.iter(qn("w:t"))),
+                    "url": rels[rel_id].target_ref,
+                    "page_number": page_number,
+                    "section_number": section_number,
+                    "paragraph_index": para_index
                 })
 
-        return extracted_links
+        # Keep hyperlink relationships that no hyperlink in the body points at
+        for rel_id, rel in rels.items():
+            if "hyperlink" in rel.reltype and rel_id not in referenced:
+                extracted_links.append({
+                    "linked_text": "",
+                    "url": rel.target_ref,
+                    "page_number": None,
+                    "section_number": None,
+                    "paragraph_index": None
+                })
 
+        return extracted_links, page_number if rendered else None
 
+    def _rendered_page_count(self) -> Optional[int]:
+        """Pages Word rendered when the file was last saved, or None if it recorded no page breaks."""
+        breaks = sum(1 for _ in self.file.element.body.iter(qn("w:lastRenderedPageBreak")))
+        return breaks + 1 if breaks else None
 
     def extract_tables(self):
         # Extract tables from DOCX
-        doc = self.loader.load_file(self.file_path)
-        table_data = []
-        for table in doc.tables:
+        return [table["rows"] for table in self.iter_tables()]
+
+    def iter_tables(self) -> Iterator[Dict[str, Any]]:
+        for table in self.file.tables:
             table_content = [[cell.text.strip() for cell in row.cells] for row in table.rows]
-            table_data.append(table_content)
-        return table_data
\ No newline at end of file
+            yield {"page_number": None, "rows": table_content, "bbox": None}
+
+    def extract_all(self, kinds=ARTIFACT_KINDS) -> Dict[str, Any]:
+        """Extract the requested artifact kinds walking paragraphs and tables only once."""
+        kinds = self.resolve_kinds(kinds)
+        doc = self.file
+        # DOCX files carry no page layout; the count is only known from rendered page breaks
+        result = {"page_count": self._rendered_page_count()}
+        text, links, tables = PageTextBuffer(), [], []
+
+        if "text" in kinds:
+            for paragraph in doc.paragraphs:
+                text.append(paragraph.text + "\n")
+
+        if "urls" in kinds:
+            links, _ = self._resolve_hyperlinks()
+
+        if "text" in kinds or "tables" in kinds:
+            for table in doc.tables:
+                table_content = [[cell.text.strip() for cell in row.cells] for row in table.rows]
+                if "text" in kinds:
+                    for row in table_content:
+                        text.append("\t".join(row) + "\n")
+                if "tables" in kinds:
+                    tables.append({"page_number": None, "rows": table_content, "bbox": None})
+
+        if "text" in kinds:
+            result["text"] = text.getvalue()
+            result["page_spans"] = text.page_spans
+        if "images" in kinds:
+            result["images"] = self.extract_images()
+        if "urls" in kinds:
+            result["urls"] = links
+        if "tables" in kinds:
+            result["tables"] = tables
+        return result
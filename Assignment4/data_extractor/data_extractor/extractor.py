@@ -1,8 +1,38 @@
 from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from data_extractor.data_extractor.text_buffer import PageTextBuffer
+
+# Artifact kinds understood by Extractor.extract_all
+ARTIFACT_KINDS = ("text", "images", "urls", "tables")
+
+def parse_pages(spec: str) -> List[int]:
+    """Turn a page specification such as ``"1-3,40-60,75"`` into 1-based page numbers."""
+    pages = []
+    for part in spec.split(","):
+        first, _, last = part.strip().partition("-")
+        try:
+            pages.extend(range(int(first), int(last or first) + 1))
+        except ValueError:
+            raise ValueError(f"Invalid page range: {part.strip()!r}. Use e.g. 1-3,40-60.")
+    return pages
 
 class Extractor(ABC):
+    # Bump when a change alters what the extractor produces, so cached results are not reused
+    version = "3"
+    session = None
+    # 1-based page (or slide) numbers chosen at load time; None means every page
+    page_selection = None
+
     @abstractmethod
-    def load(self, file_path):
+    def load(self, file_path, pages: Optional[Iterable[int]] = None):
+        """
+        Open a document for extraction.
+
+        :param file_path: A path, or the document itself as bytes, an mmap, a binary file object
+            or a DocumentSource; every backend parses the same buffer.
+        :param pages: Only extract these 1-based pages or slides, e.g. ``range(40, 61)``.
+            Pages past the end of the document are ignored; excluded pages are never parsed.
+        """
         pass
 
     @abstractmethod
@@ -19,4 +49,91 @@ class Extractor(ABC):
     
     @abstractmethod
     def extract_tables(self):
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def extract_all(self, kinds: Iterable[str] = ARTIFACT_KINDS) -> Dict[str, Any]:
+        """
+        Extract several artifact kinds in a single pass over the document.
+
+        The result always has ``page_count`` plus one entry per requested kind, shaped
+        like the value of the matching ``extract_*`` method, except ``tables``, which holds
+        the ``iter_tables`` records so every table keeps its page and bbox. Formats with
+        pages or slides also return ``pages``, the text of every page, when text is requested.
+        ``page_spans`` maps every page to its ``start``/``end`` characters in ``text``.
+        """
+        pass
+
+    # Streaming variants of the extract_* methods. They yield one record at a time so callers
+    # can write results out without holding the whole document in memory. These defaults fall
+    # back to the list-based methods; formats override them to stream for real.
+    def iter_text(self) -> Iterator[Dict[str, Any]]:
+        """Yield ``{"page_number", "text"}`` records whose texts join into extract_text()."""
+        yield {"page_number": None, "text": self.extract_text()}
+
+    def text_buffer(self) -> PageTextBuffer:
+        """The document text with the character span of every page, e.g. for citations."""
+        return PageTextBuffer.from_records(self.iter_text())
+
+    def iter_images(self) -> Iterator[Dict[str, Any]]:
+        yield from self.extract_images()
+
+    def iter_urls(self) -> Iterator[Dict[str, Any]]:
+        yield from self.extract_urls()
+
+    def iter_tables(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield ``{"page_number", "rows", "bbox"}`` records, one per table.
+
+        ``bbox`` is ``(x0, top, x1, bottom)`` in points from the top-left of the page, or
+        None where the format has no fixed layout.
+        """
+        for rows in self.extract_tables():
+            yield {"page_number": None, "rows": rows, "bbox": None}
+
+    def options(self) -> Dict[str, Any]:
+        """Settings that change the extracted output; part of every cache key."""
+        return {}
+
+    @staticmethod
+    def resolve_pages(pages: Optional[Iterable[int]]) -> Optional[Tuple[int, ...]]:
+        """Validate a page selection; returns sorted unique page numbers, or None for all pages."""
+        if pages is None:
+            return None
+        if isinstance(pages, int):
+            pages = (pages,)
+        pages = tuple(sorted(set(pages)))
+        if not pages:
+            raise ValueError("Page selection is empty. Pass None to extract every page.")
+        if pages[0] < 1:
+            raise ValueError("Pages are numbered from 1.")
+        return pages
+
+    def page_numbers(self, page_count: int) -> List[int]:
+        """The selected 1-based page numbers that exist in a document of page_count pages."""
+        if self.page_selection is None:
+            return list(range(1, page_count + 1))
+        return [page_number for page_number in self.page_selection if page_number <= page_count]
+
+    @staticmethod
+    def resolve_kinds(kinds: Iterable[str]) -> Tuple[str, ...]:
+        """Validate the artifact kinds requested from extract_all."""
+        if isinstance(kinds, str):
+            kinds = (kinds,)
+        kinds = tuple(kinds)
+        for kind in kinds:
+            if kind not in ARTIFACT_KINDS:
+                raise ValueError(f"Unsupported artifact kind. Use {', '.join(ARTIFACT_KINDS)}.")
+        return kinds
+
+    def close(self):
+        """Release the parsed document held by the current session."""
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
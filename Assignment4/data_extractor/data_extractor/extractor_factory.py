@@ -0,0 +1,131 @@
+import importlib
+import os
+from typing import Any, Dict, Optional, Tuple
+from data_extractor.cache.ocr_cache import OCRCache
+from data_extractor.data_extractor.extractor import Extractor
+from data_extractor.file_loaders.document_source import DocumentSource
+from data_extractor.file_loaders.probe import probe_result
+from data_extractor.file_loaders.signatures import HEADER_SIGNATURES, OOXML_CONTENT_TYPES, sniff_format
+
+class DocumentFormat:
+    """
+    A format the extractors understand: how to recognise its files and where its classes live.
+
+    ``loader`` and ``extractor`` are ``"module:Class"`` paths imported on first use, so a
+    DOCX-only run never imports PyMuPDF, pdfplumber or the OCR stack. A format is recognised
+    by ``signature`` (bytes in the file's header) or ``content_type`` (the OOXML main part),
+    and by its ``extensions`` when the content says nothing, as for legacy ``.ppt`` files.
+    Formats with ``ocr`` get the OCR engine and cache passed to get_extractor.
+    """
+
+    def __init__(self, name: str, extensions: Tuple[str, ...], loader: str, extractor: str,
+                 signature: Optional[bytes] = None, content_type: Optional[str] = None, ocr: bool = False):
+        self.name = name
+        self.extensions = tuple(extension.lower() for extension in extensions)
+        self.loader = loader
+        self.extractor = extractor
+        self.signature = signature
+        self.content_type = content_type
+        self.ocr = ocr
+
+    def loader_class(self) -> type:
+        return _import(self.loader)
+
+    def extractor_class(self) -> type:
+        return _import(self.extractor)
+
+def _import(path: str) -> Any:
+    module_name, _, attribute = path.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+_FORMATS: Dict[str, DocumentFormat] = {}
+
+OCR_ENGINE = "data_extractor.data_extractor.ocr_engine:OCREngine"
+
+def register_format(document_format: DocumentFormat):
+    """Add a format, or replace the one registered under the same name."""
+    _FORMATS[document_format.name] = document_format
+    HEADER_SIGNATURES.pop(document_format.name, None)
+    OOXML_CONTENT_TYPES.pop(document_format.name, None)
+    if document_format.signature is not None:
+        HEADER_SIGNATURES[document_format.name] = document_format.signature
+    if document_format.content_type is not None:
+        OOXML_CONTENT_TYPES[document_format.name] = document_format.content_type
+
+def formats() -> Dict[str, DocumentFormat]:
+    return dict(_FORMATS)
+
+def supported_extensions() -> Tuple[str, ...]:
+    return tuple(extension for document_format in _FORMATS.values() for extension in document_format.extensions)
+
+def detect_format(file_path) -> Optional[DocumentFormat]:
+    """
+    The document's format from its content, falling back to a path's extension; None if unsupported.
+
+    ``file_path`` may also be anything DocumentSource accepts.
+    """
+    name = sniff_format(file_path)
+    if name in _FORMATS:
+        return _FORMATS[name]
+    path = file_path if isinstance(file_path, str) else getattr(file_path, "path", None)
+    if path is None:
+        return None
+    extension = os.path.splitext(path)[1].lower()
+    for document_format in _FORMATS.values():
+        if extension in document_format.extensions:
+            return document_format
+    return None
+
+def probe(file_path) -> Dict[str, Any]:
+    """
+    Structurally check a document with its format's loader, without extracting anything.
+
+    Unsupported and unreadable files get a record with ``error`` set rather than an exception,
+    so a large drop can be screened in one pass.
+    """
+    source = DocumentSource.of(file_path)
+    try:
+        try:
+            document_format = detect_format(source)
+        except OSError as error:
+            return probe_result(None, None, error=f"unreadable: {error.strerror or error}")
+        if document_format is None:
+            return probe_result(None, source.size, error="unsupported format")
+        return document_format.loader_class()().probe(source)
+    finally:
+        if source is not file_path:
+            source.close()
+
+def get_extractor(file_path, ocr_engine=None, ocr_cache: OCRCache = None,
+                  ocr_workers: Optional[int] = None) -> Extractor:
+    """
+    Pick the loader and extractor matching the file's content (or extension).
+
+    ``ocr_workers`` builds an OCR engine with that many workers, but only for formats
+    that OCR, so callers need not import the OCR stack for every file.
+    """
+    document_format = detect_format(file_path)
+    if document_format is None:
+        names = [name.upper() for name in _FORMATS]
+        raise ValueError(f"Unsupported file format. Use {', '.join(names[:-1])}, or {names[-1]}.")
+    options = {}
+    if document_format.ocr:
+        if ocr_engine is None and ocr_workers is not None:
+            ocr_engine = _import(OCR_ENGINE)(workers=ocr_workers)
+        options = {"ocr_engine": ocr_engine, "ocr_cache": ocr_cache}
+    return document_format.extractor_class()(document_format.loader_class()(), **options)
+
+register_format(DocumentFormat(
+    "pdf", (".pdf",), "data_extractor.file_loaders.pdf_loader:PDFLoader",
+    "data_extractor.data_extractor.pdf_extractor:PDFExtractor", signature=b"%PDF-", ocr=True
+))
+register_format(DocumentFormat(
+    "docx", (".docx",), "data_extractor.file_loaders.docx_loader:DOCXLoader",
+    "data_extractor.data_extractor.docx_extractor:DOCXExtractor",
+    content_type=OOXML_CONTENT_TYPES["docx"]
+))
+register_format(DocumentFormat(
+    "pptx", (".pptx", ".ppt"), "data_extractor.file_loaders.ppt_loader:PPTLoader",
+    "data_extractor.data_extractor.pptx_extractor:PPTXExtractor",
+    content_type=OOXML_CONTENT_TYPES["pptx"]
+))
@@ -0,0 +1,172 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from pdf2image import convert_from_path
+from PIL import Image
+import pytesseract
+from data_extractor.instrumentation import metrics
+
+# Assumed page size when turning a memory budget into a number of rendered pages (US Letter)
+_PAGE_WIDTH_INCHES = 8.5
+_PAGE_HEIGHT_INCHES = 11
+
+class OCREngine:
+    """Render and OCR PDF pages, splitting page ranges across a process pool."""
+
+    def __init__(self, workers: Optional[int] = None, dpi: int = 200, grayscale: bool = True,
+                 lang: str = "eng", oem: Optional[int] = None, psm: Optional[int] = None,
+                 pages_per_task: Optional[int] = None, window_size: Optional[int] = None,
+                 max_memory_mb: Optional[int] = None, render_to_disk: bool = False):
+        self.workers = workers or os.cpu_count() or 1
+        self.dpi = dpi
+        self.grayscale = grayscale
+        self.lang = lang
+        self.oem = oem
+        self.psm = psm
+        self.pages_per_task = pages_per_task
+        # Each worker keeps at most window_size rendered pages alive; with render_to_disk the
+        # window is written to a temporary folder and only one page is decoded at a time
+        self.window_size = window_size
+        self.max_memory_mb = max_memory_mb
+        self.render_to_disk = render_to_disk
+
+    def tesseract_config(self) -> str:
+        """Build the extra command line options passed to tesseract."""
+        options = []
+        if self.oem is not None:
+            options.append(f"--oem {self.oem}")
+        if self.psm is not None:
+            options.append(f"--psm {self.psm}")
+        return " ".join(options)
+
+    def settings(self) -> Dict[str, object]:
+        """Rendering and recognition settings shipped to every worker."""
+        return {
+            "dpi": self.dpi,
+            "grayscale": self.grayscale,
+            "lang": self.lang,
+            "config": self.tesseract_config(),
+            "window_size": self.window_pages(),
+            "render_to_disk": self.render_to_disk
+        }
+
+    def window_pages(self) -> int:
+        """Number of pages a single worker may hold rendered in memory at once."""
+        if self.window_size:
+            return self.window_size
+        if not self.max_memory_mb:
+            return 4
+        channels = 1 if self.grayscale else 3
+        page_bytes = (_PAGE_WIDTH_INCHES * self.dpi) * (_PAGE_HEIGHT_INCHES * self.dpi) * channels
+        # Tesseract keeps its own copy of the page while recognising it
+        budget_per_worker = self.max_memory_mb * 1024 * 1024 / self.workers
+        return max(1, int(budget_per_worker // (page_bytes * 2)))
+
+    def ocr_pages(self, file_path: str, page_numbers: Sequence[int]) -> Dict[int, str]:
+        """OCR the given 1-based pages and return their text keyed by page number, in page order."""
+        tasks = self.split_ranges(page_numbers)
+        if not tasks:
+            return {}
+
+        settings = self.settings()
+        results: List[Tuple[int, str]] = []
+        if self.workers == 1 or len(tasks) == 1:
+            # Not worth paying for a process pool
+            for first_page, last_page in tasks:
+                results.extend(_ocr_page_range(file_path, first_page, last_page, settings))
+        else:
+            collect_metrics = metrics.enabled()
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)),
+                                     initializer=_init_worker) as executor:
+                futures = [executor.submit(_ocr_worker_task, file_path, first_page, last_page, settings,
+                                           collect_metrics)
+                           for first_page, last_page in tasks]
+                # Futures are consumed in submission order so results come back in page order
+                for future in futures:
+                    task_results, snapshot = future.result()
+                    results.extend(task_results)
+                    if snapshot is not None and metrics.enabled():
+                        metrics.get_recorder().merge(snapshot)
+
+        return dict(results)
+
+    def split_ranges(self, page_numbers: Sequence[int]) -> List[Tuple[int, int]]:
+        """Group pages into contiguous (first_page, last_page) tasks of bounded length."""
+        pages = sorted(set(page_numbers))
+        if not pages:
+            return []
+
+        chunk = self.pages_per_task
+        if not chunk:
+            # Several tasks per worker keep the pool busy when some pages are slower than others
+            chunk = len(pages) if self.workers == 1 else max(1, -(-len(pages) // (self.workers * 4)))
+        tasks = []
+        first_page = last_page = pages[0]
+        for page_number in pages[1:]:
+            if page_number == last_page + 1 and page_number - first_page < chunk:
+                last_page = page_number
+                continue
+            tasks.append((first_page, last_page))
+            first_page = last_page = page_number
+        tasks.append((first_page, last_page))
+        return tasks
+
+def _init_worker():
+    # Tesseract is already parallelised across processes, so keep each one single-threaded
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+def _ocr_worker_task(file_path: str, first_page: int, last_page: int, settings: Dict[str, object],
+                     collect_metrics: bool) -> Tuple[List[Tuple[int, str]], Optional[Dict[str, object]]]:
+    """Run _ocr_page_range in a pool worker, returning its stage timings for the parent to merge."""
+    if not collect_metrics:
+        metrics.disable()
+        return _ocr_page_range(file_path, first_page, last_page, settings), None
+    # A fresh recorder so nothing inherited from the parent is counted twice
+    recorder = metrics.enable()
+    try:
+        return _ocr_page_range(file_path, first_page, last_page, settings), recorder.snapshot()
+    finally:
+        metrics.disable()
+
+def _ocr_page_range(file_path: str, first_page: int, last_page: int,
+                    settings: Dict[str, object]) -> List[Tuple[int, str]]:
+    """Render pages first_page..last_page of a PDF and OCR each of them."""
+    results = []
+    for page_number, image in _iter_page_images(file_path, first_page, last_page, settings):
+        with metrics.stage("tesseract"):
+            text = pytesseract.image_to_string(image, lang=settings["lang"], config=settings["config"])
+        results.append((page_number, text))
+    return results
+
+def _iter_page_images(file_path: str, first_page: int, last_page: int,
+                      settings: Dict[str, object]) -> Iterator[Tuple[int, Image.Image]]:
+    """Yield rendered pages one window at a time so memory does not grow with the page count."""
+    window = settings["window_size"]
+    for window_first in range(first_page, last_page + 1, window):
+        window_last = min(window_first + window - 1, last_page)
+        options = {
+            "dpi": settings["dpi"],
+            "first_page": window_first,
+            "last_page": window_last,
+            "grayscale": settings["grayscale"],
+            "thread_count": 1
+        }
+        if settings["render_to_disk"]:
+            with tempfile.TemporaryDirectory() as output_folder:
+                with metrics.stage("render", output="disk"):
+                    paths = convert_from_path(file_path, output_folder=output_folder, paths_only=True,
+                                              fmt="png", **options)
+                for offset, path in enumerate(paths):
+                    with Image.open(path) as image:
+                        yield window_first + offset, image
+                    os.remove(path)
+        else:
+            with metrics.stage("render", output="memory"):
+                images = convert_from_path(file_path, **options)
+            # Hand pages out back to front of the list so each one is released once OCRed
+            images.reverse()
+            page_number = window_first
+            while images:
+                yield page_number, images.pop()
+                page_number += 1
@@ -1,78 +1,496 @@
-from typing import Any, Dict, List
+import hashlib
+import json
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 import fitz
-from pdf2image import convert_from_path
 import pdfplumber
-import pytesseract
-from data_extractor.data_extractor.extractor import Extractor
+from data_extractor.cache.ocr_cache import OCRCache
+from data_extractor.data_extractor.document_session import DocumentSession
+from data_extractor.data_extractor.extractor import ARTIFACT_KINDS, Extractor
+from data_extractor.data_extractor.ocr_engine import OCREngine
+from data_extractor.data_extractor.text_buffer import PageTextBuffer
+from data_extractor.instrumentation import metrics
+
+# pdfplumber strategies whose tables are built only from drawn edges; the pre-filter is exact for these
+_LINE_STRATEGIES = ("lines", "lines_strict")
+
+# Stream filters PyMuPDF hands back unchanged, by extension; every other image is returned as PNG
+_IMAGE_FILTER_EXTENSIONS = {"DCTDecode": "jpeg", "JPXDecode": "jpx", "JBIG2Decode": "jb2"}
 
 class PDFExtractor(Extractor):
-    def __init__(self, loader):
+    TEXT_MODES = ("hybrid", "ocr", "text")
+
+    def __init__(self, loader, text_mode: str = "hybrid", min_text_chars: int = 25,
+                 max_garbage_ratio: float = 0.3, max_image_coverage: float = 0.6,
+                 ocr_engine: OCREngine = None, ocr_cache: OCRCache = None,
+                 table_settings: Optional[Dict[str, Any]] = None, table_prefilter: bool = True,
+                 table_workers: int = 1, min_image_width: int = 0, min_image_height: int = 0,
+                 image_formats: Optional[Iterable[str]] = None, image_metadata_only: bool = False):
+        if text_mode not in self.TEXT_MODES:
+            raise ValueError(f"Unsupported text mode. Use one of {', '.join(self.TEXT_MODES)}.")
+        if table_workers < 1:
+            raise ValueError("table_workers must be at least 1.")
         self.loader = loader
         self.file = None
         self.file_path = None
+        self.text_mode = text_mode
+        # Thresholds used to decide whether a page's embedded text layer can be trusted
+        self.min_text_chars = min_text_chars
+        self.max_garbage_ratio = max_garbage_ratio
+        self.max_image_coverage = max_image_coverage
+        self.ocr_engine = ocr_engine or OCREngine()
+        self.ocr_cache = ocr_cache
+        # Passed to pdfplumber's find_tables; see its TableSettings for the keys
+        self.table_settings = dict(table_settings or {})
+        # Skip pages whose drawings cannot form a table before pdfplumber parses them
+        self.table_prefilter = table_prefilter
+        # Processes pdfplumber table detection is spread over; 1 runs it in this process
+        self.table_workers = table_workers
+        # Images smaller than this (in pixels) or in other formats are skipped before they are extracted
+        self.min_image_width = min_image_width
+        self.min_image_height = min_image_height
+        self.image_formats = None
+        if image_formats is not None:
+            self.image_formats = sorted({"jpeg" if ext.lower() == "jpg" else ext.lower() for ext in image_formats})
+        # Report images from the PDF's object table only, without decoding or copying their bytes
+        self.image_metadata_only = image_metadata_only
 
-    def load(self, file_path):
+    def load(self, file_path, pages=None):
         """Load the file using the appropriate loader based on file type."""
-        self.file = self.loader.load_file(file_path)
-        self.file_path = file_path 
+        self.close()
+        self.page_selection = self.resolve_pages(pages)
+        self.session = DocumentSession(file_path, self.loader)
+        self.file = self.session.document
+        self.file_path = self.session.file_path
         
+    def options(self) -> Dict[str, Any]:
+        options = {
+            "text_mode": self.text_mode,
+            "min_text_chars": self.min_text_chars,
+            "max_garbage_ratio": self.max_garbage_ratio,
+            "max_image_coverage": self.max_image_coverage,
+            "table_settings": self.table_settings,
+            "min_image_width": self.min_image_width,
+            "min_image_height": self.min_image_height,
+            "image_formats": self.image_formats,
+            "image_metadata_only": self.image_metadata_only
+        }
+        options.update({"ocr_" + name: value for name, value in self._ocr_settings().items()})
+        return options
+
+    def _ocr_settings(self) -> Dict[str, Any]:
+        # Worker count and memory settings do not change the recognised text
+        return {name: value for name, value in self.ocr_engine.settings().items()
+                if name not in ("window_size", "render_to_disk")}
+
+    def fitz_document(self) -> fitz.Document:
+        """PyMuPDF handle for the loaded file, opened once per session."""
+        return self.session.handle("fitz", self._open_fitz)
+
+    def _open_fitz(self) -> fitz.Document:
+        source = self.session.source
+        # PyMuPDF only takes a bytes stream, so a file keeps being opened (and paged in by MuPDF) by path
+        if source.path is not None:
+            return fitz.open(source.path)
+        return fitz.open(stream=source.as_bytes(), filetype="pdf")
+
+    def plumber_document(self) -> pdfplumber.PDF:
+        """pdfplumber handle for the loaded file, opened once per session; it only has the selected pages."""
+        pages = list(self.page_selection) if self.page_selection else None
+        return self.session.handle("pdfplumber",
+                                   lambda: pdfplumber.open(self.session.source.stream(), pages=pages))
+
+    def selected_page_numbers(self) -> List[int]:
+        """1-based numbers of the pages to extract."""
+        return self.page_numbers(len(self.fitz_document()))
+
     def extract_text(self):
-        
-        pages = convert_from_path(self.file_path)
-        text = ""
+        """Extract text, preferring the embedded text layer and OCRing only where needed."""
+        return self.text_buffer().getvalue()
+
+    def text_buffer(self) -> PageTextBuffer:
+        # All rejected pages are OCRed in one call so the engine can spread them over its workers
+        return PageTextBuffer.from_records(self.extract_text_pages())
+
+    def extract_text_pages(self) -> List[Dict[str, Any]]:
+        """
+        Extract text page by page and report which path produced each page.
+
+        Every record has ``page_number``, ``text``, ``method`` ('text_layer' or 'ocr')
+        and ``reason`` explaining why that method was chosen.
+        """
+        return list(self.iter_text(block_pages=None))
+
+    def iter_text(self, block_pages: Optional[int] = 64) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the records of extract_text_pages one page at a time, in page order.
+
+        Pages needing OCR are recognised together a block of ``block_pages`` pages at a
+        time, so the OCR engine still works in parallel while memory stays bounded.
+        Pass None to treat the whole document as one block.
+        """
+        pdf_document = self.fitz_document()
+        block = []
+        for page_number in self.selected_page_numbers():
+            block.append(self._page_text(pdf_document.load_page(page_number - 1), page_number))
+            if block_pages and len(block) >= block_pages:
+                yield from self._ocr_rejected_pages(block)
+                block = []
+        yield from self._ocr_rejected_pages(block)
+
+    def extract_all(self, kinds=ARTIFACT_KINDS) -> Dict[str, Any]:
+        """Extract the requested artifact kinds in a single pass over the pages."""
+        kinds = self.resolve_kinds(kinds)
+        pdf_document = self.fitz_document()
+        # Table detection runs inline during the page walk unless it is spread over processes
+        inline_tables = "tables" in kinds and self.table_workers == 1
+        plumber_pages = None
+        if inline_tables:
+            plumber_pages = {page.page_number: page for page in self.plumber_document().pages}
+        result = {"page_count": len(pdf_document)}
+        pages, images, urls, tables = [], [], [], []
+        seen_xrefs = {}
+
+        for page_number in self.selected_page_numbers():
+            page = pdf_document.load_page(page_number - 1)
+            if "text" in kinds:
+                pages.append(self._page_text(page, page_number))
+            if "images" in kinds:
+                images.extend(self._iter_page_images(pdf_document, page, page_number, seen_xrefs))
+            if "urls" in kinds:
+                urls.extend(self._page_urls(self.file.pages[page_number - 1], page_number))
+            if inline_tables and self._may_hold_table(page):
+                tables.extend(self._table_records(plumber_pages[page_number]))
+
+        if "text" in kinds:
+            result["pages"] = self._ocr_rejected_pages(pages)
+            text = PageTextBuffer.from_records(result["pages"])
+            result["text"] = text.getvalue()
+            result["page_spans"] = text.page_spans
+        if "images" in kinds:
+            result["images"] = self._share_repeated_bytes(images)
+        if "urls" in kinds:
+            result["urls"] = urls
+        if "tables" in kinds:
+            result["tables"] = tables if inline_tables else list(self.iter_tables())
+        return result
+
+    def _page_text(self, page, page_number: int) -> Dict[str, Any]:
+        """Read one page's text layer and decide whether it has to be OCRed instead."""
+        if self.text_mode == "ocr":
+            text, usable, reason = "", False, "ocr mode"
+        else:
+            with metrics.stage("text_layer", format="pdf"):
+                text = page.get_text("text")
+                usable, reason = self._text_layer_usable(text, self._image_coverage(page))
+            if self.text_mode == "text":
+                usable = True
+        return {
+            "page_number": page_number,
+            "text": text if usable else "",
+            "method": "text_layer" if usable else "ocr",
+            "reason": reason
+        }
+
+    def _ocr_rejected_pages(self, pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Rasterize and OCR only the pages whose text layer was rejected
+        page_numbers = [page["page_number"] for page in pages if page["method"] == "ocr"]
+        metrics.count("pages_processed", len(pages) - len(page_numbers), format="pdf", method="text_layer")
+        metrics.count("pages_processed", len(page_numbers), format="pdf", method="ocr")
+        if not page_numbers:
+            return pages
+        with metrics.stage("ocr", format="pdf"):
+            if self.ocr_cache is None:
+                ocr_text = self.ocr_engine.ocr_pages(self.session.source.local_path(), page_numbers)
+            else:
+                ocr_text = self._cached_ocr(page_numbers)
         for page in pages:
-            # Use pytesseract to extract text from the image
-            text += pytesseract.image_to_string(page, lang='eng')  # Change 'eng' to the appropriate language code if needed
-        return text
+            if page["method"] == "ocr":
+                page["text"] = ocr_text.get(page["page_number"], "")
+        return pages
+
+    def _cached_ocr(self, page_numbers: List[int]) -> Dict[int, str]:
+        """OCR pages through the page cache so identical pages are recognised only once."""
+        pdf_document = self.fitz_document()
+        settings = json.dumps(self._ocr_settings(), sort_keys=True)
+        keys = {page_number: self._page_key(pdf_document, page_number, settings) for page_number in page_numbers}
+        # Repeated pages (cover sheets, blank scans) are recognised once per document
+        first_pages = {}
+        for page_number, key in keys.items():
+            first_pages.setdefault(key, page_number)
+        texts = self.ocr_cache.get_many(first_pages)
+
+        missing = {key: page_number for key, page_number in first_pages.items() if key not in texts}
+        recognised = self.ocr_engine.ocr_pages(self.session.source.local_path(), list(missing.values()))
+        recognised = {key: recognised.get(page_number, "") for key, page_number in missing.items()}
+        self.ocr_cache.put_many(recognised)
+        texts.update(recognised)
+        return {page_number: texts[key] for page_number, key in keys.items()}
+
+    @staticmethod
+    def _page_key(pdf_document, page_number: int, settings: str) -> str:
+        """
+        Hash what a page renders from without rasterizing it.
+
+        Scanned pages usually share an identical content stream that only draws an image,
+        so the raw streams of every image and form XObject on the page are hashed too.
+        """
+        page = pdf_document.load_page(page_number - 1)
+        digest = hashlib.sha256(settings.encode())
+        digest.update(f"{tuple(page.rect)}:{page.rotation}".encode())
+        digest.update(page.read_contents())
+        xrefs = [image[0] for image in page.get_images(full=True)]
+        xrefs += [xobject[0] for xobject in page.get_xobjects()]
+        for xref in xrefs:
+            digest.update(pdf_document.xref_stream_raw(xref) or b"")
+        return digest.hexdigest()
+
+    def _text_layer_usable(self, text: str, image_coverage: float):
+        """Decide whether a page's native text is good enough to skip OCR."""
+        visible = [char for char in text if not char.isspace()]
+        if len(visible) < self.min_text_chars:
+            return False, f"only {len(visible)} characters in text layer"
+
+        garbage = sum(1 for char in visible if self._is_garbage_char(char))
+        garbage_ratio = garbage / len(visible)
+        if garbage_ratio > self.max_garbage_ratio:
+            return False, f"garbage ratio {garbage_ratio:.2f}"
+
+        # A page mostly covered by images with only a thin text layer is likely a scan
+        # with a stray caption or header, so its text layer is not representative
+        if image_coverage > self.max_image_coverage and len(visible) < self.min_text_chars * 4:
+            return False, f"image coverage {image_coverage:.2f}"
+        return True, "text layer usable"
+
+    @staticmethod
+    def _is_garbage_char(char: str) -> bool:
+        # Replacement, control, private-use and unassigned characters point to a broken font mapping
+        return char == "\ufffd" or unicodedata.category(char) in ("Cc", "Co", "Cn")
+
+    @staticmethod
+    def _image_coverage(page) -> float:
+        """Fraction of the page area covered by images."""
+        page_rect = page.rect
+        page_area = abs(page_rect)
+        if not page_area:
+            return 0.0
+        covered = 0.0
+        for image_info in page.get_image_info():
+            covered += abs(fitz.Rect(image_info["bbox"]) & page_rect)
+        return min(covered / page_area, 1.0)
 
     def extract_images(self):
-        images = []
         # PDF image extraction
-        pdf_document = fitz.open(self.file_path)
-        for page_num in range(len(pdf_document)):
-            page = pdf_document.load_page(page_num)
-            image_list = page.get_images(full=True)
-            for img in image_list:
-                xref = img[0]
+        return self._share_repeated_bytes(list(self.iter_images()))
+
+    def iter_images(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield image records one at a time, in page order.
+
+        An image object shown on several pages is extracted once: its first occurrence
+        carries ``image_data`` and later ones only repeat its ``sha256`` and metadata.
+        With ``image_metadata_only`` no record carries bytes; ``stream_sha256`` hashes
+        the image's stream as stored in the PDF instead.
+        """
+        pdf_document = self.fitz_document()
+        seen_xrefs = {}
+        for page_number in self.selected_page_numbers():
+            page = pdf_document.load_page(page_number - 1)
+            yield from self._iter_page_images(pdf_document, page, page_number, seen_xrefs)
+
+    def extract_unique_images(self) -> List[Dict[str, Any]]:
+        """
+        One record per image object, with every page it is shown on in ``pages``.
+
+        This is the cheap way to inventory image-heavy PDFs: a logo on 500 pages is
+        one record, extracted once, and with ``image_metadata_only`` nothing is decoded.
+        """
+        unique = {}
+        for image in self.iter_images():
+            if image["xref"] in unique:
+                unique[image["xref"]]["pages"].append(image["page"])
+                continue
+            record = dict(image, pages=[image["page"]])
+            del record["page"]
+            unique[image["xref"]] = record
+        return list(unique.values())
+
+    def _iter_page_images(self, pdf_document, page, page_number: int,
+                          seen_xrefs: Dict[int, Optional[Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        # Filtered-out images are remembered as None so they are not checked again on later pages
+        for xref, _, width, height, _, _, _, _, image_filter, *_ in page.get_images(full=True):
+            if xref in seen_xrefs:
+                # An image object reused on many pages (logos, headers) is decoded and hashed only once
+                if seen_xrefs[xref] is not None:
+                    yield dict(seen_xrefs[xref], page=page_number)
+                continue
+            ext = _IMAGE_FILTER_EXTENSIONS.get(image_filter, "png")
+            if (width < self.min_image_width or height < self.min_image_height
+                    or (self.image_formats is not None and ext not in self.image_formats)):
+                seen_xrefs[xref] = None
+                metrics.count("images_skipped", format="pdf")
+                continue
+            if self.image_metadata_only:
+                image = {
+                    "ext": ext,
+                    "page": page_number,
+                    "dimensions": (width, height),
+                    "xref": xref,
+                    "stream_sha256": hashlib.sha256(pdf_document.xref_stream_raw(xref) or b"").hexdigest()
+                }
+                seen_xrefs[xref] = image
+                yield dict(image)
+                continue
+            with metrics.stage("images", format="pdf"):
                 base_image = pdf_document.extract_image(xref)
-                image_bytes = base_image["image"]
-                image_ext = base_image["ext"]
-                width, height = base_image["width"], base_image["height"]
-                images.append({
-                    "image_data": image_bytes,
-                    "ext": image_ext,
-                    "page": page_num + 1,
-                    "dimensions": (width, height)
-                })
-        pdf_document.close()
+            image = {
+                "ext": base_image["ext"],
+                "page": page_number,
+                "dimensions": (base_image["width"], base_image["height"]),
+                "xref": xref,
+                "sha256": hashlib.sha256(base_image["image"]).hexdigest()
+            }
+            seen_xrefs[xref] = image
+            yield dict(image, image_data=base_image["image"])
+
+    @staticmethod
+    def _share_repeated_bytes(images: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Give repeated occurrences of an image the bytes of its first occurrence (no copy)."""
+        image_data = {}
+        for image in images:
+            if "image_data" in image:
+                image_data[image["sha256"]] = image["image_data"]
+            elif image.get("sha256") in image_data:
+                image["image_data"] = image_data[image["sha256"]]
         return images
 
     def extract_urls(self) -> List[Dict[str, Any]]:
         """Extract hyperlinks from a PDF file."""
+        return list(self.iter_urls())
+
+    def iter_urls(self) -> Iterator[Dict[str, Any]]:
+        for page_number in self.selected_page_numbers():
+            yield from self._page_urls(self.file.pages[page_number - 1], page_number)
+
+    @staticmethod
+    def _page_urls(page, page_number: int) -> List[Dict[str, Any]]:
         extracted_links = []
-        for page_num, page in enumerate(self.file.pages, start=1):
-            # Extract annotations from the page
-            if '/Annots' in page:
-                annotations = page['/Annots']
-                for annot in annotations:
-                    annot_obj = annot.get_object()  # Get the annotation object
-                    # Check if the annotation object has the expected structure
-                    if '/A' in annot_obj and '/URI' in annot_obj['/A']:
-                        link = annot_obj['/A']['/URI']
-                        extracted_links.append({                            
-                            "linked_text": link,  # You can also extract the text if needed
-                            "url": link,
-                            "page_number": page_num
-                        })
+        # Extract annotations from the page
+        if '/Annots' in page:
+            annotations = page['/Annots']
+            for annot in annotations:
+                annot_obj = annot.get_object()  # Get the annotation object
+                # Check if the annotation object has the expected structure
+                if '/A' in annot_obj and '/URI' in annot_obj['/A']:
+                    link = annot_obj['/A']['/URI']
+                    extracted_links.append({
+                        "linked_text": link,  # You can also extract the text if needed
+                        "url": link,
+                        "page_number": page_number
+                    })
         return extracted_links
 
     def extract_tables(self):
-        tables = []
-        # Extract tables from PDF
-        with pdfplumber.open(self.file_path) as pdf:
-            for page in pdf.pages:
-                # Extract tables from each page
-                page_tables = page.extract_tables()
-                for table in page_tables:
-                    tables.append(table)  # Each table is a list of lists
-        return tables
\ No newline at end of file
+        # Extract tables from PDF; each table is a list of lists
+        return [table["rows"] for table in self.iter_tables()]
+
+    def iter_tables(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield ``{"page_number", "rows", "bbox"}`` for every table, in page order.
+
+        ``bbox`` is ``(x0, top, x1, bottom)`` in PDF points from the top-left of the page.
+        """
+        page_numbers = self.table_page_numbers()
+        if self.table_workers > 1 and len(page_numbers) > 1:
+            yield from self._parallel_table_records(page_numbers)
+            return
+
+        candidates = set(page_numbers)
+        for page in self.plumber_document().pages:
+            if page.page_number not in candidates:
+                continue
+            yield from self._table_records(page)
+            # Drop the page's parsed objects so memory does not grow with the page count
+            page.close()
+
+    def table_page_numbers(self) -> List[int]:
+        """Selected pages that may hold a table; the others never reach pdfplumber."""
+        pdf_document = self.fitz_document()
+        return [page_number for page_number in self.selected_page_numbers()
+                if self._may_hold_table(pdf_document.load_page(page_number - 1))]
+
+    def _prefilter_applies(self) -> bool:
+        # Text-based or explicit strategies find tables without drawn edges, so no page can be ruled out
+        return (self.table_prefilter
+                and self.table_settings.get("vertical_strategy", "lines") in _LINE_STRATEGIES
+                and self.table_settings.get("horizontal_strategy", "lines") in _LINE_STRATEGIES
+                and not self.table_settings.get("explicit_vertical_lines")
+                and not self.table_settings.get("explicit_horizontal_lines"))
+
+    def _may_hold_table(self, page) -> bool:
+        """
+        Cheap check, on PyMuPDF's vector drawings, whether pdfplumber could find a table on a page.
+
+        pdfplumber builds tables from the edges of lines, rectangles and curves and drops tables
+        of a single cell, so it needs at least two horizontal and two vertical edges and five in
+        all. Segments are counted the way pdfplumber orients them: only exactly flat lines are
+        horizontal, and rectangles and curves count towards both orientations.
+        """
+        if not self._prefilter_applies():
+            return True
+        with metrics.stage("table_prefilter", format="pdf"):
+            horizontal = vertical = 0
+            for path in page.get_cdrawings():
+                for item in path["items"]:
+                    if item[0] == "l":
+                        if item[1][1] == item[2][1]:
+                            horizontal += 1
+                        else:
+                            vertical += 1
+                    elif item[0] in ("re", "qu"):
+                        horizontal += 2
+                        vertical += 2
+                    else:
+                        horizontal += 1
+                        vertical += 1
+                    if horizontal >= 2 and vertical >= 2 and horizontal + vertical >= 5:
+                        return True
+        metrics.count("pages_skipped", 1, format="pdf", stage="tables")
+        return False
+
+    def _table_records(self, page) -> List[Dict[str, Any]]:
+        with metrics.stage("tables", format="pdf"):
+            return _page_table_records(page, self.table_settings)
+
+    def _parallel_table_records(self, page_numbers: List[int]) -> Iterator[Dict[str, Any]]:
+        workers = min(self.table_workers, len(page_numbers))
+        # A few tasks per worker keep every process busy when some pages hold many tables
+        size = max(1, -(-len(page_numbers) // (workers * 4)))
+        chunks = [page_numbers[start:start + size] for start in range(0, len(page_numbers), size)]
+        # Worker processes cannot share the buffer; an in-memory document is spilled to a file once
+        file_path = self.session.source.local_path()
+        with metrics.stage("tables", format="pdf", workers=workers), \
+                ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_table_records_task, file_path, chunk, self.table_settings)
+                       for chunk in chunks]
+            # Futures are consumed in submission order so tables come back in page order
+            for future in futures:
+                yield from future.result()
+
+def _page_table_records(page, table_settings: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Find the tables of one pdfplumber page, like page.extract_tables() but with their bboxes."""
+    settings = pdfplumber.table.TableSettings.resolve(table_settings)
+    return [{"page_number": page.page_number, "rows": table.extract(**(settings.text_settings or {})),
+             "bbox": tuple(table.bbox)}
+            for table in page.find_tables(settings)]
+
+def _table_records_task(file_path: str, page_numbers: List[int],
+                        table_settings: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Extract the tables of some pages in a pool worker, which opens its own pdfplumber handle."""
+    with pdfplumber.open(file_path, pages=page_numbers) as pdf:
+        records = []
+        for page in pdf.pages:
+            records.extend(_page_table_records(page, table_settings))
+            page.close()
+        return records
@@ -1,5 +1,11 @@
-from typing import Any, Dict, List
-from data_extractor.data_extractor.extractor import Extractor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from data_extractor.data_extractor.document_session import DocumentSession
+from data_extractor.data_extractor.extractor import ARTIFACT_KINDS, Extractor
+from data_extractor.data_extractor.text_buffer import PageTextBuffer
+from data_extractor.instrumentation import metrics
+
+# Slide positions are in English Metric Units; bboxes are reported in points like PDF ones
+EMU_PER_POINT = 12700
 
 class PPTXExtractor(Extractor):
     def __init__(self, loader):
@@ -7,52 +13,63 @@ class PPTXExtractor(Extractor):
         self.file = None
         self.file_path = None
         
-    def load(self, file_path):
+    def load(self, file_path, pages=None):
         """Load the file using the appropriate loader based on file type."""
-        self.file = self.loader.load_file(file_path)
-        self.file_path = file_path 
+        self.close()
+        self.page_selection = self.resolve_pages(pages)
+        self.session = DocumentSession(file_path, self.loader)
+        self.file = self.session.document
+        self.file_path = self.session.file_path
+
+    def selected_slides(self) -> Iterator[Tuple[int, Any]]:
+        """Yield (slide number, slide) for the selected slides; the others are never touched."""
+        slides = self.file.slides
+        for slide_num in self.page_numbers(len(slides)):
+            yield slide_num, slides[slide_num - 1]
 
     def extract_text(self):
         # Extract text from PPTX
-        ppt = self.loader.load_file(self.file_path)
-        text = ""
+        return self.text_buffer().getvalue()
 
+    def iter_text(self) -> Iterator[Dict[str, Any]]:
+        """Yield the text of each slide."""
         # Extract text from shapes
-        for slide in ppt.slides:
+        for slide_num, slide in self.selected_slides():
+            slide_text = []
             for shape in slide.shapes:
                 if hasattr(shape, "text"):
-                    text += shape.text + "\n"
+                    slide_text.append(shape.text + "\n")
 
                 # Extract text from tables within shapes
                 if shape.has_table:
                     for row in shape.table.rows:
                         row_text = "\t".join(cell.text.strip() for cell in row.cells)
-                        text += row_text + "\n"
-
-        return text
+                        slide_text.append(row_text + "\n")
+            yield {"page_number": slide_num, "text": "".join(slide_text)}
 
     def extract_images(self):
-        images = []
+        return list(self.iter_images())
+
+    def iter_images(self) -> Iterator[Dict[str, Any]]:
         # PPTX image extraction
-        ppt = self.loader.load_file(self.file_path)
-        # Extract images
-        for slide_num, slide in enumerate(ppt.slides):
+        for slide_num, slide in self.selected_slides():
             for shape in slide.shapes:
                 if shape.shape_type == 13:  # Picture type
                     image_stream = shape.image.blob
                     image_ext = shape.image.ext
-                    images.append({
+                    yield {
                         "image_data": image_stream,
                         "ext": image_ext,
-                        "page": slide_num + 1,
-                    })
-        return images
+                        "page": slide_num,
+                    }
 
     def extract_urls(self) -> List[Dict[str, Any]]:
         """Extract hyperlinks from a PPTX file."""
-        extracted_links = []
+        return list(self.iter_urls())
+
+    def iter_urls(self) -> Iterator[Dict[str, Any]]:
         # Loop through each slide in the presentation
-        for slide_num, slide in enumerate(self.file.slides, start=1):
+        for slide_num, slide in self.selected_slides():
             # Loop through each shape in the slide
             for shape in slide.shapes:
                 # Check if the shape has a text frame and it is not None
@@ -63,18 +80,18 @@ class PPTXExtractor(Extractor):
                         for run in paragraph.runs:
                             # Check if the run has a hyperlink and get the link address
                             if run.hyperlink and run.hyperlink.address:
-                                extracted_links.append({
+                                yield {
                                     "linked_text": run.text,  # Get the text of the hyperlink
                                     "url": run.hyperlink.address,  # Get the hyperlink address
                                     "page_number": slide_num  # Get the slide number
-                                })
-        return extracted_links
+                                }
 
     def extract_tables(self):
-        tables=[]
         # Extract tables from PPTX (typically tables are part of shapes)
-        ppt = self.loader.load_file(self.file_path)
-        for slide in ppt.slides:
+        return [table["rows"] for table in self.iter_tables()]
+
+    def iter_tables(self) -> Iterator[Dict[str, Any]]:
+        for slide_num, slide in self.selected_slides():
             for shape in slide.shapes:
                 if shape.has_table:  # Check if the shape contains a table
                     table_content = []
@@ -82,5 +99,69 @@ class PPTXExtractor(Extractor):
                     for row in table.rows:
                         row_data = [cell.text_frame.text.strip() if cell.text_frame else '' for cell in row.cells]
                         table_content.append(row_data)
-                    tables.append(table_content)
-        return tables
\ No newline at end of file
+                    yield {"page_number": slide_num, "rows": table_content, "bbox": _shape_bbox(shape)}
+
+    def extract_all(self, kinds=ARTIFACT_KINDS) -> Dict[str, Any]:
+        """Extract the requested artifact kinds visiting every slide and shape once."""
+        kinds = self.resolve_kinds(kinds)
+        slides = self.file.slides
+        result = {"page_count": len(slides)}
+        metrics.count("pages_processed", len(self.page_numbers(len(slides))), format="pptx")
+        pages, images, links, tables = [], [], [], []
+
+        for slide_num, slide in self.selected_slides():
+            slide_text = []
+            for shape in slide.shapes:
+                if "text" in kinds and hasattr(shape, "text"):
+                    slide_text.append(shape.text + "\n")
+
+                if "images" in kinds and shape.shape_type == 13:  # Picture type
+                    images.append({
+                        "image_data": shape.image.blob,
+                        "ext": shape.image.ext,
+                        "page": slide_num,
+                    })
+
+                if "urls" in kinds and hasattr(shape, "text_frame") and shape.text_frame is not None:
+                    for paragraph in shape.text_frame.paragraphs:
+                        for run in paragraph.runs:
+                            if run.hyperlink and run.hyperlink.address:
+                                links.append({
+                                    "linked_text": run.text,
+                                    "url": run.hyperlink.address,
+                                    "page_number": slide_num
+                                })
+
+                if ("text" in kinds or "tables" in kinds) and shape.has_table:
+                    table_content = []
+                    for row in shape.table.rows:
+                        if "text" in kinds:
+                            slide_text.append("\t".join(cell.text.strip() for cell in row.cells) + "\n")
+                        if "tables" in kinds:
+                            table_content.append([cell.text_frame.text.strip() if cell.text_frame else ''
+                                                  for cell in row.cells])
+                    if "tables" in kinds:
+                        tables.append({"page_number": slide_num, "rows": table_content, "bbox": _shape_bbox(shape)})
+
+            if "text" in kinds:
+                pages.append({"page_number": slide_num, "text": "".join(slide_text)})
+
+        if "text" in kinds:
+            result["pages"] = pages
+            text = PageTextBuffer.from_records(pages)
+            result["text"] = text.getvalue()
+            result["page_spans"] = text.page_spans
+        if "images" in kinds:
+            result["images"] = images
+        if "urls" in kinds:
+            result["urls"] = links
+        if "tables" in kinds:
+            result["tables"] = tables
+        return result
+
+def _shape_bbox(shape) -> Optional[Tuple[float, float, float, float]]:
+    """``(x0, top, x1, bottom)`` of a shape in points, or None if it inherits its position."""
+    if None in (shape.left, shape.top, shape.width, shape.height):
+        return None
+    return (shape.left / EMU_PER_POINT, shape.top / EMU_PER_POINT,
+            (shape.left + shape.width) / EMU_PER_POINT, (shape.top + shape.height) / EMU_PER_POINT)
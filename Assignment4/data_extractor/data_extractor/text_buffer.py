@@ -0,0 +1,62 @@
+from bisect import bisect_right
+from typing import Any, Dict, Iterable, List, Optional
+
+class PageTextBuffer:
+    """
+    Collect a document's text piece by piece and remember which characters came from which page.
+
+    Pieces are kept in a list and joined once, so building the text is linear in its length
+    no matter how many pieces there are. Every page gets a ``{"page_number", "start", "end"}``
+    span into the joined text; consecutive pieces from the same page share one span.
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._length = 0
+        self._spans: List[Dict[str, Any]] = []
+        self._starts: List[int] = []
+        self._text: Optional[str] = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "PageTextBuffer":
+        """Build a buffer from ``{"page_number", "text"}`` records such as Extractor.iter_text yields."""
+        buffer = cls()
+        for record in records:
+            buffer.append(record["text"], record.get("page_number"))
+        return buffer
+
+    def append(self, text: str, page_number: Optional[int] = None):
+        if not text and self._spans and self._spans[-1]["page_number"] == page_number:
+            return
+        start = self._length
+        self._parts.append(text)
+        self._length += len(text)
+        self._text = None
+        if self._spans and self._spans[-1]["page_number"] == page_number:
+            self._spans[-1]["end"] = self._length
+        else:
+            self._spans.append({"page_number": page_number, "start": start, "end": self._length})
+            self._starts.append(start)
+
+    def getvalue(self) -> str:
+        """The joined text; joined once and reused until more text is appended."""
+        if self._text is None:
+            self._text = "".join(self._parts)
+            # Keep a single part so later appends do not join everything again
+            self._parts = [self._text]
+        return self._text
+
+    @property
+    def page_spans(self) -> List[Dict[str, Any]]:
+        """Character span of every page in the joined text, in document order."""
+        return [dict(span) for span in self._spans]
+
+    def page_at(self, offset: int) -> Optional[int]:
+        """Page number of the character at ``offset``, e.g. to cite the page of a search hit."""
+        if not 0 <= offset < self._length:
+            raise ValueError(f"Offset {offset} is outside the text (length {self._length}).")
+        # Empty pages share their start with the next page; bisect_right picks the later one
+        return self._spans[bisect_right(self._starts, offset) - 1]["page_number"]
+
+    def __len__(self) -> int:
+        return self._length
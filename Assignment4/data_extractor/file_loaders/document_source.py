@@ -0,0 +1,157 @@
+import errno
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+from typing import List, Optional
+
+class BufferReader(io.RawIOBase):
+    """A seekable binary file over a buffer; the buffer itself is never copied."""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer)
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        end = min(self._position + len(target), len(self._view))
+        count = max(end - self._position, 0)
+        target[:count] = self._view[self._position:end]
+        self._position += count
+        return count
+
+    def read(self, size: int = -1) -> bytes:
+        # One copy of the requested range instead of RawIOBase's chunked readinto loop
+        end = len(self._view) if size is None or size < 0 else min(self._position + size, len(self._view))
+        data = bytes(self._view[self._position:end])
+        self._position += len(data)
+        return data
+
+    readall = read
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += len(self._view)
+        if offset < 0:
+            # The error a real file gives, which zipfile and the PDF readers handle
+            raise OSError(errno.EINVAL, f"Negative seek position {offset}")
+        self._position = offset
+        return offset
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+class DocumentSource:
+    """
+    One document's bytes, read from storage once and shared by every backend that parses it.
+
+    ``source`` may be a path, ``bytes``, ``bytearray``, ``memoryview``, an ``mmap`` or a binary
+    file-like object (read once from its current position). A path is memory-mapped on first
+    use, so the OS reads it once however many parsers walk it. ``stream()`` gives each parser
+    its own file position over the shared buffer without copying it.
+    """
+
+    def __init__(self, source, name: Optional[str] = None):
+        self.path = None
+        self._buffer = None
+        self._mmap = None
+        self._bytes = None
+        self._temp_path = None
+        self._readers: List[BufferReader] = []
+        if isinstance(source, (str, os.PathLike)):
+            self.path = os.fspath(source)
+        elif isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            self._buffer = source
+        elif hasattr(source, "read"):
+            self._buffer = source.read()
+        else:
+            raise ValueError("Unsupported document source. Use a path, bytes, an mmap or a binary file object.")
+        self.name = name or self.path or "<memory>"
+
+    @classmethod
+    def of(cls, source) -> "DocumentSource":
+        return source if isinstance(source, cls) else cls(source)
+
+    @property
+    def buffer(self):
+        """The document's bytes; a path is mapped here, and again after close."""
+        if self._buffer is None:
+            with open(self.path, "rb") as f:
+                # mmap cannot map an empty file
+                if os.fstat(f.fileno()).st_size == 0:
+                    self._buffer = b""
+                else:
+                    self._mmap = self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._buffer
+
+    @property
+    def size(self) -> int:
+        if self._buffer is None:
+            return os.path.getsize(self.path)
+        return memoryview(self._buffer).nbytes
+
+    def header(self, size: int) -> bytes:
+        return bytes(memoryview(self.buffer)[:size])
+
+    def stream(self) -> BufferReader:
+        """A new file object over the shared buffer, for parsers that read and seek."""
+        reader = BufferReader(self.buffer)
+        self._readers.append(reader)
+        return reader
+
+    def as_bytes(self) -> bytes:
+        """The content as a ``bytes`` object, which PyMuPDF requires; only other buffer types are copied, once."""
+        if isinstance(self.buffer, bytes):
+            return self.buffer
+        if self._bytes is None:
+            self._bytes = bytes(self.buffer)
+        return self._bytes
+
+    def local_path(self) -> str:
+        """A path to the content for external tools (pdftoppm) and worker processes."""
+        if self.path is not None:
+            return self.path
+        if self._temp_path is None:
+            handle, self._temp_path = tempfile.mkstemp(suffix=".document")
+            with os.fdopen(handle, "wb") as f:
+                f.write(self.buffer)
+        return self._temp_path
+
+    def sha256(self) -> str:
+        return hashlib.sha256(self.buffer).hexdigest()
+
+    def close(self):
+        """Unmap a path and drop temporary copies; the source can still be read again afterwards."""
+        for reader in self._readers:
+            reader.close()
+        self._readers.clear()
+        self._bytes = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # A parser still holds a view of the map; it is unmapped once that is released
+                pass
+            self._mmap = self._buffer = None
+        if self._temp_path is not None:
+            os.remove(self._temp_path)
+            self._temp_path = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
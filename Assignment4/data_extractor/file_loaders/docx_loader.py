@@ -1,17 +1,26 @@
+from typing import Any, Dict
 import docx
+from data_extractor.file_loaders.document_source import DocumentSource
 from data_extractor.file_loaders.file_loader import FileLoader
+from data_extractor.file_loaders.probe import probe_ooxml
+from data_extractor.file_loaders.signatures import matches_format
 
 class DOCXLoader(FileLoader):
 
-    def validate_file(self, file_path: str) -> bool:
-        return file_path.lower().endswith('.docx')
+    def validate_file(self, file_path) -> bool:
+        return matches_format(file_path, "docx", ('.docx',))
 
-    def load_file(self, file_path: str) -> docx.Document:
-        if not self.validate_file(file_path):
+    def probe(self, file_path) -> Dict[str, Any]:
+        return probe_ooxml(file_path, "docx")
+
+    def load_file(self, file_path) -> docx.Document:
+        # Read (or map) the document once; validation and parsing share the buffer
+        source = DocumentSource.of(file_path)
+        if not self.validate_file(source):
             raise ValueError("Invalid DOCX file.")
         try:
             # Attempt to open the DOCX file
-            return docx.Document(file_path)
+            return docx.Document(source.stream())
         except Exception:
             # Catch any exception that occurs and raise a ValueError
             raise ValueError("Invalid DOCX file.")
@@ -1,14 +1,23 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Dict
 
 class FileLoader(ABC):
 
     @abstractmethod
-    def validate_file(self, file_path: str) -> bool:
-        """Validate the file format."""
+    def validate_file(self, file_path) -> bool:
+        """Validate the file format of a path, DocumentSource, bytes, mmap or binary file object."""
         pass
 
     @abstractmethod
-    def load_file(self, file_path: str) -> Any:
-        """Load and return the file object."""
-        pass
\ No newline at end of file
+    def load_file(self, file_path) -> Any:
+        """Load and return the file object; accepts the same sources as validate_file."""
+        pass
+
+    @abstractmethod
+    def probe(self, file_path) -> Dict[str, Any]:
+        """
+        Check the file's structure without parsing it (see file_loaders.probe.probe_result).
+
+        Returns format, size, page or slide count, encryption and the reason it is corrupt, if it is.
+        """
+        pass
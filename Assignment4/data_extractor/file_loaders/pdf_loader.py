@@ -1,18 +1,27 @@
+from typing import Any, Dict
 from PyPDF2 import PdfReader
+from data_extractor.file_loaders.document_source import DocumentSource
 from data_extractor.file_loaders.file_loader import FileLoader
+from data_extractor.file_loaders.probe import probe_pdf
+from data_extractor.file_loaders.signatures import matches_format
 
 class PDFLoader(FileLoader):
 
-    def validate_file(self, file_path: str) -> bool:
-        return file_path.lower().endswith('.pdf')
+    def validate_file(self, file_path) -> bool:
+        return matches_format(file_path, "pdf", ('.pdf',))
 
-    def load_file(self, file_path: str) -> PdfReader:
-        if not self.validate_file(file_path):
+    def probe(self, file_path) -> Dict[str, Any]:
+        return probe_pdf(file_path)
+
+    def load_file(self, file_path) -> PdfReader:
+        # Read (or map) the document once; validation and parsing share the buffer
+        source = DocumentSource.of(file_path)
+        if not self.validate_file(source):
             raise ValueError("Invalid PDF file.")
         
         try:
             # Attempt to open the PDF file
-            pdf = PdfReader(file_path)
+            pdf = PdfReader(source.stream())
             # Check if the PDF is encrypted (password-protected)
             if pdf.is_encrypted:
                 raise ValueError("Invalid PDF file.")
@@ -1,18 +1,27 @@
+from typing import Any, Dict
 import pptx
+from data_extractor.file_loaders.document_source import DocumentSource
 from data_extractor.file_loaders.file_loader import FileLoader
+from data_extractor.file_loaders.probe import probe_ooxml
+from data_extractor.file_loaders.signatures import matches_format
 
 class PPTLoader(FileLoader):
     
-    def validate_file(self, file_path: str) -> bool:
-        return file_path.lower().endswith('.pptx') or file_path.lower().endswith('.ppt')
+    def validate_file(self, file_path) -> bool:
+        return matches_format(file_path, "pptx", ('.pptx', '.ppt'))
 
-    def load_file(self, file_path: str) -> pptx.Presentation:
-        if not self.validate_file(file_path):
+    def probe(self, file_path) -> Dict[str, Any]:
+        return probe_ooxml(file_path, "pptx")
+
+    def load_file(self, file_path) -> pptx.Presentation:
+        # Read (or map) the document once; validation and parsing share the buffer
+        source = DocumentSource.of(file_path)
+        if not self.validate_file(source):
             raise ValueError("Invalid PPT file.")
         
         try:
             # Attempt to load the PPTX file
-            return pptx.Presentation(file_path)
+            return pptx.Presentation(source.stream())
         except Exception:
             # Catch any exception related to loading the file and raise the expected error
             raise ValueError("Invalid PPT file.")
@@ -0,0 +1,408 @@
+import re
+import struct
+import zipfile
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+from data_extractor.file_loaders.document_source import DocumentSource
+from data_extractor.file_loaders.signatures import HEADER_BYTES, OOXML_CONTENT_TYPES, ZIP_SIGNATURE
+
+# startxref and %%EOF sit in the last bytes of a PDF; a little trailing junk is tolerated
+PDF_TAIL_BYTES = 2048
+
+# Password-protected OOXML files are OLE2 compound files holding an EncryptedPackage stream
+CFB_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+CFB_HEADER_BYTES = 512
+_CFB_END_OF_CHAIN = 0xFFFFFFFE
+# Directory sectors followed before giving up; real files have a handful
+_CFB_MAX_DIRECTORY_SECTORS = 64
+
+_XREF_SECTION = re.compile(rb"\s*(\d+)[ \t]+(\d+)[ \t]*(?:\r\n|\r|\n)")
+_XREF_ENTRY = re.compile(rb"(\d{10})[ \t](\d{5})[ \t]([nf])[ \t\r\n]{0,2}")
+_OBJECT_HEADER = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj\b")
+_REFERENCE = rb"\s+(\d+)\s+\d+\s+R"
+
+class ProbeError(Exception):
+    """A structural problem that makes the document unreadable; the message is the reason."""
+
+def probe_result(document_format: Optional[str], size: Optional[int], pages: Optional[int] = None,
+                 encrypted: bool = False, error: Optional[str] = None) -> Dict[str, Any]:
+    """
+    The record every probe returns.
+
+    ``error`` is None for a structurally sound file; ``valid`` also requires it not to be
+    encrypted, because the loaders reject password-protected documents.
+    """
+    return {
+        "format": document_format,
+        "size": size,
+        "pages": pages,
+        "encrypted": encrypted,
+        "error": error,
+        "valid": error is None and not encrypted
+    }
+
+def probe_pdf(file_path) -> Dict[str, Any]:
+    """
+    Check a PDF by reading its header, trailer and cross-reference sections only.
+
+    The page count comes from the page tree's root (/Root -> /Pages -> /Count), so two
+    objects are read; the pages themselves are never parsed.
+    """
+    source = DocumentSource.of(file_path)
+    try:
+        size = source.size
+    except OSError as error:
+        return probe_result("pdf", None, error=f"unreadable: {error.strerror or error}")
+    try:
+        data = source.buffer
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        if data.find(b"%PDF-", 0, HEADER_BYTES) < 0:
+            raise ProbeError("missing %PDF- header")
+        structure = _PDFStructure(data)
+        encrypted = structure.encrypted
+        return probe_result("pdf", size, structure.page_count(), encrypted)
+    except ProbeError as error:
+        return probe_result("pdf", size, error=str(error))
+    except (ValueError, IndexError, TypeError, ZeroDivisionError, struct.error, zlib.error) as error:
+        return probe_result("pdf", size, error=f"unreadable cross-reference data: {error}")
+    finally:
+        if source is not file_path:
+            source.close()
+
+class _PDFStructure:
+    """
+    The cross-reference index of a PDF: where every object starts, newest section first.
+
+    Sections are only indexed, not expanded; an object is looked up when it is needed,
+    so a 100k-object file costs no more than a small one to probe.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self._sections: List[Any] = []
+        self._object_streams: Dict[int, Tuple[bytes, Dict[int, int]]] = {}
+        eof = data.rfind(b"%%EOF", max(0, len(data) - PDF_TAIL_BYTES))
+        if eof < 0:
+            raise ProbeError("missing %%EOF marker (truncated file?)")
+        startxref = data.rfind(b"startxref", max(0, eof - PDF_TAIL_BYTES), eof)
+        match = re.compile(rb"startxref\s+(\d+)").match(data, startxref) if startxref >= 0 else None
+        if match is None:
+            raise ProbeError("missing startxref")
+        self.trailer = self._load_sections(int(match.group(1)))
+        self.encrypted = re.search(rb"/Encrypt\b", self.trailer) is not None
+
+    def _load_sections(self, offset: int) -> bytes:
+        """Load the section at offset and every older one it chains to; return the newest trailer."""
+        newest, seen = None, set()
+        while offset is not None:
+            if offset in seen:
+                raise ProbeError("cross-reference sections loop")
+            if offset >= len(self.data):
+                raise ProbeError("cross-reference offset points past the end of the file")
+            seen.add(offset)
+            if self.data[offset:offset + 4] == b"xref":
+                trailer = self._load_table(offset + 4)
+                stream_offset = _int_value(trailer, b"/XRefStm")
+                if stream_offset is not None:
+                    # Hybrid files list their compressed objects in a separate stream
+                    self._load_stream(stream_offset)
+            else:
+                trailer = self._load_stream(offset)
+            newest = newest or trailer
+            offset = _int_value(trailer, b"/Prev")
+        return newest
+
+    def _load_table(self, position: int) -> bytes:
+        data = self.data
+        offsets = {}
+        self._sections.append(offsets)
+        while True:
+            section = _XREF_SECTION.match(data, position)
+            if section is None:
+                break
+            first, count = int(section.group(1)), int(section.group(2))
+            position = section.end()
+            for number in range(first, first + count):
+                entry = _XREF_ENTRY.match(data, position)
+                if entry is None:
+                    raise ProbeError(f"malformed cross-reference entry for object {number}")
+                position = entry.end()
+                if entry.group(3) == b"n":
+                    offsets[number] = int(entry.group(1))
+        trailer = data.find(b"trailer", position, position + 64)
+        if trailer < 0:
+            raise ProbeError("missing trailer after the cross-reference table")
+        return _read_dictionary(data, trailer + 7)
+
+    def _load_stream(self, offset: int) -> bytes:
+        dictionary, content = self._read_stream(offset, undo_predictor=False)
+        if re.search(rb"/Type\s*/XRef\b", dictionary) is None:
+            raise ProbeError("startxref does not point at a cross-reference section")
+        widths = [int(width) for width in _array_value(dictionary, b"/W")]
+        if len(widths) != 3:
+            raise ProbeError("cross-reference stream has a malformed /W")
+        index = [int(value) for value in _array_value(dictionary, b"/Index")]
+        if not index:
+            size = _int_value(dictionary, b"/Size")
+            if size is None:
+                raise ProbeError("cross-reference stream has no /Size")
+            index = [0, size]
+        # /Columns defaults to 1 when a predictor is set
+        columns = (_int_value(dictionary, b"/Columns") or 1) if (_int_value(dictionary, b"/Predictor") or 1) >= 10 else None
+        self._sections.append(_XRefStream(content, widths, index, columns))
+        return dictionary
+
+    def _read_stream(self, offset: int, undo_predictor: bool = True) -> Tuple[bytes, bytes]:
+        header = _OBJECT_HEADER.match(self.data, offset)
+        if header is None:
+            raise ProbeError(f"no object at offset {offset}")
+        dictionary = _read_dictionary(self.data, header.end())
+        start = self.data.find(b"stream", header.end() + len(dictionary))
+        if start < 0:
+            raise ProbeError("missing stream data")
+        start += 6
+        # The stream keyword is followed by CRLF or LF
+        start += 2 if self.data[start:start + 2] == b"\r\n" else 1
+        length = _int_value(dictionary, b"/Length")
+        if length is None or re.search(rb"/Length" + _REFERENCE, dictionary):
+            length = self.data.find(b"endstream", start) - start
+        content = bytes(self.data[start:start + length])
+        if re.search(rb"/Filter\s*\[?\s*/FlateDecode\b", dictionary):
+            content = zlib.decompress(content)
+        predictor = _int_value(dictionary, b"/Predictor") or 1
+        if predictor >= 10 and undo_predictor:
+            content = _undo_png_predictor(content, _int_value(dictionary, b"/Columns") or 1)
+        return dictionary, content
+
+    def _locate(self, number: int) -> Optional[Tuple[int, ...]]:
+        """``(offset,)`` of an object in the file, or ``(stream number, index)`` if it is compressed."""
+        for section in self._sections:
+            if isinstance(section, dict):
+                if number in section:
+                    return (section[number],)
+            else:
+                location = section.locate(number)
+                if location is not None:
+                    return location
+        return None
+
+    def object(self, number: int) -> bytes:
+        """The dictionary of an object, from the file or from the object stream holding it."""
+        location = self._locate(number)
+        if location is None:
+            raise ProbeError(f"object {number} is not in the cross-reference index")
+        if len(location) == 1:
+            header = _OBJECT_HEADER.match(self.data, location[0])
+            if header is None or int(header.group(1)) != number:
+                raise ProbeError(f"cross-reference offset of object {number} is wrong")
+            return _read_dictionary(self.data, header.end())
+        stream_number = location[0]
+        if stream_number not in self._object_streams:
+            stream_location = self._locate(stream_number)
+            if stream_location is None or len(stream_location) != 1:
+                raise ProbeError(f"object stream {stream_number} is not in the cross-reference index")
+            dictionary, content = self._read_stream(stream_location[0])
+            first, count = _int_value(dictionary, b"/First"), _int_value(dictionary, b"/N")
+            if first is None or count is None:
+                raise ProbeError(f"object stream {stream_number} has no /First or /N")
+            pairs = [int(value) for value in content[:first].split()[:count * 2]]
+            self._object_streams[stream_number] = (content[first:], dict(zip(pairs[::2], pairs[1::2])))
+        content, positions = self._object_streams[stream_number]
+        if number not in positions:
+            raise ProbeError(f"object {number} is missing from object stream {stream_number}")
+        return _read_dictionary(content, positions[number])
+
+    def page_count(self) -> Optional[int]:
+        root = _reference(self.trailer, b"/Root")
+        if root is None:
+            raise ProbeError("trailer has no /Root")
+        try:
+            pages = _reference(self.object(root), b"/Pages")
+            if pages is None:
+                raise ProbeError("document catalog has no /Pages")
+            return _int_value(self.object(pages), b"/Count")
+        except zlib.error:
+            if self.encrypted:
+                # Object streams of encrypted files are encrypted too
+                return None
+            raise
+
+class _XRefStream:
+    """
+    One cross-reference stream; entries are decoded from their rows on lookup.
+
+    ``columns`` is set when the rows are PNG-filtered. With the usual Up filter a row is the
+    running sum of the rows above it, so one row is decoded without decoding the rest.
+    """
+
+    def __init__(self, content: bytes, widths: List[int], index: List[int], columns: Optional[int] = None):
+        self.content = content
+        self.widths = widths
+        self.index = index
+        self.columns = columns
+        self.up_only = False
+        if columns is not None:
+            filters = content[::columns + 1]
+            self.up_only = filters.count(2) == len(filters)
+            if not self.up_only:
+                self.content = _undo_png_predictor(content, columns)
+                self.columns = None
+
+    def _row(self, row: int) -> bytes:
+        size = sum(self.widths)
+        if self.columns is None:
+            return self.content[row * size:(row + 1) * size]
+        stride = self.columns + 1
+        end = (row + 1) * stride
+        return bytes(sum(self.content[column + 1:end:stride]) & 0xFF for column in range(self.columns))
+
+    def locate(self, number: int) -> Optional[Tuple[int, ...]]:
+        row = 0
+        for first, count in zip(self.index[::2], self.index[1::2]):
+            if first <= number < first + count:
+                data, position, fields = self._row(row + number - first), 0, []
+                for width in self.widths:
+                    fields.append(int.from_bytes(data[position:position + width], "big"))
+                    position += width
+                kind = fields[0] if self.widths[0] else 1
+                if kind == 1:
+                    return (fields[1],)
+                if kind == 2:
+                    return fields[1], fields[2]
+                return None
+            row += count
+        return None
+
+def _read_dictionary(data, position: int) -> bytes:
+    """The ``<< ... >>`` starting near position, nested dictionaries included."""
+    start = data.find(b"<<", position, position + 1024)
+    if start < 0:
+        raise ProbeError("expected a dictionary")
+    depth, position = 0, start
+    while True:
+        opening, closing = data.find(b"<<", position), data.find(b">>", position)
+        if closing < 0:
+            raise ProbeError("unterminated dictionary")
+        if 0 <= opening < closing:
+            depth, position = depth + 1, opening + 2
+        else:
+            depth, position = depth - 1, closing + 2
+            if depth == 0:
+                return bytes(data[start:position])
+
+def _int_value(dictionary: bytes, key: bytes) -> Optional[int]:
+    match = re.search(re.escape(key) + rb"\s+(\d+)", dictionary)
+    return int(match.group(1)) if match else None
+
+def _reference(dictionary: bytes, key: bytes) -> Optional[int]:
+    match = re.search(re.escape(key) + _REFERENCE, dictionary)
+    return int(match.group(1)) if match else None
+
+def _array_value(dictionary: bytes, key: bytes):
+    match = re.search(re.escape(key) + rb"\s*\[([^\]]*)\]", dictionary)
+    return match.group(1).split() if match else []
+
+def _undo_png_predictor(content: bytes, columns: int) -> bytes:
+    """Reverse the PNG row filters cross-reference streams are usually encoded with."""
+    rows, previous = [], bytearray(columns)
+    for start in range(0, len(content), columns + 1):
+        kind, row = content[start], bytearray(content[start + 1:start + 1 + columns])
+        for i in range(len(row)):
+            left = row[i - 1] if i else 0
+            up, up_left = previous[i], previous[i - 1] if i else 0
+            if kind == 1:
+                row[i] = (row[i] + left) & 0xFF
+            elif kind == 2:
+                row[i] = (row[i] + up) & 0xFF
+            elif kind == 3:
+                row[i] = (row[i] + (left + up) // 2) & 0xFF
+            elif kind == 4:
+                estimate = left + up - up_left
+                distances = (abs(estimate - left), abs(estimate - up), abs(estimate - up_left))
+                row[i] = (row[i] + (left, up, up_left)[distances.index(min(distances))]) & 0xFF
+        rows.append(bytes(row))
+        previous = row
+    return b"".join(rows)
+
+def probe_ooxml(file_path, document_format: str) -> Dict[str, Any]:
+    """
+    Check a DOCX or PPTX through the zip central directory, without decompressing the parts.
+
+    Only ``[Content_Types].xml`` is read, and for DOCX ``docProps/app.xml``, whose ``Pages``
+    is the count Word saved. PPTX slides are counted from the part names.
+    """
+    source = DocumentSource.of(file_path)
+    try:
+        size = source.size
+    except OSError as error:
+        return probe_result(document_format, None, error=f"unreadable: {error.strerror or error}")
+    try:
+        header = source.header(len(CFB_SIGNATURE))
+        if header == CFB_SIGNATURE:
+            if _cfb_has_stream(source.buffer, "EncryptedPackage"):
+                return probe_result(document_format, size, encrypted=True)
+            raise ProbeError("legacy binary Office file, not an Office Open XML package")
+        if not header.startswith(ZIP_SIGNATURE):
+            raise ProbeError("not a zip archive")
+        try:
+            archive = zipfile.ZipFile(source.stream())
+        except zipfile.BadZipFile as error:
+            raise ProbeError(f"broken zip central directory: {error}")
+        with archive:
+            for info in archive.infolist():
+                if info.header_offset + info.compress_size > size:
+                    raise ProbeError(f"{info.filename} extends past the end of the file (truncated?)")
+            if "[Content_Types].xml" not in archive.NameToInfo:
+                raise ProbeError("missing [Content_Types].xml")
+            content_types = archive.read("[Content_Types].xml")
+            if OOXML_CONTENT_TYPES[document_format].encode() not in content_types:
+                raise ProbeError(f"not a {document_format.upper()} package")
+            pages = None
+            if document_format == "pptx":
+                pages = sum(1 for name in archive.NameToInfo if re.fullmatch(r"ppt/slides/slide\d+\.xml", name))
+            elif "docProps/app.xml" in archive.NameToInfo:
+                match = re.search(rb"<Pages>(\d+)</Pages>", archive.read("docProps/app.xml"))
+                pages = int(match.group(1)) if match else None
+        return probe_result(document_format, size, pages)
+    except ProbeError as error:
+        return probe_result(document_format, size, error=str(error))
+    except (zipfile.BadZipFile, zlib.error, EOFError) as error:
+        return probe_result(document_format, size, error=f"broken zip part: {error}")
+    except (ValueError, IndexError, TypeError, ZeroDivisionError, struct.error) as error:
+        return probe_result(document_format, size, error=f"malformed container: {error}")
+    finally:
+        if source is not file_path:
+            source.close()
+
+def _cfb_has_stream(data, name: str) -> bool:
+    """Whether an OLE2 compound file's directory lists a stream called name."""
+    if len(data) < CFB_HEADER_BYTES:
+        raise ProbeError("truncated compound file header")
+    sector_shift = struct.unpack_from("<H", data, 30)[0]
+    # Version 3 files use 512-byte sectors and version 4 files 4096-byte ones
+    if sector_shift not in (9, 12):
+        raise ProbeError(f"compound file has an invalid sector size (shift {sector_shift})")
+    sector_size = 1 << sector_shift
+    sector = struct.unpack_from("<I", data, 48)[0]
+    # The first 109 FAT sector numbers are in the header, enough for files up to ~7 MB
+    fat_sectors = struct.unpack_from("<109I", data, 76)
+    entries_per_fat_sector = sector_size // 4
+    encoded = name.encode("utf-16-le")
+    for _ in range(_CFB_MAX_DIRECTORY_SECTORS):
+        if sector == _CFB_END_OF_CHAIN:
+            break
+        offset = (sector + 1) * sector_size
+        if offset + sector_size > len(data):
+            raise ProbeError("compound file directory extends past the end of the file (truncated?)")
+        for entry in range(offset, offset + sector_size, 128):
+            length = struct.unpack_from("<H", data, entry + 64)[0]
+            if bytes(data[entry:entry + max(length - 2, 0)]) == encoded:
+                return True
+        fat_index = sector // entries_per_fat_sector
+        if fat_index >= len(fat_sectors):
+            break
+        fat_offset = (fat_sectors[fat_index] + 1) * sector_size
+        sector = struct.unpack_from("<I", data, fat_offset + (sector % entries_per_fat_sector) * 4)[0]
+    return False
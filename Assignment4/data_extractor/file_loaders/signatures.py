@@ -0,0 +1,73 @@
+import mmap
+import os
+import zipfile
+from typing import Dict, Optional, Tuple
+from data_extractor.file_loaders.document_source import DocumentSource
+
+# The PDF header may follow some junk; readers accept it anywhere in the first kilobyte
+HEADER_BYTES = 1024
+
+# Formats recognised by a byte string in the file's header
+HEADER_SIGNATURES: Dict[str, bytes] = {"pdf": b"%PDF-"}
+
+# OOXML files are zip archives; the content type of their main part tells them apart
+OOXML_CONTENT_TYPES: Dict[str, str] = {
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml",
+    "pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation.main+xml",
+}
+
+ZIP_SIGNATURE = b"PK\x03\x04"
+
+def sniff_format(source) -> Optional[str]:
+    """
+    Name of the format the content says it is, whatever the file's name, or None.
+
+    ``source`` is a path or anything DocumentSource accepts. Only the header is read, plus
+    ``[Content_Types].xml`` for zip files, which zipfile finds through the central directory
+    without touching the other parts. A file object is rewound afterwards, so it must be
+    seekable; wrap a non-seekable stream in a DocumentSource to read it only once.
+    """
+    if isinstance(source, DocumentSource):
+        return _sniff(source)
+    if isinstance(source, (str, os.PathLike)):
+        with DocumentSource(source) as document:
+            return _sniff(document)
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        return _sniff(DocumentSource(source))
+    if not (hasattr(source, "seekable") and source.seekable()):
+        # Sniffing would consume the stream and leave nothing for load()
+        raise ValueError("Cannot detect the format of a non-seekable stream without consuming it. "
+                         "Wrap it in DocumentSource(stream) and pass that instead.")
+    position = source.tell()
+    document = DocumentSource(source)
+    source.seek(position)
+    return _sniff(document)
+
+def _sniff(source: DocumentSource) -> Optional[str]:
+    try:
+        header = source.header(HEADER_BYTES)
+    except OSError:
+        return None
+
+    if header.startswith(ZIP_SIGNATURE):
+        # Checked first: a stored member could put another format's signature in the header
+        try:
+            with zipfile.ZipFile(source.stream()) as archive:
+                content_types = archive.read("[Content_Types].xml").decode("utf-8", "replace")
+        except (OSError, KeyError, zipfile.BadZipFile):
+            return None
+        for name, content_type in OOXML_CONTENT_TYPES.items():
+            if content_type in content_types:
+                return name
+        return None
+    for name, signature in HEADER_SIGNATURES.items():
+        if signature in header:
+            return name
+    return None
+
+def matches_format(source, name: str, extensions: Tuple[str, ...]) -> bool:
+    """Whether a path ends in one of ``extensions`` or the content is of format ``name``."""
+    path = source if isinstance(source, str) else getattr(source, "path", None)
+    if path is not None and path.lower().endswith(extensions):
+        return True
+    return sniff_format(source) == name
@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Every metric is exported under this prefix in the Prometheus text format
+PROMETHEUS_PREFIX = "data_extractor"
+
+LabelKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+def _key(name: str, labels: Dict[str, Any]) -> LabelKey:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+class MetricsRecorder:
+    """
+    Aggregate per-stage timings and counters, and keep the most recent structured events.
+
+    Stages record how often they ran and their wall and CPU seconds (CPU time is process-wide,
+    so it is only exact when one stage runs at a time). Counters cover pages processed, bytes
+    read and written, cache hits and misses and so on.
+    """
+
+    def __init__(self, max_events: int = 10000):
+        self._stages: Dict[LabelKey, Dict[str, float]] = {}
+        self._counters: Dict[LabelKey, float] = {}
+        self._events = deque(maxlen=max_events)
+        self._listeners: List[Callable[[Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+
+    def record_stage(self, name: str, wall_seconds: float, cpu_seconds: float, failed: bool = False,
+                     **labels):
+        with self._lock:
+            stage = self._stages.setdefault(_key(name, labels),
+                                            {"count": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "errors": 0})
+            stage["count"] += 1
+            stage["wall_seconds"] += wall_seconds
+            stage["cpu_seconds"] += cpu_seconds
+            stage["errors"] += failed
+        self._emit({"type": "stage", "name": name, "labels": labels, "wall_seconds": wall_seconds,
+                    "cpu_seconds": cpu_seconds, "failed": failed})
+
+    def increment(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            key = _key(name, labels)
+            self._counters[key] = self._counters.get(key, 0) + value
+        self._emit({"type": "counter", "name": name, "labels": labels, "value": value})
+
+    def subscribe(self, listener: Callable[[Dict[str, Any]], None]):
+        """Call listener with every event as it is recorded, e.g. to log it as JSON lines."""
+        self._listeners.append(listener)
+
+    def _emit(self, event: Dict[str, Any]):
+        event["timestamp"] = time.time()
+        self._events.append(event)
+        for listener in self._listeners:
+            listener(event)
+
+    def events(self) -> List[Dict[str, Any]]:
+        return list(self._events)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Aggregated stages and counters as plain JSON-friendly data."""
+        with self._lock:
+            return {
+                "stages": [dict(stage, name=name, labels=dict(labels))
+                           for (name, labels), stage in sorted(self._stages.items())],
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in sorted(self._counters.items())]
+            }
+
+    def merge(self, snapshot: Dict[str, Any]):
+        """Add a snapshot taken elsewhere, e.g. in a worker process, to these totals."""
+        with self._lock:
+            for stage in snapshot["stages"]:
+                totals = self._stages.setdefault(_key(stage["name"], stage["labels"]),
+                                                 {"count": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "errors": 0})
+                for field in totals:
+                    totals[field] += stage[field]
+            for counter in snapshot["counters"]:
+                key = _key(counter["name"], counter["labels"])
+                self._counters[key] = self._counters.get(key, 0) + counter["value"]
+
+    def to_prometheus(self) -> str:
+        """Render the snapshot in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        stage_metrics = (("stage_calls_total", "count"), ("stage_errors_total", "errors"),
+                         ("stage_wall_seconds_total", "wall_seconds"), ("stage_cpu_seconds_total", "cpu_seconds"))
+        for metric, field in stage_metrics:
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{metric} counter")
+            for stage in snapshot["stages"]:
+                labels = dict(stage["labels"], stage=stage["name"])
+                lines.append(f"{PROMETHEUS_PREFIX}_{metric}{_prometheus_labels(labels)} {stage[field]}")
+        for name in sorted({counter["name"] for counter in snapshot["counters"]}):
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name}_total counter")
+            for counter in snapshot["counters"]:
+                if counter["name"] == name:
+                    lines.append(f"{PROMETHEUS_PREFIX}_{name}_total{_prometheus_labels(counter['labels'])} "
+                                 f"{counter['value']}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str):
+        """Write the snapshot to path: Prometheus text for .prom/.txt files, JSON otherwise."""
+        if os.path.splitext(path)[1].lower() in (".prom", ".txt"):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(dict(self.snapshot(), events=self.events()), indent=4, default=str)
+        with open(path, "w") as f:
+            f.write(content)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            self._events.clear()
+
+def _prometheus_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+               for value in labels.values())
+    return "{" + ",".join(f'{label}="{value}"' for label, value in zip(labels, escaped)) + "}"
+
+class _Stage:
+    __slots__ = ("recorder", "name", "labels", "wall", "cpu")
+
+    def __init__(self, recorder: MetricsRecorder, name: str, labels: Dict[str, Any]):
+        self.recorder = recorder
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.recorder.record_stage(self.name, time.perf_counter() - self.wall, time.process_time() - self.cpu,
+                                   exc_type is not None, **self.labels)
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+_NULL_STAGE = _NullStage()
+
+# The active recorder; None means instrumentation is off and every call below is a no-op
+_recorder: Optional[MetricsRecorder] = None
+
+def enable(recorder: Optional[MetricsRecorder] = None) -> MetricsRecorder:
+    """Start recording into recorder (a new one by default) and return it."""
+    global _recorder
+    _recorder = recorder or MetricsRecorder()
+    return _recorder
+
+def disable():
+    global _recorder
+    _recorder = None
+
+def enabled() -> bool:
+    return _recorder is not None
+
+def get_recorder() -> Optional[MetricsRecorder]:
+    return _recorder
+
+def stage(name: str, **labels):
+    """Context manager timing a stage, e.g. ``with metrics.stage("tables", format="pdf"):``."""
+    if _recorder is None:
+        return _NULL_STAGE
+    return _Stage(_recorder, name, labels)
+
+def count(name: str, value: float = 1, **labels):
+    """Add value to a counter such as pages_processed or bytes_written."""
+    if _recorder is not None:
+        _recorder.increment(name, value, **labels)
@@ -1,18 +1,32 @@
 import os
 import json
-import pandas as pd  # For saving tables as CSV
+import hashlib
+import sys
 from io import BytesIO
-from PIL import Image as PILImage
+from data_extractor.instrumentation import metrics
+from data_extractor.storage.image_store import ImageStore
 from data_extractor.storage.storage import Storage  # For handling PPTX images
 
+def _is_instance(value, module_name: str, class_name: str) -> bool:
+    """isinstance against a class of an optional heavy library, without importing it."""
+    # A DataFrame or PIL image can only exist once its library has been imported by someone else
+    module = sys.modules.get(module_name)
+    return module is not None and isinstance(value, getattr(module, class_name))
+
 class FileStorage(Storage):
-    def __init__(self, output_dir: str):
+    def __init__(self, output_dir: str, image_store_dir: str = None):
         self.output_dir = output_dir
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
+        # Images go to a content-addressed store; pass a shared folder to dedupe across documents
+        self.image_store = ImageStore(image_store_dir or os.path.join(output_dir, "images"))
 
     def store(self, data, filename: str, data_type: str):
         """Save data based on type: 'text', 'image', 'url', or 'table'."""
+        with metrics.stage("file_store", kind=data_type):
+            return self._store(data, filename, data_type)
+
+    def _store(self, data, filename: str, data_type: str):
         if data_type == 'text':
             self.save_text(data, filename)
         elif data_type == 'image':
@@ -24,49 +38,84 @@ class FileStorage(Storage):
         else:
             raise ValueError("Unsupported data type. Use 'text', 'image', 'url', or 'table'.")
 
+    def store_stream(self, records, filename: str, data_type: str):
+        """
+        Save records yielded by the ``Extractor.iter_*`` generators, one at a time.
+
+        Text records are appended to the .txt file as they arrive and images go to the
+        image store one by one, so only the current record is held in memory.
+        """
+        if data_type == 'text':
+            self.stream_text(records, filename)
+        elif data_type in ('image', 'url', 'table'):
+            return self.store(records, filename, data_type)
+        else:
+            raise ValueError("Unsupported data type. Use 'text', 'image', 'url', or 'table'.")
+
+    def stream_text(self, pages, filename: str):
+        """Write ``{"text"}`` page records to the .txt file without joining them first."""
+        txt_filename = os.path.splitext(filename)[0] + ".txt"
+        output_path = os.path.join(self.output_dir, txt_filename)
+        with open(output_path, 'w') as f:
+            for page in pages:
+                f.write(page["text"])
+
     def save_text(self, data, filename: str):
         """Save text data as a .txt file."""
         txt_filename = os.path.splitext(filename)[0] + ".txt"
         output_path = os.path.join(self.output_dir, txt_filename)
         with open(output_path, 'w') as f:
             f.write(data)
+        if metrics.enabled():
+            metrics.count("bytes_written", os.path.getsize(output_path), backend="file")
 
     def save_images(self, images, filename: str):
-        """Save image data to image files and metadata."""
+        """Save each distinct image once in the image store and write per-document metadata."""
         images_dir = os.path.join(self.output_dir, "images")
         if not os.path.exists(images_dir):
             os.makedirs(images_dir)
 
         metadata = []
-        for idx, image in enumerate(images):
+        by_hash = {}
+        for image in images:
             # Check if the image is a PIL Image object (PPTX case)
-            if isinstance(image, PILImage.Image):  
+            if _is_instance(image, "PIL.Image", "Image"):
                 # Convert the image to bytes (PNG format)
                 image_bytes = BytesIO()
                 image.save(image_bytes, format='PNG')  # Save as PNG
                 image_bytes = image_bytes.getvalue()
-                image_filename = f"image_{idx + 1}.png"
                 image_ext = 'png'
+                image = {}
             # Otherwise, assume it's a dictionary (PDF/DOCX case)
             elif isinstance(image, dict):
-                # Check if it's a dictionary and has the necessary keys
-                image_filename = f"image_{idx + 1}.{image.get('ext', 'jpg')}"
-                image_bytes = image.get('image_data', b"")
-                image_ext = image.get('ext', 'jpg')  # noqa: F841
+                image_bytes = image.get('image_data')
+                if image_bytes is None and image.get("sha256") not in by_hash:
+                    # A streamed repeat whose first occurrence was not saved here
+                    continue
+                image_ext = image.get('ext', 'jpg')
             else:
                 # If the image is neither a PIL Image nor a dictionary, skip it
                 continue
 
-            # Save the image data to file
-            image_path = os.path.join(images_dir, image_filename)
-            with open(image_path, "wb") as img_file:
-                img_file.write(image_bytes)
+            # Streamed images repeated in a document carry only their sha256, not the bytes again
+            sha256 = image.get("sha256") or hashlib.sha256(image_bytes).hexdigest()
+            page_number = image.get("page", "N/A")
+            if sha256 in by_hash:
+                # The same picture again in this document: only record where it occurs
+                by_hash[sha256]["occurrences"].append(page_number)
+                continue
 
-            metadata.append({
-                "file_name": image_filename,
-                "page_number": image.get("page", "N/A"),
-                "dimensions": image.get("dimensions", "N/A")
-            })
+            _, image_path, _ = self.image_store.put(image_bytes, image_ext, sha256)
+            entry = {
+                "file_name": os.path.basename(image_path),
+                "file_path": image_path,
+                "sha256": sha256,
+                "page_number": page_number,
+                "dimensions": image.get("dimensions", "N/A"),
+                "occurrences": [page_number]
+            }
+            by_hash[sha256] = entry
+            metadata.append(entry)
 
         metadata_file = os.path.join(images_dir, 'metadata.json')
         with open(metadata_file, 'w') as f:
@@ -102,11 +151,17 @@ class FileStorage(Storage):
 
         metadata = []
         for idx, table in enumerate(tables):
+            page_number, bbox = "N/A", None
+            if isinstance(table, dict):
+                # Tables from extract_all and iter_tables are records carrying their page number and bbox
+                page_number = table.get("page_number") or "N/A"
+                bbox = list(table["bbox"]) if table.get("bbox") else None
+                table = table["rows"]
             csv_filename = f"table_{idx + 1}.csv"
             csv_path = os.path.join(tables_dir, csv_filename)
             
             # Save table data to CSV file
-            if isinstance(table, pd.DataFrame):
+            if _is_instance(table, "pandas", "DataFrame"):
                 table.to_csv(csv_path, index=False)
             elif isinstance(table, list):
                 with open(csv_path, 'w', newline='') as f:
@@ -119,7 +174,9 @@ class FileStorage(Storage):
             metadata.append({
                 "table_filename": csv_filename,
                 "row_count": len(table) if isinstance(table, list) else table.shape[0],
-                "column_count": len(table[0]) if isinstance(table, list) and table else table.shape[1]
+                "column_count": len(table[0]) if isinstance(table, list) and table else table.shape[1],
+                "page_number": page_number,
+                "bbox": bbox
             })
 
         # Save the metadata for all tables in a JSON file
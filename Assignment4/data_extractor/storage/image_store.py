@@ -0,0 +1,43 @@
+import hashlib
+import os
+import tempfile
+from typing import Optional, Tuple
+from data_extractor.instrumentation import metrics
+
+class ImageStore:
+    """Content-addressed blob store: every distinct image is written once, named by its SHA-256."""
+
+    def __init__(self, root: str):
+        self.root = root
+        if not os.path.exists(root):
+            os.makedirs(root)
+
+    def path_for(self, sha256: str, ext: str) -> str:
+        # Fan out over sub-folders so no single folder collects millions of files
+        return os.path.join(self.root, sha256[:2], f"{sha256}.{ext}")
+
+    def put(self, image_bytes: bytes, ext: str, sha256: Optional[str] = None) -> Tuple[str, str, bool]:
+        """
+        Store image bytes unless an identical blob already exists.
+
+        :return: The SHA-256, the blob path and whether the blob was newly written.
+        """
+        sha256 = sha256 or hashlib.sha256(image_bytes).hexdigest()
+        path = self.path_for(sha256, ext)
+        if os.path.exists(path):
+            return sha256, path, False
+
+        folder = os.path.dirname(path)
+        os.makedirs(folder, exist_ok=True)
+        # Write to a temporary name first so concurrent writers never expose a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as blob:
+                blob.write(image_bytes)
+            os.replace(tmp_path, path)
+            metrics.count("bytes_written", len(image_bytes), backend="image_store")
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return sha256, path, True
@@ -0,0 +1,146 @@
+import os
+import sqlite3
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+STATES = ("queued", "extracting", "stored", "failed")
+
+class JobLedger:
+    """
+    Per-file progress of batch runs, kept in SQLite so an interrupted run can resume.
+
+    A file moves from ``queued`` to ``extracting`` and ends ``stored`` or ``failed``. Stored
+    files are skipped by later runs unless their size, modification time or fingerprint (the
+    settings that shaped the stored output) changed; files left queued or extracting by a
+    crash, and failed ones, are run again.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # Batch workers mark their own files as extracting, so wait for locks instead of failing
+        self.conn = sqlite3.connect(path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""CREATE TABLE IF NOT EXISTS jobs (
+        file_path TEXT PRIMARY KEY,
+        state TEXT NOT NULL,
+        output_dir TEXT,
+        size INTEGER,
+        mtime REAL,
+        content_hash TEXT,
+        fingerprint TEXT,
+        document_id INTEGER,
+        pages INTEGER,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        error TEXT,
+        queued_at REAL,
+        started_at REAL,
+        finished_at REAL,
+        extract_seconds REAL,
+        store_seconds REAL
+        )""")
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+        if "fingerprint" not in columns:
+            # Ledgers written before fingerprints existed; their files are re-run once
+            self.conn.execute("ALTER TABLE jobs ADD COLUMN fingerprint TEXT")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state)")
+        self.conn.commit()
+
+    @staticmethod
+    def default_path(database: Optional[str], output_root: str) -> str:
+        """The ledger beside the output database, or in the output folder without one."""
+        if database:
+            return os.path.splitext(database)[0] + "_jobs.db"
+        return os.path.join(output_root, "_jobs.db")
+
+    def enqueue(self, files: Iterable[str], output_dirs: Dict[str, str],
+                fingerprint: Optional[Callable[[str], Optional[str]]] = None) -> Dict[str, str]:
+        """
+        Queue every file that still needs work and return its output folder.
+
+        ``fingerprint(file_path)`` gives the fingerprint this run would store for a file; a
+        stored file is only skipped when it matches. It is only called for files that would
+        otherwise be skipped. A file keeps the output folder of its first run, so a resumed
+        run overwrites its own earlier output instead of writing a second copy next to it.
+        """
+        known = {row[0]: row[1:] for row in self.conn.execute(
+            "SELECT file_path, state, output_dir, size, mtime, fingerprint FROM jobs"
+        )}
+        pending, rows, now = {}, [], time.time()
+        for file_path in files:
+            try:
+                stat = os.stat(file_path)
+                size, mtime = stat.st_size, stat.st_mtime
+            except OSError:
+                size = mtime = None
+            state, output_dir, stored_size, stored_mtime, stored_fingerprint = known.get(file_path, (None,) * 5)
+            if (state == "stored" and (stored_size, stored_mtime) == (size, mtime) and size is not None
+                    and (fingerprint is None or fingerprint(file_path) == stored_fingerprint)):
+                continue
+            pending[file_path] = output_dir or output_dirs[file_path]
+            rows.append((file_path, pending[file_path], size, mtime, now))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO jobs (file_path, state, output_dir, size, mtime, queued_at) VALUES (?, 'queued', ?, ?, ?, ?) "
+                "ON CONFLICT (file_path) DO UPDATE SET state = 'queued', output_dir = excluded.output_dir, "
+                "size = excluded.size, mtime = excluded.mtime, queued_at = excluded.queued_at",
+                rows
+            )
+        return pending
+
+    def mark_extracting(self, file_path: str):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET state = 'extracting', attempts = attempts + 1, started_at = ?, error = NULL "
+                "WHERE file_path = ?", (time.time(), file_path)
+            )
+
+    def mark_stored(self, file_path: str, content_hash: Optional[str] = None, document_id: Optional[int] = None,
+                    pages: Optional[int] = None, extract_seconds: Optional[float] = None,
+                    store_seconds: Optional[float] = None, fingerprint: Optional[str] = None):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET state = 'stored', content_hash = ?, fingerprint = ?, document_id = ?, pages = ?, "
+                "error = NULL, finished_at = ?, extract_seconds = ?, store_seconds = ? WHERE file_path = ?",
+                (content_hash, fingerprint, document_id, pages, time.time(), extract_seconds, store_seconds, file_path)
+            )
+
+    def mark_failed(self, file_path: str, error: str, extract_seconds: Optional[float] = None):
+        with self.conn:
+            self.conn.execute(
+                "UPDATE jobs SET state = 'failed', error = ?, finished_at = ?, extract_seconds = ? WHERE file_path = ?",
+                (error, time.time(), extract_seconds, file_path)
+            )
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """The ledger row of a file as a dict, or None if it was never queued."""
+        cursor = self.conn.execute("SELECT * FROM jobs WHERE file_path = ?", (file_path,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip((column[0] for column in cursor.description), row))
+
+    def counts(self) -> Dict[str, int]:
+        """Number of files in each state."""
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(self.conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+        return counts
+
+    def files(self, state: str) -> List[str]:
+        if state not in STATES:
+            raise ValueError(f"Unknown job state {state!r}. Use one of: {', '.join(STATES)}.")
+        return [row[0] for row in self.conn.execute("SELECT file_path FROM jobs WHERE state = ? ORDER BY file_path",
+                                                    (state,))]
+
+    def reset(self):
+        """Forget every file, so the next run processes everything again."""
+        with self.conn:
+            self.conn.execute("DELETE FROM jobs")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
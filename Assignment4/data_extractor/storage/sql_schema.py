@@ -0,0 +1,105 @@
+# Normalized schema used by SQLStorage.store_document. Table names carry a "document" prefix so
+# they never clash with the free-form tables created by SQLStorage.store.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    format TEXT,
+    content_hash TEXT,
+    page_count INTEGER,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_content_hash ON documents (content_hash);
+CREATE INDEX IF NOT EXISTS documents_path ON documents (path);
+
+CREATE TABLE IF NOT EXISTS document_pages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    page_number INTEGER NOT NULL,
+    char_count INTEGER NOT NULL,
+    extraction_method TEXT,
+    UNIQUE (document_id, page_number)
+);
+
+CREATE TABLE IF NOT EXISTS document_text (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    page_number INTEGER,
+    chunk_index INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS document_text_page ON document_text (document_id, page_number, chunk_index);
+
+CREATE TABLE IF NOT EXISTS document_links (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    page_number INTEGER,
+    url TEXT NOT NULL,
+    anchor_text TEXT
+);
+CREATE INDEX IF NOT EXISTS document_links_page ON document_links (document_id, page_number);
+CREATE INDEX IF NOT EXISTS document_links_url ON document_links (url);
+
+CREATE TABLE IF NOT EXISTS document_tables (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    page_number INTEGER,
+    table_index INTEGER NOT NULL,
+    row_count INTEGER NOT NULL,
+    column_count INTEGER NOT NULL,
+    bbox_x0 REAL,
+    bbox_top REAL,
+    bbox_x1 REAL,
+    bbox_bottom REAL
+);
+CREATE INDEX IF NOT EXISTS document_tables_page ON document_tables (document_id, page_number);
+
+CREATE TABLE IF NOT EXISTS document_table_cells (
+    table_id INTEGER NOT NULL REFERENCES document_tables (id) ON DELETE CASCADE,
+    row_index INTEGER NOT NULL,
+    column_index INTEGER NOT NULL,
+    value TEXT,
+    PRIMARY KEY (table_id, row_index, column_index)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS document_images (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    document_id INTEGER NOT NULL REFERENCES documents (id) ON DELETE CASCADE,
+    page_number INTEGER,
+    ext TEXT,
+    width INTEGER,
+    height INTEGER,
+    sha256 TEXT,
+    data BLOB,
+    file_path TEXT
+);
+CREATE INDEX IF NOT EXISTS document_images_page ON document_images (document_id, page_number);
+CREATE INDEX IF NOT EXISTS document_images_sha256 ON document_images (sha256);
+"""
+
+# Columns added to tables after they first shipped; databases created earlier gain them on open
+SCHEMA_MIGRATIONS = {
+    "document_tables": ("bbox_x0 REAL", "bbox_top REAL", "bbox_x1 REAL", "bbox_bottom REAL"),
+}
+
+# Full-text index over document_text, kept in sync by triggers (including cascading deletes).
+# It lives apart from SCHEMA because SQLite builds without FTS5 cannot create it.
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS document_text_fts USING fts5(
+    text,
+    content='document_text',
+    content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS document_text_fts_insert AFTER INSERT ON document_text BEGIN
+    INSERT INTO document_text_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS document_text_fts_delete AFTER DELETE ON document_text BEGIN
+    INSERT INTO document_text_fts (document_text_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS document_text_fts_update AFTER UPDATE ON document_text BEGIN
+    INSERT INTO document_text_fts (document_text_fts, rowid, text) VALUES ('delete', old.id, old.text);
+    INSERT INTO document_text_fts (rowid, text) VALUES (new.id, new.text);
+END;
+"""
@@ -1,36 +1,372 @@
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+from data_extractor.instrumentation import metrics
+from data_extractor.storage.sql_schema import FTS_SCHEMA, SCHEMA, SCHEMA_MIGRATIONS
 from data_extractor.storage.storage import Storage
 
 class SQLStorage(Storage):
-    def __init__(self, database):
+    def __init__(self, database, commit_every: int = 1000, chunk_chars: int = 2000):
         super().__init__(database)
+        # Inside batch() the transaction is committed every commit_every rows
+        self.commit_every = commit_every
+        # Longest text chunk stored by store_document
+        self.chunk_chars = chunk_chars
+        self._prepared_tables = set()
+        # Tables created in the open transaction; a rollback drops them again
+        self._uncommitted_tables = set()
+        self._schema_ready = False
+        self.fts_enabled = False
+        self._batch_depth = 0
+        self._pending_rows = 0
+        # While a document is being stored, intermediate commits are held back
+        self._document_depth = 0
+        # WAL avoids rewriting the whole journal per transaction and NORMAL only syncs at checkpoints
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("PRAGMA synchronous=NORMAL")
+        self.cursor.execute("PRAGMA foreign_keys=ON")
+        # executescript commits any open transaction, so the schema is created here, before any
+        # batch() can be open, never lazily inside one
+        self._ensure_schema()
+
+    def _prepare_table(self, table_name) -> str:
+        """Sanitize the table name and create the table the first time it is used."""
+        self.table_name = table_name.replace(" ", "_").replace("-", "_")
+
+        # Escape the table name to avoid syntax issues
+        escaped_table_name = f'"{self.table_name}"'
+
+        # Create the table if it doesn't exist
+        if self.table_name not in self._prepared_tables:
+            self.cursor.execute(f"""CREATE TABLE IF NOT EXISTS {escaped_table_name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            data TEXT
+            )""")
+            self._prepared_tables.add(self.table_name)
+            if self.conn.in_transaction:
+                self._uncommitted_tables.add(self.table_name)
+        return escaped_table_name
 
     def store(self, table_name, data):
-        # Sanitize the table_name variable
         """
         Stores data in a SQL database.
 
         :param table_name: The name of the table to store the data in.
         :param data: The data to be stored.
         """
-        self.table_name = table_name.replace(" ", "_").replace("-", "_")
+        escaped_table_name = self._prepare_table(table_name)
 
-        # Create the table if it doesn't exist
-        escaped_table_name = f'"{self.table_name}"'
+        # Insert the data into the table
+        self.cursor.execute(f"INSERT INTO {escaped_table_name} (data) VALUES (?)", (str(data),))
+        self._rows_written(1)
 
-        # Create the table if it doesn't exist
-        self.cursor.execute(f"""CREATE TABLE IF NOT EXISTS {escaped_table_name} (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        data TEXT
-        )""")
+    def store_many(self, table_name, rows: Iterable[Any]):
+        """
+        Stores several rows in one table with a single prepared statement.
 
-        # Escape the table name to avoid syntax issues
-        escaped_table_name = f'"{self.table_name}"'
+        :param table_name: The name of the table to store the data in.
+        :param rows: The data items to be stored, one row each.
+        """
+        escaped_table_name = self._prepare_table(table_name)
+        with self.batch():
+            self._insert_chunked(f"INSERT INTO {escaped_table_name} (data) VALUES (?)", ((str(data),) for data in rows))
 
-        # Insert the data into the table
-        self.cursor.execute(f"INSERT INTO {escaped_table_name} (data) VALUES (?)", (str(data),))
+    @contextmanager
+    def batch(self):
+        """
+        Group writes into one transaction, e.g. everything stored for a document.
+
+        The transaction is committed on exit (and every ``commit_every`` rows, except while a
+        document is being stored), or rolled back if the block raises. Batches may be nested;
+        only the outermost one commits.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self.conn.rollback()
+                self._pending_rows = 0
+                self._prepared_tables -= self._uncommitted_tables
+                self._uncommitted_tables.clear()
+            raise
+        self._batch_depth -= 1
+        if not self._batch_depth:
+            self._commit()
+
+    def _rows_written(self, count: int):
+        self._pending_rows += count
+        metrics.count("rows_written", count, backend="sql")
+        if not self._batch_depth or (self._pending_rows >= self.commit_every and not self._document_depth):
+            self._commit()
+
+    def _commit(self):
+        with metrics.stage("sql_commit"):
+            self.conn.commit()
+        self._pending_rows = 0
+        self._uncommitted_tables.clear()
+
+    def _ensure_schema(self):
+        if self._schema_ready:
+            return
+        self.conn.executescript(SCHEMA)
+        for table_name, columns in SCHEMA_MIGRATIONS.items():
+            existing = {row[1] for row in self.cursor.execute(f'PRAGMA table_info("{table_name}")')}
+            for column in columns:
+                if column.split()[0] not in existing:
+                    self.cursor.execute(f'ALTER TABLE "{table_name}" ADD COLUMN {column}')
+        fts_exists = self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'document_text_fts'"
+        ).fetchone() is not None
+        try:
+            self.conn.executescript(FTS_SCHEMA)
+            self.fts_enabled = True
+        except sqlite3.OperationalError:
+            # SQLite was built without FTS5; everything but search() still works
+            self.fts_enabled = False
+        if self.fts_enabled and not fts_exists:
+            # Index text stored before the full-text index existed
+            with self.conn:
+                self.conn.execute("INSERT INTO document_text_fts (document_text_fts) VALUES ('rebuild')")
+        self._schema_ready = True
 
-        # Commit the changes
-        self.conn.commit()
+    def store_document(self, file_path: str, extracted: Dict[str, Any], content_hash: Optional[str] = None,
+                       store_image_data: bool = True, replace: bool = False) -> int:
+        """
+        Store the result of ``Extractor.extract_all`` in the normalized schema.
+
+        :param file_path: Path of the source document.
+        :param extracted: The dictionary returned by extract_all.
+        :param content_hash: Optional hash of the file content, recorded on the document row.
+        :param store_image_data: Keep image bytes as BLOBs; otherwise only metadata and file_path.
+        :param replace: Delete documents stored earlier from the same path, in the same transaction.
+        :return: The id of the new document row.
+        """
+        # Formats without pages keep their text as a single page-less record
+        pages = extracted.get("pages")
+        if pages is None and "text" in extracted:
+            pages = [{"page_number": None, "text": extracted["text"]}]
+        return self.store_document_stream(
+            file_path, pages=pages, urls=extracted.get("urls"), tables=extracted.get("tables"),
+            images=extracted.get("images"), page_count=extracted.get("page_count"),
+            content_hash=content_hash, store_image_data=store_image_data, replace=replace
+        )
+
+    def store_document_stream(self, file_path: str, pages: Optional[Iterable[Dict[str, Any]]] = None,
+                              urls: Optional[Iterable[Dict[str, Any]]] = None,
+                              tables: Optional[Iterable[Any]] = None,
+                              images: Optional[Iterable[Dict[str, Any]]] = None,
+                              page_count: Optional[int] = None, content_hash: Optional[str] = None,
+                              store_image_data: bool = True, replace: bool = False) -> int:
+        """
+        Store a document from the ``Extractor.iter_*`` generators.
+
+        Records are consumed one at a time and inserted in chunks of ``commit_every`` rows, so
+        memory stays bounded by one page or item whatever the size of the document. Nothing is
+        committed before the outermost batch exits: a stream that raises part-way leaves no
+        partial document behind, and ``replace`` never loses the earlier copy.
+
+        :param file_path: Path of the source document.
+        :param pages: ``{"page_number", "text"}`` records, e.g. from iter_text.
+        :param urls: Link records, e.g. from iter_urls.
+        :param tables: Tables as lists of rows or ``{"page_number", "rows", "bbox"}`` records.
+        :param images: Image records, e.g. from iter_images.
+        :param page_count: Number of pages, if known.
+        :param content_hash: Optional hash of the file content, recorded on the document row.
+        :param store_image_data: Keep image bytes as BLOBs; otherwise only metadata and file_path.
+        :param replace: Delete documents stored earlier from the same path, in the same transaction,
+            so storing a document again (e.g. in a resumed batch) never leaves duplicate rows.
+        :return: The id of the new document row.
+        """
+        self._ensure_schema()
+        self._document_depth += 1
+        try:
+            with metrics.stage("sql_store_document"), self.batch():
+                return self._store_document_rows(file_path, pages, urls, tables, images, page_count,
+                                                 content_hash, store_image_data, replace)
+        finally:
+            self._document_depth -= 1
+
+    def _store_document_rows(self, file_path, pages, urls, tables, images, page_count,
+                             content_hash, store_image_data, replace) -> int:
+        """The statements of store_document_stream, run inside its batch."""
+        if replace:
+            # Pages, text, links, tables and images go with it through ON DELETE CASCADE
+            self.cursor.execute("DELETE FROM documents WHERE path = ?", (file_path,))
+        self.cursor.execute(
+            "INSERT INTO documents (path, name, format, content_hash, page_count, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (file_path, os.path.basename(file_path), os.path.splitext(file_path)[1].lstrip(".").lower() or None,
+             content_hash, page_count, time.time())
+        )
+        document_id = self.cursor.lastrowid
+        self._store_pages(document_id, pages or [])
+        self._store_links(document_id, urls or [])
+        self._store_tables(document_id, tables or [])
+        self._store_images(document_id, images or [], store_image_data)
+        return document_id
+
+    def _insert_chunked(self, sql: str, rows: Iterable[tuple]):
+        """executemany over rows in chunks of commit_every, so the rows are never all in memory."""
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= self.commit_every:
+                self.cursor.executemany(sql, chunk)
+                self._rows_written(len(chunk))
+                chunk = []
+        if chunk:
+            self.cursor.executemany(sql, chunk)
+            self._rows_written(len(chunk))
+
+    def _store_pages(self, document_id: int, pages: Iterable[Dict[str, Any]]):
+        page_rows, text_rows = [], []
+        for page in pages:
+            if page["page_number"] is not None:
+                page_rows.append((document_id, page["page_number"], len(page["text"]), page.get("method")))
+            for chunk_index, chunk in enumerate(self._chunk_text(page["text"])):
+                text_rows.append((document_id, page["page_number"], chunk_index, chunk))
+            if len(page_rows) + len(text_rows) >= self.commit_every:
+                self._flush_pages(page_rows, text_rows)
+                page_rows, text_rows = [], []
+        self._flush_pages(page_rows, text_rows)
+
+    def _flush_pages(self, page_rows: List[tuple], text_rows: List[tuple]):
+        self.cursor.executemany(
+            "INSERT INTO document_pages (document_id, page_number, char_count, extraction_method) VALUES (?, ?, ?, ?)",
+            page_rows
+        )
+        self.cursor.executemany(
+            "INSERT INTO document_text (document_id, page_number, chunk_index, text) VALUES (?, ?, ?, ?)", text_rows
+        )
+        self._rows_written(len(page_rows) + len(text_rows))
+
+    def _chunk_text(self, text: str) -> List[str]:
+        """Split text into chunks of at most chunk_chars, breaking at line ends where possible."""
+        chunks = []
+        start = 0
+        while start < len(text):
+            end = min(start + self.chunk_chars, len(text))
+            if end < len(text):
+                newline = text.rfind("\n", start, end)
+                if newline > start:
+                    end = newline + 1
+            chunks.append(text[start:end])
+            start = end
+        return chunks
+
+    def _store_links(self, document_id: int, urls: Iterable[Dict[str, Any]]):
+        self._insert_chunked(
+            "INSERT INTO document_links (document_id, page_number, url, anchor_text) VALUES (?, ?, ?, ?)",
+            ((document_id, link.get("page_number"), link["url"], link.get("linked_text")) for link in urls)
+        )
+
+    def _store_tables(self, document_id: int, tables: Iterable[Any]):
+        for table_index, table in enumerate(tables):
+            # Tables are plain lists of rows, or records carrying their rows, page number and bbox
+            rows = table["rows"] if isinstance(table, dict) else table
+            page_number = table.get("page_number") if isinstance(table, dict) else None
+            bbox = (table.get("bbox") if isinstance(table, dict) else None) or (None,) * 4
+            column_count = max((len(row) for row in rows), default=0)
+            self.cursor.execute(
+                "INSERT INTO document_tables (document_id, page_number, table_index, row_count, column_count, "
+                "bbox_x0, bbox_top, bbox_x1, bbox_bottom) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (document_id, page_number, table_index, len(rows), column_count, *bbox)
+            )
+            table_id = self.cursor.lastrowid
+            self._rows_written(1)
+            self._insert_chunked(
+                "INSERT INTO document_table_cells (table_id, row_index, column_index, value) VALUES (?, ?, ?, ?)",
+                ((table_id, row_index, column_index, None if value is None else str(value))
+                 for row_index, row in enumerate(rows) for column_index, value in enumerate(row))
+            )
+
+    def _store_images(self, document_id: int, images: Iterable[Dict[str, Any]], store_image_data: bool):
+        def rows():
+            for image in images:
+                image_data = image.get("image_data")
+                sha256 = image.get("sha256") or (hashlib.sha256(image_data).hexdigest() if image_data else None)
+                width, height = image.get("dimensions") or (None, None)
+                yield (document_id, image.get("page"), image.get("ext"), width, height, sha256,
+                       image_data if store_image_data else None, image.get("file_path"))
+
+        self._insert_chunked(
+            "INSERT INTO document_images (document_id, page_number, ext, width, height, sha256, data, file_path) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows()
+        )
+
+    def find_document(self, content_hash: str) -> Optional[int]:
+        """Return the id of the latest document stored with this content hash."""
+        self._ensure_schema()
+        row = self.cursor.execute(
+            "SELECT id FROM documents WHERE content_hash = ? ORDER BY id DESC LIMIT 1", (content_hash,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def page_text(self, document_id: int, page_number: int) -> str:
+        self._ensure_schema()
+        rows = self.cursor.execute(
+            "SELECT text FROM document_text WHERE document_id = ? AND page_number = ? ORDER BY chunk_index",
+            (document_id, page_number)
+        ).fetchall()
+        return "".join(row[0] for row in rows)
+
+    def links_on_page(self, document_id: int, page_number: int) -> List[Dict[str, Any]]:
+        self._ensure_schema()
+        rows = self.cursor.execute(
+            "SELECT url, anchor_text FROM document_links WHERE document_id = ? AND page_number = ? ORDER BY id",
+            (document_id, page_number)
+        ).fetchall()
+        return [{"url": url, "linked_text": anchor_text, "page_number": page_number} for url, anchor_text in rows]
+
+    def tables_of_document(self, document_id: int) -> List[List[List[Optional[str]]]]:
+        """Rebuild every stored table of a document as a list of rows."""
+        self._ensure_schema()
+        tables = []
+        for table_id, row_count, column_count in self.cursor.execute(
+            "SELECT id, row_count, column_count FROM document_tables WHERE document_id = ? ORDER BY table_index",
+            (document_id,)
+        ).fetchall():
+            rows = [[None] * column_count for _ in range(row_count)]
+            for row_index, column_index, value in self.conn.execute(
+                "SELECT row_index, column_index, value FROM document_table_cells WHERE table_id = ?", (table_id,)
+            ):
+                rows[row_index][column_index] = value
+            tables.append(rows)
+        return tables
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Full-text search over stored text, best matches first.
+
+        :param query: An FTS5 query, e.g. ``invoice``, ``"net revenue"`` or ``tax AND 2023``.
+        :param limit: Maximum number of hits to return.
+        :return: Hits with document id and path, page number, a highlighted snippet and a score.
+        """
+        self._ensure_schema()
+        if not self.fts_enabled:
+            raise ValueError("Full-text search is not available: SQLite was built without FTS5.")
+        try:
+            rows = self.cursor.execute(
+                """SELECT documents.id, documents.path, document_text.page_number, document_text.chunk_index,
+                snippet(document_text_fts, 0, '[', ']', '...', 16), bm25(document_text_fts) AS score
+                FROM document_text_fts
+                JOIN document_text ON document_text.id = document_text_fts.rowid
+                JOIN documents ON documents.id = document_text.document_id
+                WHERE document_text_fts MATCH ?
+                ORDER BY score
+                LIMIT ?""",
+                (query, limit)
+            ).fetchall()
+        except sqlite3.OperationalError as error:
+            raise ValueError(f"Invalid search query: {error}")
+        # bm25() is lower for better matches; flip it so a higher score means more relevant
+        return [{"document_id": document_id, "path": path, "page_number": page_number,
+                 "chunk_index": chunk_index, "snippet": snippet, "score": -score}
+                for document_id, path, page_number, chunk_index, snippet, score in rows]
 
     def retrieve_all(self, table_name):
         escaped_table_name = f'"{table_name}"'
@@ -43,4 +379,4 @@ class SQLStorage(Storage):
         return self.cursor.fetchone()
 
     def close(self):
-        self.conn.close()
\ No newline at end of file
+        self.conn.close()
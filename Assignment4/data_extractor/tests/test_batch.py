@@ -0,0 +1,34 @@
+import os
+
+from batch import collect_files, output_dirs, process_file, run_batch
+
+def test_collect_files_expands_directories_globs_and_manifest(tmp_path):
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# documents to ingest\ntest_files/pdf/small.pdf\n\ntest_files/docx/small.docx\n")
+    files = collect_files(["test_files/pptx", "test_files/pdf/s*.pdf"], str(manifest))
+    assert "test_files/pptx/small.pptx" in files
+    assert "test_files/pdf/sample.pdf" in files
+    assert "test_files/docx/small.docx" in files
+    assert files.count("test_files/pdf/small.pdf") == 1
+    assert not any(path.endswith(".py") for path in files)
+
+def test_output_dirs_keep_same_named_files_apart():
+    dirs = output_dirs(["a/large.docx", "b/large.pptx", "b/small.pdf"], "out")
+    assert dirs["a/large.docx"] == os.path.join("out", "large")
+    assert dirs["b/large.pptx"].startswith(os.path.join("out", "large_"))
+    assert dirs["b/small.pdf"] == os.path.join("out", "small")
+
+def test_process_file_isolates_failures(tmp_path):
+    result = process_file("test_files/docx/corrupt.docx", str(tmp_path / "corrupt"))
+    assert result["status"] == "failed"
+    assert "Invalid DOCX file." in result["error"]
+
+def test_run_batch_reports_throughput(tmp_path):
+    files = ["test_files/pptx/small.pptx", "test_files/docx/small.docx", "test_files/pptx/corrupt.pptx"]
+    summary = run_batch(files, str(tmp_path), workers=2)
+    assert summary["succeeded"] == 2
+    assert summary["failed"] == 1
+    assert summary["failures"][0]["file_path"] == "test_files/pptx/corrupt.pptx"
+    assert summary["pages"] == 2
+    assert summary["files_per_second"] > 0
+    assert os.path.exists(tmp_path / "small" / "small.txt")
@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from benchmarks.generate_documents import generate_corpus
+from benchmarks.run_benchmarks import compare, main, run_benchmarks
+from data_extractor.data_extractor.extractor_factory import get_extractor
+
+def test_generated_documents_have_the_requested_content(tmp_path):
+    corpus = generate_corpus(str(tmp_path), sizes=["small"])
+    for file_format, file_path in corpus["small"].items():
+        with get_extractor(file_path) as extractor:
+            extractor.load(file_path)
+            extracted = extractor.extract_all()
+        # small: 2 pages with 1 image, 1 table and 2 links each
+        assert len(extracted["images"]) == 2, file_format
+        assert len(extracted["tables"]) == 2, file_format
+        assert [link["url"] for link in extracted["urls"]][:2] == ["https://example.com/1/1", "https://example.com/1/2"]
+        assert "." in extracted["text"]
+
+def test_benchmark_report_and_regression_check(tmp_path):
+    report = run_benchmarks(sizes=["small"], formats=["pptx"], cases=["extract_text", "sql_storage"],
+                            isolate=False, corpus_dir=str(tmp_path))
+    assert [result["case"] for result in report["results"]] == ["extract_text", "sql_storage"]
+    assert all(result["seconds"] > 0 and result["pages"] == 2 for result in report["results"])
+    assert report["meta"]["sizes"]["small"]["pages"] == 2
+
+    slower = {"results": [dict(result, seconds=result["seconds"] * 2) for result in report["results"]]}
+    assert [regression["case"] for regression in compare(slower, report)] == ["extract_text", "sql_storage"]
+    assert compare(report, slower) == []
+
+def test_benchmark_cli_writes_json(tmp_path):
+    output = tmp_path / "results.json"
+    assert main(["--sizes", "small", "--formats", "docx", "--cases", "extract_urls", "--repeat", "1",
+                 "--in-process", "--output", str(output)]) == 0
+    with open(output) as f:
+        assert json.load(f)["results"][0]["format"] == "docx"
+
+def test_benchmark_cli_compares_against_the_untouched_baseline(tmp_path):
+    baseline = tmp_path / "baseline.json"
+    args = ["--sizes", "small", "--formats", "docx", "--cases", "extract_urls", "--repeat", "1", "--in-process"]
+    assert main(args + ["--output", str(baseline)]) == 0
+    with open(baseline) as f:
+        report = json.load(f)
+    # A baseline far faster than any real run makes the new one a regression
+    report["results"][0]["seconds"] = 1e-9
+    baseline.write_text(json.dumps(report))
+    assert main(args + ["--output", str(tmp_path / "latest.json"), "--compare", str(baseline)]) == 1
+    assert json.loads(baseline.read_text())["results"][0]["seconds"] == 1e-9
+
+    with pytest.raises(ValueError, match="--output and --compare"):
+        main(args + ["--output", str(baseline), "--compare", str(baseline)])
+    assert json.loads(baseline.read_text())["results"][0]["seconds"] == 1e-9
@@ -0,0 +1,40 @@
+import pytest
+
+from data_extractor.data_extractor.docx_extractor import DOCXExtractor
+from data_extractor.data_extractor.document_session import DocumentSession
+from data_extractor.data_extractor.pdf_extractor import PDFExtractor
+from data_extractor.file_loaders.docx_loader import DOCXLoader
+from data_extractor.file_loaders.pdf_loader import PDFLoader
+
+class CountingLoader(DOCXLoader):
+    def __init__(self):
+        self.calls = 0
+
+    def load_file(self, file_path):
+        self.calls += 1
+        return super().load_file(file_path)
+
+def test_docx_extractor_parses_file_once():
+    loader = CountingLoader()
+    extractor = DOCXExtractor(loader)
+    extractor.load("test_files/docx/large.docx")
+    extractor.extract_text()
+    extractor.extract_images()
+    extractor.extract_urls()
+    extractor.extract_tables()
+    assert loader.calls == 1
+
+def test_pdf_extractor_reuses_backend_handles():
+    with PDFExtractor(PDFLoader(), text_mode="text") as extractor:
+        extractor.load("test_files/pdf/small.pdf")
+        assert extractor.fitz_document() is extractor.fitz_document()
+        assert extractor.plumber_document() is extractor.plumber_document()
+        fitz_document = extractor.fitz_document()
+    assert extractor.session is None
+    assert fitz_document.is_closed
+
+def test_closed_session_rejects_new_handles():
+    session = DocumentSession("test_files/pdf/small.pdf", PDFLoader())
+    session.close()
+    with pytest.raises(ValueError, match="Document session is closed."):
+        session.document
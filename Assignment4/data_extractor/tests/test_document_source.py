@@ -0,0 +1,108 @@
+import hashlib
+import io
+import mmap
+import os
+
+import pytest
+
+from data_extractor.cache.extraction_cache import ExtractionCache
+from data_extractor.data_extractor.cached_extractor import CachedExtractor
+from data_extractor.data_extractor.extractor_factory import get_extractor
+from data_extractor.data_extractor.pdf_extractor import PDFExtractor
+from data_extractor.file_loaders.document_source import BufferReader, DocumentSource
+from data_extractor.file_loaders.pdf_loader import PDFLoader
+from data_extractor.tests.test_pdf_extractor import make_scanned_pdf
+
+def test_buffer_reader_shares_the_buffer():
+    buffer = bytearray(b"0123456789")
+    reader = BufferReader(buffer)
+    assert reader.read(3) == b"012"
+    reader.seek(-2, io.SEEK_END)
+    assert reader.read() == b"89"
+    # No copy was taken, so a change to the buffer shows through the reader
+    buffer[0:1] = b"x"
+    reader.seek(0)
+    assert reader.read(1) == b"x"
+    assert reader.read(100) == b"123456789"
+
+@pytest.mark.parametrize("file_path", [
+    "test_files/pdf/large.pdf", "test_files/docx/large.docx", "test_files/pptx/large.pptx"
+])
+def test_in_memory_inputs_match_paths(file_path):
+    with get_extractor(file_path) as extractor:
+        extractor.load(file_path)
+        expected = extractor.extract_all()
+    with open(file_path, "rb") as f:
+        data = f.read()
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    for source in (data, io.BytesIO(data), mapped, DocumentSource(data)):
+        with get_extractor(source) as extractor:
+            extractor.load(source)
+            assert extractor.file_path is None
+            assert extractor.extract_all() == expected
+    # Every view the parsers took of the caller's map was released on close
+    mapped.close()
+
+def test_path_is_mapped_once_and_unmapped_on_close():
+    with PDFExtractor(PDFLoader(), text_mode="text") as extractor:
+        extractor.load("test_files/pdf/small.pdf")
+        extractor.plumber_document()
+        mapped = extractor.session.source.buffer
+        assert extractor.session.source.buffer is mapped
+    assert mapped.closed
+
+def test_in_memory_pdf_is_spilled_to_a_file_only_for_ocr(tmp_path, monkeypatch):
+    make_scanned_pdf(str(tmp_path / "scan.pdf"), 2)
+    extractor = PDFExtractor(PDFLoader())
+    paths = []
+
+    def fake_ocr_pages(file_path, page_numbers):
+        paths.append(file_path)
+        return {number: f"ocr page {number}" for number in page_numbers}
+
+    monkeypatch.setattr(extractor.ocr_engine, "ocr_pages", fake_ocr_pages)
+    extractor.load((tmp_path / "scan.pdf").read_bytes())
+    assert extractor.extract_text() == "ocr page 1ocr page 2"
+    assert os.path.exists(paths[0])
+    extractor.close()
+    assert not os.path.exists(paths[0])
+
+def test_cached_extractor_hashes_in_memory_documents(tmp_path):
+    with open("test_files/pptx/small.pptx", "rb") as f:
+        data = f.read()
+    cache = ExtractionCache(str(tmp_path / "cache.db"))
+    with CachedExtractor(get_extractor(data), cache) as extractor:
+        extractor.load(data)
+        assert extractor.content_hash == hashlib.sha256(data).hexdigest()
+        assert extractor.extract_text()
+    cache.close()
+
+class Pipe(io.RawIOBase):
+    """A stream that can only be read forward, like a socket or a message body."""
+
+    def __init__(self, data):
+        self._data = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        return self._data.readinto(target)
+
+def test_non_seekable_streams_are_not_silently_consumed():
+    with open("test_files/docx/small.docx", "rb") as f:
+        data = f.read()
+    stream = Pipe(data)
+    with pytest.raises(ValueError, match="non-seekable stream"):
+        get_extractor(stream)
+    assert stream.read(4) == b"PK\x03\x04"
+    # Wrapped once, the stream is read once and shared by detection and loading
+    source = DocumentSource(Pipe(data))
+    with get_extractor(source) as extractor:
+        extractor.load(source)
+        assert extractor.extract_text()
+
+def test_seeking_before_the_start_fails_like_a_file():
+    reader = BufferReader(b"PK\x03\x04")
+    with pytest.raises(OSError):
+        reader.seek(-22, io.SEEK_END)
@@ -0,0 +1,61 @@
+import docx
+from docx.opc.constants import RELATIONSHIP_TYPE
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+from data_extractor.data_extractor.docx_extractor import DOCXExtractor
+from data_extractor.file_loaders.docx_loader import DOCXLoader
+
+def add_hyperlink(document, paragraph, url, text):
+    rel_id = document.part.relate_to(url, RELATIONSHIP_TYPE.HYPERLINK, is_external=True)
+    hyperlink = OxmlElement("w:hyperlink")
+    hyperlink.set(qn("r:id"), rel_id)
+    run = OxmlElement("w:r")
+    run_text = OxmlElement("w:t")
+    run_text.text = text
+    run.append(run_text)
+    hyperlink.append(run)
+    paragraph._p.append(hyperlink)
+
+def test_extract_urls_reports_page_and_section(tmp_path):
+    document = docx.Document()
+    add_hyperlink(document, document.add_paragraph("First "), "https://example.com/one", "one")
+    document.add_page_break()
+    add_hyperlink(document, document.add_paragraph(), "https://example.com/two", "two")
+    document.add_section()
+    add_hyperlink(document, document.add_paragraph(), "https://example.com/three", "three")
+    file_path = tmp_path / "links.docx"
+    document.save(file_path)
+
+    extractor = DOCXExtractor(DOCXLoader())
+    extractor.load(str(file_path))
+    links = extractor.extract_urls()
+    assert [(link["linked_text"], link["url"], link["page_number"], link["section_number"]) for link in links] == [
+        ("one", "https://example.com/one", 1, 1),
+        ("two", "https://example.com/two", 2, 1),
+        ("three", "https://example.com/three", 2, 2),
+    ]
+
+def test_extract_urls_follows_rendered_page_breaks():
+    extractor = DOCXExtractor(DOCXLoader())
+    extractor.load("test_files/docx/large.docx")
+    links = extractor.extract_urls()
+    assert links[-1]["linked_text"] == "IBM Data Analytics"
+    assert links[-1]["page_number"] == 2
+
+def test_page_count_does_not_depend_on_the_kinds(tmp_path):
+    document = docx.Document()
+    document.add_paragraph("Page one")
+    for text in ("Page two", "Page three"):
+        # The marker Word leaves where a page started when it last laid the file out
+        run = document.add_paragraph().add_run(text)
+        run._r.insert(0, OxmlElement("w:lastRenderedPageBreak"))
+    document.add_table(rows=1, cols=2)
+    file_path = tmp_path / "rendered.docx"
+    document.save(file_path)
+
+    extractor = DOCXExtractor(DOCXLoader())
+    extractor.load(str(file_path))
+    assert extractor.extract_all()["page_count"] == 3
+    assert extractor.extract_all(["text", "tables"])["page_count"] == 3
+    assert extractor.extract_all(["images"])["page_count"] == 3
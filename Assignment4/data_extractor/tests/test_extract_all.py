@@ -0,0 +1,43 @@
+import pytest
+
+from data_extractor.data_extractor.docx_extractor import DOCXExtractor
+from data_extractor.data_extractor.pdf_extractor import PDFExtractor
+from data_extractor.data_extractor.pptx_extractor import PPTXExtractor
+from data_extractor.file_loaders.docx_loader import DOCXLoader
+from data_extractor.file_loaders.pdf_loader import PDFLoader
+from data_extractor.file_loaders.ppt_loader import PPTLoader
+
+@pytest.mark.parametrize("extractor, file_path", [
+    (PDFExtractor(PDFLoader(), text_mode="text"), "test_files/pdf/large.pdf"),
+    (PPTXExtractor(PPTLoader()), "test_files/pptx/large.pptx"),
+    (DOCXExtractor(DOCXLoader()), "test_files/docx/large.docx"),
+])
+def test_extract_all_matches_individual_methods(extractor, file_path):
+    with extractor:
+        extractor.load(file_path)
+        result = extractor.extract_all()
+        assert result["text"] == extractor.extract_text()
+        assert result["images"] == extractor.extract_images()
+        assert result["tables"] == list(extractor.iter_tables())
+        assert [table["rows"] for table in result["tables"]] == extractor.extract_tables()
+        assert [link["url"] for link in result["urls"]]
+
+def test_extract_all_only_returns_requested_kinds():
+    with PPTXExtractor(PPTLoader()) as extractor:
+        extractor.load("test_files/pptx/large.pptx")
+        result = extractor.extract_all(kinds=["tables"])
+    assert set(result) == {"page_count", "tables"}
+    assert result["page_count"] == 3
+
+def test_extract_all_reports_text_per_page():
+    with PDFExtractor(PDFLoader(), text_mode="text") as extractor:
+        extractor.load("test_files/pdf/small.pdf")
+        result = extractor.extract_all(kinds="text")
+    assert [page["page_number"] for page in result["pages"]] == [1, 2]
+    assert result["text"] == "".join(page["text"] for page in result["pages"])
+
+def test_extract_all_rejects_unknown_kinds():
+    with PDFExtractor(PDFLoader()) as extractor:
+        extractor.load("test_files/pdf/small.pdf")
+        with pytest.raises(ValueError, match="Unsupported artifact kind."):
+            extractor.extract_all(kinds=["audio"])
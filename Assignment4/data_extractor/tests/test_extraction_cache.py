@@ -0,0 +1,54 @@
+import pytest
+
+from data_extractor.cache.extraction_cache import ExtractionCache
+from data_extractor.data_extractor.cached_extractor import CachedExtractor
+from data_extractor.data_extractor.pptx_extractor import PPTXExtractor
+from data_extractor.file_loaders.ppt_loader import PPTLoader
+
+class CountingLoader(PPTLoader):
+    def __init__(self):
+        self.calls = 0
+
+    def load_file(self, file_path):
+        self.calls += 1
+        return super().load_file(file_path)
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache.db"))
+    yield cache
+    cache.close()
+
+def test_cache_hit_skips_parsing(cache):
+    loader = CountingLoader()
+    first = CachedExtractor(PPTXExtractor(loader), cache)
+    first.load("test_files/pptx/small.pptx")
+    expected = first.extract_all()
+    assert loader.calls == 1
+
+    second = CachedExtractor(PPTXExtractor(loader), cache)
+    second.load("test_files/pptx/small.pptx")
+    assert second.extract_all() == expected
+    assert loader.calls == 1
+    assert cache.hits == 1
+
+def test_invalidate_forces_extraction(cache):
+    loader = CountingLoader()
+    extractor = CachedExtractor(PPTXExtractor(loader), cache)
+    extractor.load("test_files/pptx/small.pptx")
+    extractor.extract_text()
+    extractor.invalidate()
+    extractor.load("test_files/pptx/small.pptx")
+    extractor.extract_text()
+    assert loader.calls == 2
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache.db"), max_bytes=2500)
+    cache.put("old", b"x" * 1000, "a")
+    cache.put("recent", b"y" * 1000, "b")
+    cache.get("old")
+    cache.put("new", b"z" * 1000, "c")
+    assert cache.get("recent") is None
+    assert cache.get("old") == b"x" * 1000
+    assert cache.total_bytes() <= 2500
+    cache.close()
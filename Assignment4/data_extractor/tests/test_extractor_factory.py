@@ -0,0 +1,70 @@
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from data_extractor.data_extractor import extractor_factory
+from data_extractor.data_extractor.extractor_factory import (DocumentFormat, detect_format, get_extractor,
+                                                             register_format, supported_extensions)
+from data_extractor.file_loaders.signatures import HEADER_SIGNATURES, sniff_format
+
+class NoteLoader:
+    def load_file(self, file_path):
+        with open(file_path) as f:
+            return f.read()
+
+class NoteExtractor:
+    def __init__(self, loader):
+        self.loader = loader
+
+def test_formats_are_sniffed_from_content_not_extension(tmp_path):
+    shutil.copy("test_files/docx/small.docx", tmp_path / "upload.bin")
+    shutil.copy("test_files/pdf/small.pdf", tmp_path / "upload.pptx")
+    assert sniff_format(str(tmp_path / "upload.bin")) == "docx"
+    assert sniff_format("test_files/pptx/small.pptx") == "pptx"
+    assert detect_format(str(tmp_path / "upload.pptx")).name == "pdf"
+
+    texts = []
+    for file_path in (str(tmp_path / "upload.bin"), "test_files/docx/small.docx"):
+        with get_extractor(file_path) as extractor:
+            extractor.load(file_path)
+            texts.append(extractor.extract_text())
+    assert type(extractor).__name__ == "DOCXExtractor"
+    assert texts[0] and texts[0] == texts[1]
+
+def test_unrecognised_content_falls_back_to_the_extension():
+    # Legacy .ppt and corrupt files say nothing about their format; their loaders report the error
+    assert sniff_format("test_files/pptx/sample_presentation.ppt") is None
+    assert detect_format("test_files/pptx/sample_presentation.ppt").name == "pptx"
+    assert detect_format("test_files/pdf/corrupt.pdf").name == "pdf"
+    assert detect_format("missing.txt") is None
+    with pytest.raises(ValueError, match="Unsupported file format. Use PDF, DOCX, or PPTX."):
+        get_extractor("notes.txt")
+
+def test_registered_formats_plug_in(tmp_path):
+    (tmp_path / "todo.note").write_text("NOTE\nbuy milk")
+    register_format(DocumentFormat("note", (".note",), f"{__name__}:NoteLoader", f"{__name__}:NoteExtractor",
+                                   signature=b"NOTE\n"))
+    try:
+        shutil.copy(tmp_path / "todo.note", tmp_path / "todo.txt")
+        assert ".note" in supported_extensions()
+        extractor = get_extractor(str(tmp_path / "todo.txt"))
+        assert isinstance(extractor, NoteExtractor)
+        assert extractor.loader.load_file(str(tmp_path / "todo.txt")).endswith("buy milk")
+    finally:
+        extractor_factory._FORMATS.pop("note")
+        HEADER_SIGNATURES.pop("note")
+
+def test_docx_run_imports_no_pdf_or_ocr_backend():
+    script = (
+        "import sys, batch\n"
+        "from data_extractor.data_extractor.extractor_factory import get_extractor\n"
+        "with get_extractor('test_files/docx/small.docx', ocr_workers=1) as extractor:\n"
+        "    extractor.load('test_files/docx/small.docx')\n"
+        "    extractor.extract_all()\n"
+        "print(sorted(name for name in ('fitz', 'pdfplumber', 'pdf2image', 'pytesseract', 'pandas', 'PyPDF2', 'pptx')"
+        " if name in sys.modules))\n"
+    )
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == "[]"
@@ -0,0 +1,38 @@
+import json
+import os
+
+from data_extractor.storage.file_storage import FileStorage
+from data_extractor.storage.image_store import ImageStore
+
+def test_image_store_writes_each_blob_once(tmp_path):
+    store = ImageStore(str(tmp_path / "blobs"))
+    sha256, path, created = store.put(b"logo", "png")
+    assert created
+    assert store.put(b"logo", "png") == (sha256, path, False)
+    assert path == os.path.join(str(tmp_path / "blobs"), sha256[:2], f"{sha256}.png")
+
+def test_save_images_dedupes_within_and_across_documents(tmp_path):
+    shared = str(tmp_path / "_image_store")
+    logo = {"image_data": b"logo", "ext": "png", "dimensions": (4, 4)}
+    photo = {"image_data": b"photo", "ext": "jpeg", "page": 2, "dimensions": (8, 8)}
+
+    first = FileStorage(str(tmp_path / "first"), image_store_dir=shared)
+    metadata = first.save_images([dict(logo, page=1), photo, dict(logo, page=3)], "first.pdf")
+    assert [entry["occurrences"] for entry in metadata] == [[1, 3], [2]]
+
+    second = FileStorage(str(tmp_path / "second"), image_store_dir=shared)
+    second.save_images([dict(logo, page=1)], "second.pdf")
+
+    blobs = [name for _, _, names in os.walk(shared) for name in names]
+    assert len(blobs) == 2
+    with open(tmp_path / "first" / "images" / "metadata.json") as f:
+        assert json.load(f)[0]["file_path"] == metadata[0]["file_path"]
+
+def test_table_metadata_keeps_page_and_bbox(tmp_path):
+    storage = FileStorage(str(tmp_path))
+    storage.store([{"page_number": 2, "rows": [["a", "b"]], "bbox": (72.0, 200.0, 272.0, 260.0)}, [["c"]]],
+                  "report.pdf", "table")
+    with open(tmp_path / "tables" / "metadata.json") as f:
+        metadata = json.load(f)
+    assert [(table["page_number"], table["bbox"]) for table in metadata] == [(2, [72.0, 200.0, 272.0, 260.0]),
+                                                                              ("N/A", None)]
@@ -0,0 +1,87 @@
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+from batch import main, run_batch
+from data_extractor.storage.job_ledger import JobLedger
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = JobLedger(str(tmp_path / "jobs.db"))
+    yield ledger
+    ledger.close()
+
+def test_ledger_tracks_a_file_through_its_states(ledger):
+    pending = ledger.enqueue(["test_files/pdf/small.pdf"], {"test_files/pdf/small.pdf": "out/small"})
+    assert pending == {"test_files/pdf/small.pdf": "out/small"}
+    ledger.mark_extracting("test_files/pdf/small.pdf")
+    assert ledger.counts() == {"queued": 0, "extracting": 1, "stored": 0, "failed": 0}
+    ledger.mark_stored("test_files/pdf/small.pdf", "abc", 7, 2, 0.5, 0.1)
+    job = ledger.get("test_files/pdf/small.pdf")
+    assert (job["state"], job["content_hash"], job["document_id"], job["attempts"]) == ("stored", "abc", 7, 1)
+    assert job["extract_seconds"] == 0.5 and job["store_seconds"] == 0.1
+    # Stored and unchanged, so a later run skips it
+    assert ledger.enqueue(["test_files/pdf/small.pdf"], {"test_files/pdf/small.pdf": "elsewhere"}) == {}
+    with pytest.raises(ValueError, match="Unknown job state"):
+        ledger.files("done")
+
+def test_changed_files_are_queued_again_in_their_old_folder(ledger, tmp_path):
+    file_path = str(tmp_path / "report.pptx")
+    shutil.copy("test_files/pptx/small.pptx", file_path)
+    ledger.enqueue([file_path], {file_path: "out/report"})
+    ledger.mark_stored(file_path)
+    os.utime(file_path, (0, 0))
+    assert ledger.enqueue([file_path], {file_path: "out/report_1234"}) == {file_path: "out/report"}
+
+def test_resumed_batch_runs_only_unfinished_files_without_duplicates(tmp_path):
+    files = ["test_files/pptx/small.pptx", "test_files/docx/small.docx", "test_files/pptx/corrupt.pptx"]
+    database = str(tmp_path / "extracted.db")
+    ledger_path = JobLedger.default_path(database, str(tmp_path / "out"))
+    assert ledger_path == str(tmp_path / "extracted_jobs.db")
+
+    first = run_batch(files, str(tmp_path / "out"), workers=2, database=database, ledger_path=ledger_path)
+    assert (first["succeeded"], first["failed"], first["skipped"]) == (2, 1, 0)
+    with JobLedger(ledger_path) as ledger:
+        assert ledger.files("failed") == ["test_files/pptx/corrupt.pptx"]
+        assert len(ledger.get("test_files/docx/small.docx")["content_hash"]) == 64
+        # A crash after the database write but before the ledger recorded it
+        ledger.mark_extracting("test_files/docx/small.docx")
+
+    second = run_batch(files, str(tmp_path / "out"), workers=2, database=database, ledger_path=ledger_path)
+    assert (second["succeeded"], second["failed"], second["skipped"]) == (1, 1, 1)
+    with sqlite3.connect(database) as conn:
+        paths = sorted(row[0] for row in conn.execute("SELECT path FROM documents"))
+    assert paths == ["test_files/docx/small.docx", "test_files/pptx/small.pptx"]
+    with JobLedger(ledger_path) as ledger:
+        # The first run, the interrupted attempt and the resumed one
+        assert ledger.get("test_files/docx/small.docx")["attempts"] == 3
+        assert ledger.get("test_files/docx/small.docx")["state"] == "stored"
+        assert ledger.get("test_files/pptx/corrupt.pptx")["attempts"] == 2
+        assert ledger.get("test_files/pptx/small.pptx")["attempts"] == 1
+
+def test_cli_resumes_by_default_and_restart_starts_over(tmp_path, capsys):
+    argv = ["test_files/pptx/small.pptx", "--workers", "1", "--output-dir", str(tmp_path / "out"),
+            "--database", str(tmp_path / "extracted.db")]
+    assert main(argv) == 0
+    assert main(argv) == 0
+    assert "1 already stored" in capsys.readouterr().out
+    assert main(argv + ["--restart"]) == 0
+    assert "already stored" not in capsys.readouterr().out
+
+def test_files_stored_with_other_settings_are_run_again(tmp_path):
+    files = ["test_files/pdf/large.pdf"]
+    database = str(tmp_path / "extracted.db")
+    ledger_path = str(tmp_path / "jobs.db")
+    partial = run_batch(files, str(tmp_path / "out"), workers=1, database=database, ledger_path=ledger_path,
+                        pages=[1], kinds=("text",))
+    assert partial["pages"] == 1
+    same = run_batch(files, str(tmp_path / "out"), workers=1, database=database, ledger_path=ledger_path,
+                     pages=[1], kinds=("text",))
+    assert same["skipped"] == 1
+    full = run_batch(files, str(tmp_path / "out"), workers=1, database=database, ledger_path=ledger_path)
+    assert (full["skipped"], full["succeeded"], full["pages"]) == (0, 1, 3)
+    with sqlite3.connect(database) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0] == 1
+        assert conn.execute("SELECT COUNT(*) FROM document_pages").fetchone()[0] == 3
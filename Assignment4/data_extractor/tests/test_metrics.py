@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from batch import run_batch
+from data_extractor.data_extractor.pdf_extractor import PDFExtractor
+from data_extractor.file_loaders.pdf_loader import PDFLoader
+from data_extractor.instrumentation import metrics
+from data_extractor.instrumentation.metrics import MetricsRecorder
+from data_extractor.storage.sql_storage import SQLStorage
+
+@pytest.fixture
+def recorder():
+    recorder = metrics.enable()
+    yield recorder
+    metrics.disable()
+
+def stage_totals(snapshot, name):
+    return [stage for stage in snapshot["stages"] if stage["name"] == name]
+
+def test_disabled_instrumentation_records_nothing():
+    assert not metrics.enabled()
+    assert metrics.stage("tables") is metrics.stage("ocr")
+    with metrics.stage("tables"):
+        metrics.count("pages_processed", 3)
+    assert metrics.get_recorder() is None
+
+def test_recorder_aggregates_stages_counters_and_events():
+    recorder = MetricsRecorder()
+    events = []
+    recorder.subscribe(events.append)
+    recorder.record_stage("ocr", 1.5, 1.0, format="pdf")
+    recorder.record_stage("ocr", 0.5, 0.25, True, format="pdf")
+    recorder.increment("cache_hits", 2, cache="ocr")
+
+    snapshot = recorder.snapshot()
+    assert snapshot["stages"] == [{"name": "ocr", "labels": {"format": "pdf"}, "count": 2,
+                                   "wall_seconds": 2.0, "cpu_seconds": 1.25, "errors": 1}]
+    assert snapshot["counters"] == [{"name": "cache_hits", "labels": {"cache": "ocr"}, "value": 2}]
+    assert [event["type"] for event in events] == ["stage", "stage", "counter"]
+
+    other = MetricsRecorder()
+    other.merge(snapshot)
+    other.merge(snapshot)
+    assert other.snapshot()["counters"][0]["value"] == 4
+
+    prometheus = recorder.to_prometheus()
+    assert 'data_extractor_stage_wall_seconds_total{format="pdf",stage="ocr"} 2.0' in prometheus
+    assert 'data_extractor_cache_hits_total{cache="ocr"} 2' in prometheus
+
+def test_extraction_and_storage_are_instrumented(recorder, tmp_path):
+    with PDFExtractor(PDFLoader(), text_mode="text") as extractor:
+        extractor.load("test_files/pdf/small.pdf")
+        extracted = extractor.extract_all()
+    storage = SQLStorage(str(tmp_path / "extracted.db"))
+    storage.store_document("test_files/pdf/small.pdf", extracted)
+    storage.close()
+
+    snapshot = recorder.snapshot()
+    assert stage_totals(snapshot, "text_layer")[0]["count"] == 2
+    assert stage_totals(snapshot, "tables")[0]["count"] == 2
+    assert stage_totals(snapshot, "sql_store_document")[0]["count"] == 1
+    assert {"name": "pages_processed", "labels": {"format": "pdf", "method": "text_layer"}, "value": 2} \
+        in snapshot["counters"]
+    assert any(counter["name"] == "bytes_read" for counter in snapshot["counters"])
+
+def test_batch_merges_worker_metrics(tmp_path):
+    metrics_file = tmp_path / "metrics.json"
+    run_batch(["test_files/pptx/small.pptx", "test_files/pdf/small.pdf"], str(tmp_path / "out"), workers=2,
+              database=str(tmp_path / "extracted.db"), metrics_path=str(metrics_file))
+    assert not metrics.enabled()
+    with open(metrics_file) as f:
+        snapshot = json.load(f)
+    assert sorted(stage["labels"]["format"] for stage in stage_totals(snapshot, "extract")) == ["pdf", "pptx"]
+    assert stage_totals(snapshot, "sql_store_document")[0]["count"] == 2
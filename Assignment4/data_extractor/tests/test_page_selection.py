@@ -0,0 +1,72 @@
+import pytest
+
+from data_extractor.cache.extraction_cache import ExtractionCache
+from data_extractor.data_extractor.cached_extractor import CachedExtractor
+from data_extractor.data_extractor.docx_extractor import DOCXExtractor
+from data_extractor.data_extractor.extractor import Extractor, parse_pages
+from data_extractor.data_extractor.pdf_extractor import PDFExtractor
+from data_extractor.data_extractor.pptx_extractor import PPTXExtractor
+from data_extractor.file_loaders.docx_loader import DOCXLoader
+from data_extractor.file_loaders.pdf_loader import PDFLoader
+from data_extractor.file_loaders.ppt_loader import PPTLoader
+from data_extractor.tests.test_pdf_extractor import make_scanned_pdf
+
+def test_parse_and_resolve_pages():
+    assert parse_pages("1-3, 7,9-10") == [1, 2, 3, 7, 9, 10]
+    assert Extractor.resolve_pages([3, 1, 3]) == (1, 3)
+    assert Extractor.resolve_pages(None) is None
+    with pytest.raises(ValueError):
+        parse_pages("1-x")
+    with pytest.raises(ValueError):
+        Extractor.resolve_pages([0, 1])
+    with pytest.raises(ValueError):
+        Extractor.resolve_pages([])
+
+def test_pdf_only_touches_selected_pages(monkeypatch):
+    with PDFExtractor(PDFLoader(), text_mode="text") as extractor:
+        extractor.load("test_files/pdf/large.pdf", pages=[2, 99])
+        loaded = []
+        load_page = extractor.fitz_document().load_page
+        monkeypatch.setattr(extractor.fitz_document(), "load_page",
+                            lambda index: loaded.append(index) or load_page(index))
+        result = extractor.extract_all()
+        assert [page["page_number"] for page in result["pages"]] == [2]
+        assert {link["page_number"] for link in result["urls"]} <= {2}
+        assert [table["page_number"] for table in extractor.iter_tables()] == [2] * len(result["tables"])
+        assert [page.page_number for page in extractor.plumber_document().pages] == [2]
+        assert result["page_count"] == 3
+    assert set(loaded) == {1}
+
+def test_pdf_ocr_renders_only_selected_pages(tmp_path, monkeypatch):
+    make_scanned_pdf(str(tmp_path / "scan.pdf"), 5)
+    extractor = PDFExtractor(PDFLoader())
+    requested = []
+    monkeypatch.setattr(extractor.ocr_engine, "ocr_pages",
+                        lambda file_path, page_numbers: requested.extend(page_numbers) or {})
+    extractor.load(str(tmp_path / "scan.pdf"), pages=range(4, 6))
+    extractor.extract_text()
+    extractor.close()
+    assert requested == [4, 5]
+
+def test_pptx_slices_slides():
+    with PPTXExtractor(PPTLoader()) as extractor:
+        extractor.load("test_files/pptx/large.pptx", pages=[2, 3])
+        result = extractor.extract_all()
+        assert [page["page_number"] for page in result["pages"]] == [2, 3]
+        assert all(image["page"] in (2, 3) for image in extractor.extract_images())
+        assert result["text"] == extractor.extract_text()
+
+def test_docx_rejects_page_selection():
+    with pytest.raises(ValueError, match="not supported for DOCX"):
+        DOCXExtractor(DOCXLoader()).load("test_files/docx/large.docx", pages=[1])
+
+def test_cached_results_are_keyed_by_page_selection(tmp_path):
+    cache = ExtractionCache(str(tmp_path / "cache.db"))
+    extractor = CachedExtractor(PPTXExtractor(PPTLoader()), cache)
+    extractor.load("test_files/pptx/large.pptx", pages=[1])
+    first_slide = extractor.extract_text()
+    extractor.load("test_files/pptx/large.pptx")
+    assert extractor.extract_text() != first_slide
+    assert cache.hits == 0
+    extractor.close()
+    cache.close()
@@ -0,0 +1,231 @@
+import fitz
+import pytest
+from pdfplumber import page as pdfplumber_page
+
+from data_extractor.cache.ocr_cache import OCRCache
+from data_extractor.data_extractor import ocr_engine
+from data_extractor.data_extractor.ocr_engine import OCREngine
+from data_extractor.data_extractor.pdf_extractor import PDFExtractor
+from data_extractor.file_loaders.pdf_loader import PDFLoader
+
+@pytest.fixture
+def pdf_extractor():
+    return PDFExtractor(PDFLoader())
+
+def test_hybrid_text_uses_text_layer_for_born_digital_pages(pdf_extractor, monkeypatch):
+    ocr_calls = []
+    monkeypatch.setattr(pdf_extractor.ocr_engine, "ocr_pages",
+                        lambda file_path, page_numbers: ocr_calls.extend(page_numbers) or {})
+    pdf_extractor.load("test_files/pdf/small.pdf")
+    pages = pdf_extractor.extract_text_pages()
+    assert [page["method"] for page in pages] == ["text_layer", "text_layer"]
+    assert ocr_calls == []
+    assert pdf_extractor.extract_text() == "".join(page["text"] for page in pages)
+
+def test_hybrid_text_falls_back_to_ocr_for_empty_pages(pdf_extractor, monkeypatch):
+    monkeypatch.setattr(pdf_extractor.ocr_engine, "ocr_pages",
+                        lambda file_path, page_numbers: {number: f"ocr page {number}" for number in page_numbers})
+    pdf_extractor.load("test_files/pdf/empty.pdf")
+    pages = pdf_extractor.extract_text_pages()
+    assert pages[0]["method"] == "ocr"
+    assert pages[0]["text"] == "ocr page 1"
+
+def test_text_layer_rejects_garbage(pdf_extractor):
+    usable, reason = pdf_extractor._text_layer_usable("\ufffd" * 40 + "abc" * 5, 0.0)
+    assert not usable
+    assert "garbage" in reason
+
+def test_invalid_text_mode():
+    with pytest.raises(ValueError, match="Unsupported text mode."):
+        PDFExtractor(PDFLoader(), text_mode="magic")
+
+def test_ocr_engine_splits_contiguous_ranges():
+    engine = OCREngine(workers=2, pages_per_task=3)
+    assert engine.split_ranges([1, 2, 3, 4, 5, 9, 10, 12]) == [(1, 3), (4, 5), (9, 10), (12, 12)]
+    assert engine.split_ranges([]) == []
+
+def test_ocr_engine_tesseract_config():
+    assert OCREngine(oem=1, psm=6).tesseract_config() == "--oem 1 --psm 6"
+    assert OCREngine().tesseract_config() == ""
+
+def test_ocr_engine_renders_only_requested_pages(monkeypatch):
+    rendered = []
+
+    def fake_convert(file_path, dpi, first_page, last_page, grayscale, thread_count, **kwargs):
+        rendered.append((first_page, last_page, dpi, grayscale))
+        return [f"image {number}" for number in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr(ocr_engine, "convert_from_path", fake_convert)
+    monkeypatch.setattr(ocr_engine.pytesseract, "image_to_string",
+                        lambda image, lang, config: f"{image} {config}")
+    engine = OCREngine(workers=1, dpi=150, psm=4)
+    assert engine.ocr_pages("scan.pdf", [7, 2, 3]) == {2: "image 2 --psm 4", 3: "image 3 --psm 4", 7: "image 7 --psm 4"}
+    assert rendered == [(2, 3, 150, True), (7, 7, 150, True)]
+
+def test_ocr_engine_renders_in_bounded_windows(monkeypatch):
+    windows = []
+
+    def fake_convert(file_path, first_page, last_page, **kwargs):
+        windows.append((first_page, last_page))
+        return [f"image {number}" for number in range(first_page, last_page + 1)]
+
+    monkeypatch.setattr(ocr_engine, "convert_from_path", fake_convert)
+    monkeypatch.setattr(ocr_engine.pytesseract, "image_to_string", lambda image, lang, config: image)
+    engine = OCREngine(workers=1, window_size=2)
+    assert list(engine.ocr_pages("scan.pdf", range(1, 6))) == [1, 2, 3, 4, 5]
+    assert windows == [(1, 2), (3, 4), (5, 5)]
+
+def test_ocr_engine_window_from_memory_budget():
+    engine = OCREngine(workers=2, dpi=200, grayscale=True, max_memory_mb=64)
+    # A grayscale letter page at 200 DPI is about 3.7 MB, doubled while tesseract runs
+    assert engine.window_pages() == 4
+    assert OCREngine(workers=2, max_memory_mb=1).window_pages() == 1
+
+def make_scanned_pdf(file_path, page_count):
+    pixmap = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 50, 50), False)
+    pixmap.clear_with(200)
+    document = fitz.open()
+    for _ in range(page_count):
+        page = document.new_page()
+        page.insert_image(page.rect, pixmap=pixmap)
+    document.save(file_path)
+    document.close()
+
+def test_ocr_cache_reuses_identical_pages(tmp_path, monkeypatch):
+    make_scanned_pdf(str(tmp_path / "scan.pdf"), 3)
+    ocr_cache = OCRCache(str(tmp_path / "ocr.db"))
+    recognised = []
+
+    def fake_ocr_pages(file_path, page_numbers):
+        recognised.append(list(page_numbers))
+        return {number: "scanned text" for number in page_numbers}
+
+    for _ in range(2):
+        extractor = PDFExtractor(PDFLoader(), ocr_cache=ocr_cache)
+        monkeypatch.setattr(extractor.ocr_engine, "ocr_pages", fake_ocr_pages)
+        extractor.load(str(tmp_path / "scan.pdf"))
+        assert extractor.extract_text() == "scanned text" * 3
+        extractor.close()
+
+    # Identical pages are recognised once, and the second run renders nothing at all
+    assert recognised == [[1], []]
+    assert ocr_cache.hits == 1
+    ocr_cache.close()
+
+def test_repeated_image_xref_is_extracted_once(tmp_path, monkeypatch):
+    make_scanned_pdf(str(tmp_path / "scan.pdf"), 3)
+    extractor = PDFExtractor(PDFLoader())
+    extractor.load(str(tmp_path / "scan.pdf"))
+    extract_image = extractor.fitz_document().extract_image
+    calls = []
+    monkeypatch.setattr(extractor.fitz_document(), "extract_image",
+                        lambda xref: calls.append(xref) or extract_image(xref))
+    images = extractor.extract_images()
+    assert [image["page"] for image in images] == [1, 2, 3]
+    assert len(calls) == 1
+    assert len({image["sha256"] for image in images}) == 1
+
+def make_table_pdf(file_path, table_pages):
+    document = fitz.open()
+    for page_number in range(1, 5):
+        page = document.new_page()
+        page.insert_text((72, 72), f"Page {page_number} text")
+        # A single rectangle is one cell, which pdfplumber does not report as a table
+        page.draw_rect(fitz.Rect(50, 50, 500, 90), color=(0, 0, 0))
+        if page_number in table_pages:
+            for row in range(3):
+                for column in range(2):
+                    cell = fitz.Rect(72 + column * 100, 200 + row * 20, 172 + column * 100, 220 + row * 20)
+                    page.draw_rect(cell, color=(0, 0, 0))
+                    page.insert_text((cell.x0 + 4, cell.y1 - 6), f"r{row}c{column}", fontsize=8)
+    document.save(file_path)
+    document.close()
+
+def test_table_prefilter_skips_pages_without_ruling(tmp_path, monkeypatch):
+    make_table_pdf(str(tmp_path / "tables.pdf"), table_pages=(2, 4))
+    extractor = PDFExtractor(PDFLoader(), text_mode="text")
+    extractor.load(str(tmp_path / "tables.pdf"))
+    assert extractor.table_page_numbers() == [2, 4]
+
+    parsed = []
+    monkeypatch.setattr(pdfplumber_page.Page, "find_tables",
+                        lambda page, settings=None, find=pdfplumber_page.Page.find_tables:
+                        parsed.append(page.page_number) or find(page, settings))
+    records = list(extractor.iter_tables())
+    assert parsed == [2, 4]
+    assert [record["page_number"] for record in records] == [2, 4]
+    assert records[0]["rows"][0] == ["r0c0", "r0c1"]
+    x0, top, x1, bottom = records[0]["bbox"]
+    assert (round(x0), round(top), round(x1), round(bottom)) == (72, 200, 272, 260)
+    extractor.close()
+
+def test_tables_match_without_prefilter_and_across_workers(tmp_path):
+    make_table_pdf(str(tmp_path / "tables.pdf"), table_pages=(1, 3, 4))
+    results = []
+    for options in ({}, {"table_prefilter": False}, {"table_workers": 2}):
+        with PDFExtractor(PDFLoader(), text_mode="text", **options) as extractor:
+            extractor.load(str(tmp_path / "tables.pdf"))
+            results.append((extractor.extract_tables(), extractor.extract_all(kinds="tables")["tables"]))
+    assert results[0] == results[1] == results[2]
+    assert len(results[0][0]) == 3
+
+def test_text_table_strategy_disables_prefilter(tmp_path):
+    make_table_pdf(str(tmp_path / "tables.pdf"), table_pages=())
+    extractor = PDFExtractor(PDFLoader(), text_mode="text",
+                             table_settings={"vertical_strategy": "text", "horizontal_strategy": "text"})
+    extractor.load(str(tmp_path / "tables.pdf"))
+    assert extractor.table_page_numbers() == [1, 2, 3, 4]
+    assert extractor.options()["table_settings"]["vertical_strategy"] == "text"
+    extractor.close()
+
+def make_image_pdf(file_path, page_count):
+    # A 64x64 logo on every page and a different 8x8 icon on odd pages
+    logo = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 64, 64), False)
+    logo.clear_with(100)
+    document = fitz.open()
+    for page_num in range(page_count):
+        page = document.new_page()
+        page.insert_image(fitz.Rect(20, 20, 84, 84), pixmap=logo)
+        if page_num % 2 == 0:
+            icon = fitz.Pixmap(fitz.csGRAY, fitz.IRect(0, 0, 8, 8), False)
+            icon.clear_with(page_num)
+            page.insert_image(fitz.Rect(100, 20, 108, 28), pixmap=icon)
+    document.save(file_path)
+    document.close()
+
+def test_unique_images_are_extracted_once_with_their_pages(tmp_path, monkeypatch):
+    make_image_pdf(str(tmp_path / "images.pdf"), 4)
+    extracted = []
+    monkeypatch.setattr(fitz.Document, "extract_image",
+                        lambda document, xref, extract=fitz.Document.extract_image:
+                        extracted.append(xref) or extract(document, xref))
+    with PDFExtractor(PDFLoader()) as extractor:
+        extractor.load(str(tmp_path / "images.pdf"))
+        images = extractor.extract_unique_images()
+    assert [(image["dimensions"], image["pages"]) for image in images] == [
+        ((64, 64), [1, 2, 3, 4]), ((8, 8), [1]), ((8, 8), [3])
+    ]
+    assert sorted(extracted) == sorted(image["xref"] for image in images)
+    assert all(image["image_data"] for image in images)
+
+def test_image_filters_skip_images_before_extraction(tmp_path):
+    make_image_pdf(str(tmp_path / "images.pdf"), 4)
+    with PDFExtractor(PDFLoader(), min_image_width=16, min_image_height=16) as extractor:
+        extractor.load(str(tmp_path / "images.pdf"))
+        assert [image["page"] for image in extractor.extract_images()] == [1, 2, 3, 4]
+    with PDFExtractor(PDFLoader(), image_formats=["jpg"]) as extractor:
+        extractor.load(str(tmp_path / "images.pdf"))
+        assert extractor.extract_all(kinds="images")["images"] == []
+        assert extractor.options()["image_formats"] == ["jpeg"]
+
+def test_image_metadata_only_decodes_nothing(tmp_path, monkeypatch):
+    make_image_pdf(str(tmp_path / "images.pdf"), 4)
+    monkeypatch.setattr(fitz.Document, "extract_image", lambda document, xref: pytest.fail("image decoded"))
+    with PDFExtractor(PDFLoader(), image_metadata_only=True) as extractor:
+        extractor.load(str(tmp_path / "images.pdf"))
+        images = extractor.extract_unique_images()
+        occurrences = extractor.extract_images()
+    assert [(image["ext"], image["dimensions"], image["pages"]) for image in images][0] == ("png", (64, 64), [1, 2, 3, 4])
+    assert len({image["stream_sha256"] for image in images}) == 3
+    assert len(occurrences) == 6
+    assert not any("image_data" in image for image in images + occurrences)
@@ -0,0 +1,90 @@
+import glob
+
+import fitz
+import pytest
+
+from batch import run_batch
+from data_extractor.data_extractor.extractor_factory import detect_format, probe
+from data_extractor.file_loaders.pdf_loader import PDFLoader
+from data_extractor.file_loaders.ppt_loader import PPTLoader
+from data_extractor.file_loaders.probe import probe_pdf
+
+@pytest.mark.parametrize("file_path", sorted(glob.glob("test_files/*/*")))
+def test_probe_agrees_with_the_loaders(file_path):
+    result = probe(file_path)
+    try:
+        document = detect_format(file_path).loader_class()().load_file(file_path)
+    except ValueError:
+        document = None
+    assert result["valid"] == (document is not None)
+    if result["format"] == "pdf" and document is not None:
+        assert result["pages"] == len(document.pages)
+    elif result["format"] == "pptx" and document is not None:
+        assert result["pages"] == len(document.slides)
+
+def test_probe_reports_the_reason():
+    assert probe("test_files/pdf/password.pdf")["encrypted"]
+    assert probe("test_files/docx/password.docx")["encrypted"]
+    assert probe("test_files/pdf/corrupt.pdf")["error"] == "missing %PDF- header"
+    assert probe("test_files/pptx/corrupt.pptx")["error"] == "not a zip archive"
+    assert "legacy binary Office file" in PPTLoader().probe("test_files/pptx/sample_presentation.ppt")["error"]
+    assert probe("missing.pdf")["error"].startswith("unreadable")
+    assert probe("requirements.txt")["error"] == "unsupported format"
+
+def test_probe_reads_xref_streams_and_in_memory_documents():
+    document = fitz.open()
+    for _ in range(5):
+        document.new_page()
+    # Compressed object and cross-reference streams, as modern writers produce
+    data = document.tobytes(use_objstms=1, compression_effort=9)
+    assert b"/Type/XRef" in data.replace(b" ", b"") and b"/ObjStm" in data.replace(b" ", b"")
+    result = PDFLoader().probe(data)
+    assert result == {"format": "pdf", "size": len(data), "pages": 5, "encrypted": False,
+                      "error": None, "valid": True}
+
+def test_truncated_files_are_caught(tmp_path):
+    for source, name in (("test_files/pdf/small.pdf", "cut.pdf"), ("test_files/pptx/small.pptx", "cut.pptx")):
+        data = open(source, "rb").read()
+        (tmp_path / name).write_bytes(data[:len(data) // 2])
+        result = probe(str(tmp_path / name))
+        assert not result["valid"] and result["error"]
+    assert probe_pdf(b"%PDF-1.7\n")["error"]
+
+def test_run_batch_skips_files_that_fail_the_probe(tmp_path):
+    files = ["test_files/pptx/small.pptx", "test_files/pdf/password.pdf", "test_files/docx/corrupt.docx"]
+    summary = run_batch(files, str(tmp_path), workers=1, probe_first=True)
+    assert summary["files"] == 3
+    assert summary["succeeded"] == 1
+    assert {failure["error"] for failure in summary["failures"]} == {"probe: encrypted", "probe: not a zip archive"}
+
+def test_malformed_compound_files_are_reported(tmp_path):
+    data = open("test_files/docx/password.docx", "rb").read()
+    zero_sectors = data[:30] + b"\x00\x00" + data[32:]
+    for name, content in (("header.docx", data[:100]), ("directory.docx", data[:2048]),
+                          ("sectors.docx", zero_sectors)):
+        (tmp_path / name).write_bytes(content)
+        result = probe(str(tmp_path / name))
+        assert not result["valid"] and not result["encrypted"]
+        assert "compound file" in result["error"]
+
+@pytest.mark.parametrize("key", [b"/Size", b"/First", b"/N ", b"/W"])
+def test_mutated_xref_streams_are_reported(key):
+    document = fitz.open()
+    document.new_page()
+    data = document.tobytes(use_objstms=1, compression_effort=9)
+    assert key in data
+    mutated = data.replace(key, b"/X" + key[2:])
+    # Without /Index and /Size the xref stream no longer says which objects it lists
+    result = probe_pdf(mutated.replace(b"/Index", b"/Xndex"))
+    assert not result["valid"] and result["error"]
+
+def test_byte_flips_never_raise():
+    for file_path in ("test_files/pdf/unstandard_language.pdf", "test_files/pdf/small.pdf",
+                      "test_files/docx/password.docx", "test_files/pptx/small.pptx"):
+        data = bytearray(open(file_path, "rb").read())
+        for position in range(0, len(data), max(len(data) // 200, 1)):
+            mutated = bytearray(data)
+            mutated[position] ^= 0xFF
+            probe(bytes(mutated))
+        for size in (0, 10, 600, len(data) - 100):
+            probe(bytes(data[:size]))
@@ -0,0 +1,46 @@
+import asyncio
+import os
+import sqlite3
+
+import pytest
+
+from service import IngestionService
+
+def test_service_extracts_and_stores_submitted_documents(tmp_path):
+    database = str(tmp_path / "extracted.db")
+
+    async def ingest():
+        async with IngestionService(str(tmp_path / "out"), database, workers=2) as service:
+            job_ids = [await service.submit(path) for path in
+                       ("test_files/pptx/small.pptx", "test_files/docx/small.docx", "test_files/pptx/corrupt.pptx")]
+            return [await service.wait(job_id) for job_id in job_ids]
+
+    statuses = asyncio.run(ingest())
+    assert [status["status"] for status in statuses] == ["done", "done", "failed"]
+    assert statuses[0]["pages"] == 2
+    assert statuses[2]["error"]
+    with sqlite3.connect(database) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0] == 2
+    assert os.path.exists(tmp_path / "out" / "small" / "small.txt")
+
+def test_cancelled_queued_job_is_never_extracted(tmp_path):
+    async def ingest():
+        async with IngestionService(str(tmp_path / "out"), workers=1, max_queued=4) as service:
+            first = await service.submit("test_files/pptx/small.pptx")
+            second = await service.submit("test_files/docx/small.docx")
+            assert service.cancel(second)
+            await service.join()
+            assert not service.cancel(first)
+            return service.status(first), service.status(second)
+
+    first, second = asyncio.run(ingest())
+    assert first["status"] == "done"
+    assert second["status"] == "cancelled"
+    assert not any(name.startswith("small_") for name in os.listdir(tmp_path / "out"))
+
+def test_unknown_jobs_and_stopped_service_are_rejected(tmp_path):
+    service = IngestionService(str(tmp_path / "out"), workers=1)
+    with pytest.raises(ValueError):
+        service.status(1)
+    with pytest.raises(ValueError):
+        asyncio.run(service.submit("test_files/pptx/small.pptx"))
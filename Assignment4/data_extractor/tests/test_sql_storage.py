@@ -0,0 +1,189 @@
+import sqlite3
+
+import pytest
+
+from data_extractor.storage.sql_storage import SQLStorage
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = SQLStorage(str(tmp_path / "extracted.db"), commit_every=2)
+    yield storage
+    storage.close()
+
+def count_rows(database, table_name):
+    with sqlite3.connect(database) as conn:
+        return conn.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+
+def test_store_many_inserts_every_row(storage):
+    storage.store_many("data-table", [[["a", "b"]], [["c", "d"]], [["e", "f"]]])
+    assert [row[1] for row in storage.retrieve_all("data_table")] == [
+        "[['a', 'b']]", "[['c', 'd']]", "[['e', 'f']]"
+    ]
+    assert not storage.conn.in_transaction
+
+def test_batch_commits_on_exit(storage):
+    with storage.batch():
+        storage.store("text_data", "first page")
+        assert storage.conn.in_transaction
+        assert count_rows(storage.database, "text_data") == 0
+    assert not storage.conn.in_transaction
+    assert count_rows(storage.database, "text_data") == 1
+
+def test_batch_commits_every_n_rows(storage):
+    with storage.batch():
+        storage.store("text_data", "one")
+        storage.store("text_data", "two")
+        assert count_rows(storage.database, "text_data") == 2
+        storage.store("text_data", "three")
+        assert count_rows(storage.database, "text_data") == 2
+    assert count_rows(storage.database, "text_data") == 3
+
+def test_batch_rolls_back_on_error(storage):
+    storage.store("text_data", "kept")
+    with pytest.raises(RuntimeError):
+        with storage.batch():
+            storage.store("text_data", "discarded")
+            raise RuntimeError("extraction failed")
+    assert [row[1] for row in storage.retrieve_all("text_data")] == ["kept"]
+
+def test_tables_created_in_a_rolled_back_batch_are_recreated(tmp_path):
+    storage = SQLStorage(str(tmp_path / "extracted.db"))
+    with pytest.raises(RuntimeError):
+        with storage.batch():
+            storage.store("a", "first")
+            storage.store("b", "second")
+            raise RuntimeError("extraction failed")
+    storage.store("b", "again")
+    storage.store("a", "again")
+    assert [row[1] for row in storage.retrieve_all("b")] == ["again"]
+    storage.close()
+
+def test_first_document_in_a_batch_rolls_back_with_it(tmp_path):
+    storage = SQLStorage(str(tmp_path / "extracted.db"))
+    with pytest.raises(RuntimeError):
+        with storage.batch():
+            storage.store("text_data", "pending")
+            storage.store_document("a.pdf", {"page_count": 1, "pages": [{"page_number": 1, "text": "x"}]})
+            raise RuntimeError("extraction failed")
+    assert count_rows(storage.database, "documents") == 0
+    assert count_rows(storage.database, "text_data") == 0
+    storage.close()
+
+def test_database_uses_wal(storage):
+    assert storage.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+@pytest.fixture
+def extracted():
+    return {
+        "page_count": 2,
+        "pages": [{"page_number": 1, "text": "Intro\n", "method": "text_layer"},
+                  {"page_number": 2, "text": "Details\n" * 400, "method": "ocr"}],
+        "text": "Intro\n" + "Details\n" * 400,
+        "images": [{"image_data": b"\x89PNG", "ext": "png", "page": 2, "dimensions": (10, 20)}],
+        "urls": [{"linked_text": "Example", "url": "https://example.com", "page_number": 2}],
+        "tables": [[["Name", "Score"], ["Ada", None]]]
+    }
+
+def test_store_document_normalizes_every_artifact(storage, extracted):
+    document_id = storage.store_document("reports/q1.pdf", extracted, content_hash="abc")
+    assert storage.find_document("abc") == document_id
+    assert storage.page_text(document_id, 2) == "Details\n" * 400
+    assert storage.links_on_page(document_id, 2) == [
+        {"url": "https://example.com", "linked_text": "Example", "page_number": 2}
+    ]
+    assert storage.links_on_page(document_id, 1) == []
+    assert storage.tables_of_document(document_id) == [[["Name", "Score"], ["Ada", None]]]
+    ext, width, height, data = storage.conn.execute(
+        "SELECT ext, width, height, data FROM document_images WHERE document_id = ?", (document_id,)
+    ).fetchone()
+    assert (ext, width, height, data) == ("png", 10, 20, b"\x89PNG")
+
+def test_store_document_chunks_long_pages_on_line_ends(storage, extracted):
+    document_id = storage.store_document("reports/q1.pdf", extracted)
+    chunks = [row[0] for row in storage.conn.execute(
+        "SELECT text FROM document_text WHERE document_id = ? AND page_number = 2 ORDER BY chunk_index",
+        (document_id,)
+    )]
+    assert len(chunks) > 1
+    assert all(len(chunk) <= storage.chunk_chars and chunk.endswith("\n") for chunk in chunks)
+
+def test_deleting_a_document_cascades(storage, extracted):
+    document_id = storage.store_document("reports/q1.pdf", extracted)
+    with storage.batch():
+        storage.conn.execute("DELETE FROM documents WHERE id = ?", (document_id,))
+    assert storage.conn.execute("SELECT COUNT(*) FROM document_table_cells").fetchone()[0] == 0
+    assert storage.conn.execute("SELECT COUNT(*) FROM document_links").fetchone()[0] == 0
+
+def test_replace_keeps_one_copy_of_a_document(storage, extracted):
+    first = storage.store_document("reports/q1.pdf", extracted, replace=True)
+    second = storage.store_document("reports/q1.pdf", extracted, replace=True)
+    storage.store_document("reports/q2.pdf", extracted, replace=True)
+    assert storage.conn.execute("SELECT id FROM documents WHERE path = 'reports/q1.pdf'").fetchall() == [(second,)]
+    assert storage.conn.execute(
+        "SELECT COUNT(*) FROM document_links WHERE document_id = ?", (first,)
+    ).fetchone()[0] == 0
+    assert {hit["path"] for hit in storage.search("Intro")} == {"reports/q1.pdf", "reports/q2.pdf"}
+    assert len(storage.search("Intro")) == 2
+
+def test_a_failing_stream_leaves_the_previous_copy(storage, extracted):
+    first = storage.store_document("reports/q1.pdf", extracted, replace=True)
+
+    def tables():
+        # Far more rows than commit_every before the extraction gives out
+        for index in range(10):
+            yield [[f"cell {index}", "x"]] * 3
+        raise RuntimeError("extraction failed")
+
+    pages = [{"page_number": number, "text": f"Rewritten page {number}"} for number in range(1, 6)]
+    with pytest.raises(RuntimeError, match="extraction failed"):
+        storage.store_document_stream("reports/q1.pdf", pages=pages, tables=tables(), replace=True)
+    assert storage.conn.execute("SELECT id FROM documents").fetchall() == [(first,)]
+    assert storage.tables_of_document(first) == [[["Name", "Score"], ["Ada", None]]]
+    assert storage.conn.execute("SELECT COUNT(*) FROM document_tables").fetchone()[0] == 1
+    assert [hit["path"] for hit in storage.search("Intro")] == ["reports/q1.pdf"]
+    assert storage.search("Rewritten") == []
+
+def test_table_records_keep_page_and_bbox(storage, tmp_path):
+    tables = [{"page_number": 3, "rows": [["a"]], "bbox": (72.0, 200.0, 272.0, 260.0)},
+              {"page_number": None, "rows": [["b"]], "bbox": None}]
+    document_id = storage.store_document("reports/q1.pdf", {"page_count": 3, "tables": tables})
+    assert storage.conn.execute(
+        "SELECT page_number, bbox_x0, bbox_top, bbox_x1, bbox_bottom FROM document_tables "
+        "WHERE document_id = ? ORDER BY table_index", (document_id,)
+    ).fetchall() == [(3, 72.0, 200.0, 272.0, 260.0), (None, None, None, None, None)]
+    assert storage.tables_of_document(document_id) == [[["a"]], [["b"]]]
+
+def test_databases_from_before_table_bboxes_are_migrated(tmp_path):
+    database = str(tmp_path / "old.db")
+    with sqlite3.connect(database) as conn:
+        conn.execute("CREATE TABLE document_tables (id INTEGER PRIMARY KEY AUTOINCREMENT, document_id INTEGER NOT NULL, "
+                     "page_number INTEGER, table_index INTEGER NOT NULL, row_count INTEGER NOT NULL, "
+                     "column_count INTEGER NOT NULL)")
+    storage = SQLStorage(database)
+    storage.store_document("a.pdf", {"page_count": 1, "tables": [{"page_number": 1, "rows": [["x"]],
+                                                                  "bbox": (1, 2, 3, 4)}]})
+    assert storage.conn.execute("SELECT bbox_x0, bbox_bottom FROM document_tables").fetchall() == [(1.0, 4.0)]
+    storage.close()
+
+def test_search_ranks_hits_with_provenance(storage):
+    storage.store_document("a.pdf", {"page_count": 2, "pages": [
+        {"page_number": 1, "text": "Quarterly revenue grew."},
+        {"page_number": 2, "text": "Revenue, revenue and more revenue."}
+    ]})
+    storage.store_document("b.docx", {"page_count": None, "text": "Nothing to see here."})
+    hits = storage.search("revenue")
+    assert [(hit["path"], hit["page_number"]) for hit in hits] == [("a.pdf", 2), ("a.pdf", 1)]
+    assert "[revenue]" in hits[1]["snippet"]
+    assert storage.search("nothing")[0]["path"] == "b.docx"
+
+def test_search_forgets_deleted_documents(storage):
+    document_id = storage.store_document("a.pdf", {"page_count": 1, "pages": [
+        {"page_number": 1, "text": "Quarterly revenue grew."}
+    ]})
+    with storage.batch():
+        storage.conn.execute("DELETE FROM documents WHERE id = ?", (document_id,))
+    assert storage.search("revenue") == []
+
+def test_search_rejects_malformed_queries(storage):
+    with pytest.raises(ValueError, match="Invalid search query"):
+        storage.search('"unbalanced')
@@ -0,0 +1,70 @@
+import json
+import sqlite3
+
+import pytest
+
+from data_extractor.data_extractor.docx_extractor import DOCXExtractor
+from data_extractor.data_extractor.pdf_extractor import PDFExtractor
+from data_extractor.data_extractor.pptx_extractor import PPTXExtractor
+from data_extractor.file_loaders.docx_loader import DOCXLoader
+from data_extractor.file_loaders.pdf_loader import PDFLoader
+from data_extractor.file_loaders.ppt_loader import PPTLoader
+from data_extractor.storage.file_storage import FileStorage
+from data_extractor.storage.sql_storage import SQLStorage
+from data_extractor.tests.test_pdf_extractor import make_scanned_pdf
+
+@pytest.mark.parametrize("extractor, file_path", [
+    (PDFExtractor(PDFLoader(), text_mode="text"), "test_files/pdf/large.pdf"),
+    (PPTXExtractor(PPTLoader()), "test_files/pptx/large.pptx"),
+    (DOCXExtractor(DOCXLoader()), "test_files/docx/large.docx"),
+])
+def test_iterators_match_list_methods(extractor, file_path):
+    with extractor:
+        extractor.load(file_path)
+        assert "".join(page["text"] for page in extractor.iter_text()) == extractor.extract_text()
+        assert [table["rows"] for table in extractor.iter_tables()] == extractor.extract_tables()
+        assert list(extractor.iter_urls()) == extractor.extract_urls()
+        assert len(list(extractor.iter_images())) == len(extractor.extract_images())
+
+def test_streamed_repeated_images_carry_only_their_hash(tmp_path):
+    make_scanned_pdf(str(tmp_path / "scan.pdf"), 3)
+    with PDFExtractor(PDFLoader()) as extractor:
+        extractor.load(str(tmp_path / "scan.pdf"))
+        images = list(extractor.iter_images())
+    assert [("image_data" in image, image["page"]) for image in images] == [(True, 1), (False, 2), (False, 3)]
+    assert len({image["sha256"] for image in images}) == 1
+
+def test_file_storage_streams_every_kind(tmp_path):
+    make_scanned_pdf(str(tmp_path / "scan.pdf"), 3)
+    file_storage = FileStorage(str(tmp_path / "out"))
+    with PDFExtractor(PDFLoader(), text_mode="text") as extractor:
+        extractor.load(str(tmp_path / "scan.pdf"))
+        file_storage.store_stream(({"page_number": n, "text": f"page {n}\n"} for n in (1, 2)), "scan.pdf", "text")
+        metadata = file_storage.store_stream(extractor.iter_images(), "scan.pdf", "image")
+    file_storage.store_stream(iter([{"page_number": 2, "rows": [["a", None]]}]), "scan.pdf", "table")
+
+    assert (tmp_path / "out" / "scan.txt").read_text() == "page 1\npage 2\n"
+    assert [entry["occurrences"] for entry in metadata] == [[1, 2, 3]]
+    assert (tmp_path / "out" / "tables" / "table_1.csv").read_text() == "a,\n"
+    with open(tmp_path / "out" / "tables" / "metadata.json") as f:
+        assert json.load(f)[0]["page_number"] == 2
+
+def test_sql_storage_streams_a_document(tmp_path):
+    database = str(tmp_path / "extracted.db")
+    storage = SQLStorage(database, commit_every=2)
+    with PDFExtractor(PDFLoader(), text_mode="text") as extractor:
+        extractor.load("test_files/pdf/large.pdf")
+        document_id = storage.store_document_stream(
+            "large.pdf", pages=extractor.iter_text(), urls=extractor.iter_urls(),
+            tables=extractor.iter_tables(), images=extractor.iter_images(), page_count=len(extractor.file.pages)
+        )
+        expected_urls = extractor.extract_urls()
+        expected_tables = extractor.extract_tables()
+    assert storage.tables_of_document(document_id) == [
+        [[None if value is None else str(value) for value in row] for row in table] for table in expected_tables
+    ]
+    storage.close()
+
+    with sqlite3.connect(database) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM document_links").fetchone()[0] == len(expected_urls)
+        assert conn.execute("SELECT COUNT(*) FROM document_pages").fetchone()[0] == 3
@@ -0,0 +1,42 @@
+import pytest
+
+from data_extractor.data_extractor.pdf_extractor import PDFExtractor
+from data_extractor.data_extractor.pptx_extractor import PPTXExtractor
+from data_extractor.data_extractor.text_buffer import PageTextBuffer
+from data_extractor.file_loaders.pdf_loader import PDFLoader
+from data_extractor.file_loaders.ppt_loader import PPTLoader
+
+def test_buffer_joins_pieces_and_tracks_page_spans():
+    buffer = PageTextBuffer()
+    buffer.append("one\n", 1)
+    buffer.append("more\n", 1)
+    buffer.append("", 2)
+    buffer.append("three\n", 3)
+    assert buffer.getvalue() == "one\nmore\nthree\n"
+    assert buffer.page_spans == [
+        {"page_number": 1, "start": 0, "end": 9},
+        {"page_number": 2, "start": 9, "end": 9},
+        {"page_number": 3, "start": 9, "end": 15},
+    ]
+    assert [buffer.page_at(offset) for offset in (0, 8, 9, 14)] == [1, 1, 3, 3]
+    with pytest.raises(ValueError):
+        buffer.page_at(15)
+
+def test_buffer_keeps_growing_after_getvalue():
+    buffer = PageTextBuffer.from_records([{"page_number": None, "text": "a"}])
+    assert buffer.getvalue() == "a"
+    buffer.append("b")
+    assert buffer.getvalue() == "ab"
+    assert len(buffer) == 2
+
+@pytest.mark.parametrize("extractor, file_path", [
+    (PDFExtractor(PDFLoader(), text_mode="text"), "test_files/pdf/large.pdf"),
+    (PPTXExtractor(PPTLoader()), "test_files/pptx/large.pptx"),
+])
+def test_extract_all_page_spans_cover_each_page(extractor, file_path):
+    with extractor:
+        extractor.load(file_path)
+        result = extractor.extract_all(kinds="text")
+    for page, span in zip(result["pages"], result["page_spans"]):
+        assert result["text"][span["start"]:span["end"]] == page["text"]
+        assert span["page_number"] == page["page_number"]
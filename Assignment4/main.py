@@ -1,10 +1,5 @@
 import os
-from data_extractor.data_extractor.docx_extractor import DOCXExtractor
-from data_extractor.data_extractor.pdf_extractor import PDFExtractor
-from data_extractor.data_extractor.pptx_extractor import PPTXExtractor
-from data_extractor.file_loaders.pdf_loader import PDFLoader
-from data_extractor.file_loaders.docx_loader import DOCXLoader
-from data_extractor.file_loaders.ppt_loader import PPTLoader
+from data_extractor.data_extractor.extractor_factory import get_extractor
 from data_extractor.storage.file_storage import FileStorage
 from data_extractor.storage.sql_storage import SQLStorage
 from dotenv import load_dotenv
@@ -17,49 +12,36 @@ def main():
     table_name_text = os.getenv("TABLE_NAME_TEXT")
     table_name_image = os.getenv("TABLE_NAME_IMAGE")
     table_name_url = os.getenv("TABLE_NAME_URL")
-    table_name_data_table = os.getenv("TABLE_NAME_DATA_TABLE")
 
     if not file_path:
         raise ValueError("FILE_PATH is not set in the environment file.")
 
     # Determine the file type and use the appropriate loader
-    if file_path.endswith(".pdf"):
-        loader = PDFLoader()
-        extractor = PDFExtractor(loader)
-    elif file_path.endswith(".docx"):
-        loader = DOCXLoader()
-        extractor = DOCXExtractor(loader)
-    elif file_path.endswith(".pptx") or file_path.endswith(".ppt"):
-        loader = PPTLoader()
-        extractor = PPTXExtractor(loader)
-    else:
-        raise ValueError("Unsupported file format. Use PDF, DOCX, or PPTX.")
+    extractor = get_extractor(file_path)
 
-    # Extract text from the file
+    # Extract text, images, URLs and tables in a single pass over the file
     extractor.load(file_path)
-    extracted_text = extractor.extract_text()
+    extracted = extractor.extract_all()
+    extracted_text = extracted["text"]
+    images = extracted["images"]
+    urls = extracted["urls"]
+    tables = extracted["tables"]
 
-    # Extract images (if available)
-    images = extractor.extract_images()
-
-    # Extract URLs (if it's a PDF or DOCX)
-    urls = extractor.extract_urls()
-
-    # Extract tables (for PDFs or DOCX only)
-    tables = extractor.extract_tables()
+    # Release the parsed document now that every extraction is done
+    extractor.close()
 
     # Create a folder for storing the extracted data
     base_name = os.path.splitext(os.path.basename(file_path))[0]
     output_dir = os.path.join("extracted_data", base_name)
-    file_storage = FileStorage(output_dir)
+    # Images are shared by every document so repeated logos and headers are stored once
+    file_storage = FileStorage(output_dir, image_store_dir=os.path.join("extracted_data", "_image_store"))
 
     # Save the extracted text
     file_storage.store(extracted_text, os.path.basename(file_path), table_name_text)
 
     # Save the extracted images
-    image_data = None
     if images:
-        image_data = file_storage.store(images, os.path.basename(file_path), table_name_image)
+        file_storage.store(images, os.path.basename(file_path), table_name_image)
 
     # Save the extracted URLs (if any)
     if urls:
@@ -74,21 +56,8 @@ def main():
     # Create an instance of SQLStorage
     sql_storage = SQLStorage(database_name)
 
-    # Store the extracted text in the SQL database
-    sql_storage.store(table_name_text, extracted_text)
-
-    # Store the extracted images in the SQL database
-    if images:
-        sql_storage.store(table_name_image, image_data)
-
-    # Store the extracted URLs in the SQL database
-    if urls:
-        sql_storage.store(table_name_url, urls)
-
-    # Store the extracted tables in the SQL database
-    if tables:
-        for table in tables:
-            sql_storage.store(table_name_data_table, table)
+    # Store the document, its pages, text, links, tables and images in the normalized schema
+    sql_storage.store_document(file_path, extracted)
 
     print("Data stored in SQL database")
     sql_storage.close()
@@ -0,0 +1,269 @@
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from batch import output_dirs, process_file, store_in_database
+from data_extractor.storage.sql_storage import SQLStorage
+from dotenv import load_dotenv
+load_dotenv()
+
+# Job states, in the order a successful job goes through them
+JOB_STATES = ("queued", "extracting", "storing", "done", "failed", "cancelled")
+FINAL_STATES = ("done", "failed", "cancelled")
+
+class IngestionJob:
+    """One submitted document and where it is in the pipeline."""
+
+    def __init__(self, job_id: int, file_path: str, output_dir: str):
+        self.id = job_id
+        self.file_path = file_path
+        self.output_dir = output_dir
+        self.status = "queued"
+        self.error = None
+        self.pages = 0
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.finished = asyncio.Event()
+
+    def finish(self, status: str, error: Optional[str] = None):
+        if self.status in FINAL_STATES:
+            return
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        self.finished.set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "file_path": self.file_path,
+            "status": self.status,
+            "error": self.error,
+            "pages": self.pages,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at
+        }
+
+class IngestionService:
+    """
+    Long-lived asyncio front end that extracts and stores documents as they are submitted.
+
+    Memory and process use stay bounded under a burst of uploads:
+
+    * ``max_queued`` jobs may wait; ``submit`` blocks once the queue is full.
+    * ``workers`` processes extract (and OCR, single-threaded) in parallel, so tesseract
+      never runs more than ``workers`` times at once.
+    * Extracted documents wait for the database in a queue of ``max_pending_writes``.
+      When storage falls behind, extraction stops taking jobs until it catches up.
+
+    Every database write happens on one thread, which owns the SQLite connection.
+    """
+
+    def __init__(self, output_root: str = "extracted_data", database: Optional[str] = None,
+                 workers: Optional[int] = None, max_queued: int = 100, max_pending_writes: int = 4,
+                 ocr_cache_path: Optional[str] = None):
+        if max_queued < 1 or max_pending_writes < 1:
+            raise ValueError("max_queued and max_pending_writes must be at least 1.")
+        self.output_root = output_root
+        self.database = database
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queued = max_queued
+        self.max_pending_writes = max_pending_writes
+        self.ocr_cache_path = ocr_cache_path
+        # Shared by every document so repeated images are stored once, like batch.py
+        self.image_store_dir = os.path.join(output_root, "_image_store")
+        self._jobs: Dict[int, IngestionJob] = {}
+        self._ids = itertools.count(1)
+        self._used_names = set()
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+
+    async def start(self):
+        if self._running:
+            return
+        self._job_queue = asyncio.Queue(self.max_queued)
+        self._write_queue = asyncio.Queue(self.max_pending_writes)
+        self._extract_pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._write_pool = ThreadPoolExecutor(max_workers=1)
+        self._sql_storage = None
+        self._running = True
+        self._tasks = [asyncio.create_task(self._extract_loop()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._write_loop()))
+
+    async def submit(self, file_path: str) -> int:
+        """Queue a document and return its job id; waits while the queue is full."""
+        if not self._running:
+            raise ValueError("Ingestion service is not running.")
+        output_dir = output_dirs([file_path], self.output_root, self._used_names)[file_path]
+        job = IngestionJob(next(self._ids), file_path, output_dir)
+        self._jobs[job.id] = job
+        await self._job_queue.put(job)
+        return job.id
+
+    def status(self, job_id: int) -> Dict[str, Any]:
+        return self._job(job_id).to_dict()
+
+    def jobs(self) -> List[Dict[str, Any]]:
+        return [job.to_dict() for job in self._jobs.values()]
+
+    async def wait(self, job_id: int) -> Dict[str, Any]:
+        """Wait until the job is done, failed or cancelled and return its status."""
+        job = self._job(job_id)
+        await job.finished.wait()
+        return job.to_dict()
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancel a job that has not been stored yet; returns False if it already finished.
+
+        A queued job is skipped. A job that is being extracted still finishes in its worker
+        process, because a running process cannot be interrupted safely, but its result is
+        thrown away.
+        """
+        job = self._job(job_id)
+        if job.status in FINAL_STATES or job.status == "storing":
+            return False
+        job.finish("cancelled")
+        return True
+
+    async def join(self):
+        """Wait until every submitted job has finished."""
+        await asyncio.gather(*(job.finished.wait() for job in list(self._jobs.values())))
+
+    async def stop(self, cancel_pending: bool = False):
+        """Stop the service after the submitted jobs finish, or cancel the unfinished ones."""
+        if not self._running:
+            return
+        if cancel_pending:
+            for job in list(self._jobs.values()):
+                self.cancel(job.id)
+        await self.join()
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._extract_pool.shutdown(wait=True)
+        if self._sql_storage is not None:
+            await asyncio.get_running_loop().run_in_executor(self._write_pool, self._sql_storage.close)
+        self._write_pool.shutdown(wait=True)
+
+    def _job(self, job_id: int) -> IngestionJob:
+        if job_id not in self._jobs:
+            raise ValueError(f"Unknown job id: {job_id}")
+        return self._jobs[job_id]
+
+    async def _extract_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._job_queue.get()
+            try:
+                if job.status == "cancelled":
+                    continue
+                job.status = "extracting"
+                job.started_at = time.time()
+                result = await loop.run_in_executor(
+                    self._extract_pool, process_file, job.file_path, job.output_dir, self.image_store_dir,
+                    None, None, self.ocr_cache_path
+                )
+                if job.status == "cancelled":
+                    continue
+                if result["status"] != "ok":
+                    job.finish("failed", result["error"])
+                    continue
+                job.pages = result["pages"]
+                if self.database is None:
+                    job.finish("done")
+                    continue
+                # Blocks while storage is behind, which keeps this worker from taking new jobs
+                await self._write_queue.put((job, result))
+            except asyncio.CancelledError:
+                job.finish("cancelled")
+                raise
+            except Exception as error:
+                job.finish("failed", f"{type(error).__name__}: {error}")
+            finally:
+                self._job_queue.task_done()
+
+    async def _write_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job, result = await self._write_queue.get()
+            try:
+                if job.status == "cancelled":
+                    continue
+                job.status = "storing"
+                await loop.run_in_executor(self._write_pool, self._store, result)
+                job.finish("done")
+            except asyncio.CancelledError:
+                job.finish("cancelled")
+                raise
+            except Exception as error:
+                job.finish("failed", f"{type(error).__name__}: {error}")
+            finally:
+                self._write_queue.task_done()
+
+    def _store(self, result: Dict[str, Any]):
+        # Runs on the single write thread, which is the only one to touch the connection
+        if self._sql_storage is None:
+            self._sql_storage = SQLStorage(self.database)
+        store_in_database(self._sql_storage, result)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.stop(cancel_pending=exc_type is not None)
+
+async def serve(args) -> int:
+    """Read document paths from stdin, one per line, and print every job's final status."""
+    async with IngestionService(args.output_dir, args.database, args.workers, args.max_queued,
+                                args.max_pending_writes, args.ocr_cache) as service:
+        loop = asyncio.get_running_loop()
+        job_ids = []
+
+        async def report(job_id):
+            status = await service.wait(job_id)
+            message = f"{status['status']}: {status['file_path']}"
+            if status["error"]:
+                message += f" ({status['error']})"
+            print(message, file=sys.stderr if status["status"] == "failed" else sys.stdout, flush=True)
+
+        reporters = []
+        while True:
+            line = await loop.run_in_executor(None, sys.stdin.readline)
+            if not line:
+                break
+            if line.strip():
+                job_id = await service.submit(line.strip())
+                job_ids.append(job_id)
+                reporters.append(asyncio.create_task(report(job_id)))
+        await asyncio.gather(*reporters)
+        return 1 if any(service.status(job_id)["status"] == "failed" for job_id in job_ids) else 0
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest documents whose paths arrive on stdin, one per line.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of extraction processes (default: number of CPUs).")
+    parser.add_argument("--max-queued", type=int, default=100,
+                        help="Jobs that may wait for a worker before submitting blocks (default: 100).")
+    parser.add_argument("--max-pending-writes", type=int, default=4,
+                        help="Extracted documents that may wait for the database (default: 4).")
+    parser.add_argument("--output-dir", default="extracted_data",
+                        help="Folder the extracted data is written to.")
+    parser.add_argument("--database", default=os.getenv("DATABASE_NAME"),
+                        help="SQLite database to store the data in (default: DATABASE_NAME).")
+    parser.add_argument("--ocr-cache", help="Page-level OCR cache file shared by every document.")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    return asyncio.run(serve(parse_args(argv)))
+
+if __name__ == "__main__":
+    sys.exit(main())